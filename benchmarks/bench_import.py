@@ -0,0 +1,50 @@
+"""
+Measures the cold start of `tei_client`: the time to import the package, to import each client
+and to construct it, every step in a fresh interpreter.
+
+Usage: python benchmarks/bench_import.py [--repeat 10]
+"""
+
+import argparse
+import subprocess
+import sys
+
+from tei_client import SUPPORTS_GRPC
+
+STEPS = {
+	"import tei_client": "import tei_client",
+	"import HttpClient": "from tei_client import HttpClient",
+	"construct HttpClient": "from tei_client import HttpClient\nHttpClient('http://localhost:8080')",
+}
+if SUPPORTS_GRPC:
+	STEPS["import GrpcClient"] = "from tei_client import GrpcClient"
+	STEPS["construct GrpcClient"] = (
+		"from tei_client import GrpcClient\nGrpcClient('localhost:8081')"
+	)
+
+
+def measure(code: str) -> float:
+	script = (
+		"import time\n"
+		"start = time.perf_counter()\n"
+		f"{code}\n"
+		"print(time.perf_counter() - start)"
+	)
+	result = subprocess.run(
+		[sys.executable, "-c", script], capture_output=True, text=True, check=True
+	)
+	return float(result.stdout.split()[-1])
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--repeat", type=int, default=10)
+	args = parser.parse_args()
+
+	for name, code in STEPS.items():
+		elapsed = min(measure(code) for _ in range(args.repeat))
+		print(f"{name:>20}: {elapsed * 1e3:6.1f} ms")
+
+
+if __name__ == "__main__":
+	main()
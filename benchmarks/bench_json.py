@@ -0,0 +1,58 @@
+"""
+Measures the time to decode 1k embeddings from a TEI `/embed` response
+and to encode a large `/embed` request body with every installed JSON backend.
+
+Usage: python benchmarks/bench_json.py [--dim 768] [--repeat 10]
+"""
+
+import argparse
+import random
+import timeit
+
+from tei_client.arrays import SUPPORTS_NUMPY, decode_embeddings
+from tei_client.serialization import msgspec_backend, orjson_backend, stdlib_backend
+
+
+def installed_backends():
+	for backend in (stdlib_backend, orjson_backend, msgspec_backend):
+		try:
+			yield backend()
+		except ImportError:
+			pass
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--dim", type=int, default=768)
+	parser.add_argument("--repeat", type=int, default=10)
+	args = parser.parse_args()
+
+	embeddings = [[random.uniform(-1, 1) for _ in range(args.dim)] for _ in range(1000)]
+	request = {
+		"inputs": [" ".join(["lorem ipsum"] * 50) for _ in range(1000)],
+		"normalize": True,
+	}
+	body = stdlib_backend().dumps(embeddings)
+	print(f"response body: {len(body) / 1e6:.1f} MB for 1k x {args.dim} embeddings")
+
+	for backend in installed_backends():
+		decode = min(
+			timeit.repeat(lambda: backend.loads(body), number=1, repeat=args.repeat)
+		)
+		encode = min(
+			timeit.repeat(lambda: backend.dumps(request), number=1, repeat=args.repeat)
+		)
+		print(
+			f"{backend.name:>10}: decode {decode * 1e3:7.1f} ms / 1k embeddings, "
+			f"encode {encode * 1e3:6.1f} ms / 1k inputs"
+		)
+
+	if SUPPORTS_NUMPY:
+		decode = min(
+			timeit.repeat(lambda: decode_embeddings(body), number=1, repeat=args.repeat)
+		)
+		print(f"{'numpy':>10}: decode {decode * 1e3:7.1f} ms / 1k embeddings")
+
+
+if __name__ == "__main__":
+	main()
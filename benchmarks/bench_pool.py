@@ -0,0 +1,71 @@
+"""
+Measures the async `/embed` throughput of a running TEI server at different connection pool sizes,
+over HTTP/1.1 and, if the `h2` package is installed, HTTP/2 with prior knowledge.
+
+Usage: python benchmarks/bench_pool.py [--url http://localhost:8080] [--concurrency 256] [--requests 2000]
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from tei_client import HttpClient
+
+
+def http2_installed() -> bool:
+	try:
+		import h2  # noqa: F401
+	except ImportError:
+		return False
+	return True
+
+
+async def run(
+	url: str, limits: httpx.Limits, concurrency: int, requests: int, **kwargs
+) -> float:
+	client = HttpClient(url, limits=limits, **kwargs)
+	semaphore = asyncio.Semaphore(concurrency)
+
+	async def request(i: int) -> None:
+		async with semaphore:
+			await client.async_embed(f"benchmark sentence number {i}")
+
+	try:
+		await client.async_embed("warmup")
+		start = time.perf_counter()
+		await asyncio.gather(*(request(i) for i in range(requests)))
+		return requests / (time.perf_counter() - start)
+	finally:
+		await client.async_client.aclose()
+		client.client.close()
+
+
+def main():
+	parser = argparse.ArgumentParser()
+	parser.add_argument("--url", default="http://localhost:8080")
+	parser.add_argument("--concurrency", type=int, default=256)
+	parser.add_argument("--requests", type=int, default=2000)
+	parser.add_argument("--pool-sizes", type=int, nargs="+", default=[10, 50, 100, 256])
+	args = parser.parse_args()
+
+	protocols = [("HTTP/1.1", {})]
+	if http2_installed():
+		protocols.append(("HTTP/2", {"http2": True, "http1": False}))
+
+	for protocol, kwargs in protocols:
+		for pool_size in args.pool_sizes:
+			limits = httpx.Limits(
+				max_connections=pool_size, max_keepalive_connections=pool_size
+			)
+			throughput = asyncio.run(
+				run(args.url, limits, args.concurrency, args.requests, **kwargs)
+			)
+			print(
+				f"{protocol:>8}, {pool_size:>4} connections: {throughput:8.1f} requests/s"
+			)
+
+
+if __name__ == "__main__":
+	main()
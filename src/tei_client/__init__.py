@@ -1,27 +1,104 @@
-try:
-	import grpc  # noqa: F401
+from importlib import import_module
+from importlib.util import find_spec
+from typing import TYPE_CHECKING, Any
 
-	SUPPORTS_GRPC = True
-except ImportError:
-	SUPPORTS_GRPC = False
+SUPPORTS_GRPC = find_spec("grpc") is not None
 
+# Exports are imported on first access, so `import tei_client` does not pay for httpx, pydantic, numpy or grpc
+_EXPORTS = {
+	"HttpClient": "tei_client.clients.http_client",
+	"GrpcClient": "tei_client.clients.grpc_client",
+	"PooledClient": "tei_client.clients.pool",
+	"SUPPORTS_NUMPY": "tei_client.arrays",
+	"RaggedEmbeddings": "tei_client.arrays",
+	"BalancingPolicy": "tei_client.balancing",
+	"LoadBalancer": "tei_client.balancing",
+	"DynamicBatcher": "tei_client.batcher",
+	"CircuitBreaker": "tei_client.breaker",
+	"CircuitState": "tei_client.breaker",
+	"ClassificationScores": "tei_client.columnar",
+	"ColumnarTokenizationResult": "tei_client.columnar",
+	"RerankScores": "tei_client.columnar",
+	"TEIError": "tei_client.errors",
+	"AdaptiveLimiter": "tei_client.limiter",
+	"InfoCache": "tei_client.info_cache",
+	"RateLimiter": "tei_client.ratelimit",
+	"RetryPolicy": "tei_client.retry",
+	"EmbeddingCache": "tei_client.cache",
+	"LRUEmbeddingCache": "tei_client.cache",
+	"SQLiteEmbeddingCache": "tei_client.cache",
+	"ModelType": "tei_client.types",
+	"OutputFormat": "tei_client.types",
+	"ClassificationInput": "tei_client.types",
+	"EmbeddingInput": "tei_client.types",
+	"ClassificationTuple": "tei_client.types",
+}
 
-from tei_client.clients.http_client import HttpClient
-
-if SUPPORTS_GRPC:
+if TYPE_CHECKING:
+	from tei_client.clients.http_client import HttpClient
 	from tei_client.clients.grpc_client import GrpcClient  # noqa: F401
+	from tei_client.clients.pool import PooledClient
+	from tei_client.arrays import SUPPORTS_NUMPY, RaggedEmbeddings
+	from tei_client.balancing import BalancingPolicy, LoadBalancer
+	from tei_client.batcher import DynamicBatcher
+	from tei_client.breaker import CircuitBreaker, CircuitState
+	from tei_client.columnar import (
+		ClassificationScores,
+		ColumnarTokenizationResult,
+		RerankScores,
+	)
+	from tei_client.errors import TEIError
+	from tei_client.info_cache import InfoCache
+	from tei_client.limiter import AdaptiveLimiter
+	from tei_client.ratelimit import RateLimiter
+	from tei_client.retry import RetryPolicy
+	from tei_client.cache import EmbeddingCache, LRUEmbeddingCache, SQLiteEmbeddingCache
+	from tei_client.types import (
+		ModelType,
+		OutputFormat,
+		ClassificationInput,
+		EmbeddingInput,
+		ClassificationTuple,
+	)
+
+
+def __getattr__(name: str) -> Any:
+	module = _EXPORTS.get(name)
+	if module is None or (name == "GrpcClient" and not SUPPORTS_GRPC):
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	value = getattr(import_module(module), name)
+	globals()[name] = value
+	return value
+
+
+def __dir__() -> list[str]:
+	return sorted(list(globals()) + list(_EXPORTS))
 
-from tei_client.models import (
-	ModelType,
-	ClassificationInput,
-	EmbeddingInput,
-	ClassificationTuple,
-)
 
 __all__ = [
 	"HttpClient",
+	"PooledClient",
+	"BalancingPolicy",
+	"LoadBalancer",
 	"SUPPORTS_GRPC",
+	"SUPPORTS_NUMPY",
 	"ModelType",
+	"OutputFormat",
+	"RaggedEmbeddings",
+	"EmbeddingCache",
+	"LRUEmbeddingCache",
+	"SQLiteEmbeddingCache",
+	"DynamicBatcher",
+	"CircuitBreaker",
+	"CircuitState",
+	"ClassificationScores",
+	"ColumnarTokenizationResult",
+	"RerankScores",
+	"RetryPolicy",
+	"AdaptiveLimiter",
+	"InfoCache",
+	"RateLimiter",
+	"TEIError",
 	"ClassificationTuple",
 	"ClassificationInput",
 	"EmbeddingInput",
@@ -0,0 +1,157 @@
+from importlib.util import find_spec
+from types import ModuleType
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
+
+SUPPORTS_NUMPY = find_spec("numpy") is not None
+
+if TYPE_CHECKING:
+	import numpy as np
+
+
+def ensure_numpy() -> ModuleType:
+	"""
+	Imports numpy on first use, throws an error if it is not installed
+	"""
+	if not SUPPORTS_NUMPY:
+		raise ImportError(
+			"NumPy output requires numpy. Install it with `pip install tei-client[numpy]`"
+		)
+	import numpy
+
+	return numpy
+
+
+def allocate(shape: tuple[int, ...]) -> "np.ndarray":
+	"""
+	Allocates an uninitialized float32 array
+	"""
+	np = ensure_numpy()
+	return np.empty(shape, dtype=np.float32)
+
+
+def stack_rows(rows: Sequence[Any]) -> "np.ndarray":
+	"""
+	Copies equally sized float32 buffers (e.g. `array("f")`) into a contiguous `(n, dim)` array
+	"""
+	np = ensure_numpy()
+	if len(rows) == 0:
+		return allocate((0, 0))
+	result = allocate((len(rows), len(rows[0])))
+	for target, row in zip(result, rows):
+		target[:] = np.frombuffer(row, dtype=np.float32)
+	return result
+
+
+def decode_embeddings(body: bytes) -> "np.ndarray":
+	"""
+	Decodes a JSON array of embeddings straight into a contiguous float32 `(n, dim)` array,
+	without building intermediate Python floats
+	"""
+	np = ensure_numpy()
+	if not body.lstrip().startswith(b"["):
+		raise ValueError(f"Expected a JSON array of embeddings, got: {body[:200]!r}")
+
+	rows = body.count(b"[") - 1
+	if rows <= 0:
+		return allocate((0, 0))
+	flat = np.fromstring(body.translate(None, b"[]"), dtype=np.float32, sep=",")
+	return flat.reshape(rows, -1)
+
+
+class RaggedEmbeddings:
+	"""
+	Token embeddings of several inputs stored in one flat float32 `(tokens, dim)` buffer.
+	The rows of input `i` are `values[offsets[i]:offsets[i + 1]]`.
+	"""
+
+	def __init__(self, values: "np.ndarray", offsets: "np.ndarray") -> None:
+		self.values = values
+		self.offsets = offsets
+
+	@classmethod
+	def from_lengths(
+		cls, values: "np.ndarray", lengths: Sequence[int]
+	) -> "RaggedEmbeddings":
+		np = ensure_numpy()
+		offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+		np.cumsum(lengths, out=offsets[1:])
+		return cls(values, offsets)
+
+	@classmethod
+	def from_arrays(cls, arrays: Sequence["np.ndarray"]) -> "RaggedEmbeddings":
+		"""
+		Packs a `(tokens, dim)` array per input into one buffer
+		"""
+		np = ensure_numpy()
+		if len(arrays) == 0:
+			return cls.from_lengths(allocate((0, 0)), [])
+		return cls.from_lengths(np.concatenate(arrays), [len(a) for a in arrays])
+
+	@classmethod
+	def gather(
+		cls, parts: Sequence[tuple[list[int], "RaggedEmbeddings"]], size: int
+	) -> "RaggedEmbeddings":
+		"""
+		Merges the results of several batches into one buffer ordered by input index
+		"""
+		np = ensure_numpy()
+		lengths = np.zeros(size, dtype=np.int64)
+		for indices, part in parts:
+			lengths[indices] = part.lengths
+		dim = next((part.dim for _, part in parts if len(part.values)), 0)
+
+		result = cls.from_lengths(allocate((int(lengths.sum()), dim)), lengths)
+		for indices, part in parts:
+			for i, embeddings in zip(indices, part):
+				result.values[result.offsets[i] : result.offsets[i + 1]] = embeddings
+		return result
+
+	@property
+	def lengths(self) -> "np.ndarray":
+		return ensure_numpy().diff(self.offsets)
+
+	@property
+	def dim(self) -> int:
+		return self.values.shape[1]
+
+	def __len__(self) -> int:
+		return len(self.offsets) - 1
+
+	def __getitem__(self, index: int) -> "np.ndarray":
+		if index < 0:
+			index += len(self)
+		if not 0 <= index < len(self):
+			raise IndexError(index)
+		return self.values[self.offsets[index] : self.offsets[index + 1]]
+
+	def __iter__(self) -> Iterator["np.ndarray"]:
+		for i in range(len(self)):
+			yield self[i]
+
+	def to_list(self) -> list[list[list[float]]]:
+		return [embeddings.tolist() for embeddings in self]
+
+
+def decode_ragged_embeddings(body: bytes) -> RaggedEmbeddings:
+	"""
+	Decodes a JSON array of token embeddings per input straight into a `RaggedEmbeddings` buffer,
+	without building intermediate Python floats
+	"""
+	np = ensure_numpy()
+	if not body.lstrip().startswith(b"["):
+		raise ValueError(f"Expected a JSON array of embeddings, got: {body[:200]!r}")
+
+	chars = np.frombuffer(body, dtype=np.uint8)
+	opens = chars == ord("[")
+	depth = np.cumsum(opens.astype(np.int32) - (chars == ord("]")))
+	input_starts = opens & (depth == 2)
+	token_starts = opens & (depth == 3)
+
+	inputs = int(input_starts.sum())
+	token_inputs = np.cumsum(input_starts)[token_starts] - 1
+	lengths = np.bincount(token_inputs, minlength=inputs)
+	if len(token_inputs) == 0:
+		return RaggedEmbeddings.from_lengths(allocate((0, 0)), lengths)
+
+	flat = np.fromstring(body.translate(None, b"[]"), dtype=np.float32, sep=",")
+	return RaggedEmbeddings.from_lengths(flat.reshape(len(token_inputs), -1), lengths)
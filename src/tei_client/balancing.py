@@ -0,0 +1,125 @@
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from enum import Enum
+from typing import Any, Iterator, Optional, Sequence
+
+DEFAULT_EWMA_ALPHA = 0.2
+
+
+class Endpoint:
+	"""
+	A single replica of a pooled client together with its load statistics
+	"""
+
+	def __init__(
+		self, client: Any, name: str, alpha: float = DEFAULT_EWMA_ALPHA
+	) -> None:
+		self.client = client
+		self.name = name
+		self.alpha = alpha
+		self.in_flight = 0
+		self.requests = 0
+		self.errors = 0
+		self.latency: Optional[float] = None
+		self._lock = threading.Lock()
+
+	def __repr__(self) -> str:
+		return f"Endpoint({self.name!r}, in_flight={self.in_flight}, latency={self.latency})"
+
+	@property
+	def available(self) -> bool:
+		"""
+		False while the circuit breaker of the client rejects requests
+		"""
+		breaker = getattr(self.client, "circuit_breaker", None)
+		return breaker is None or breaker.available()
+
+	@contextmanager
+	def track(self) -> Iterator[None]:
+		"""
+		Counts a request as in flight and records its latency once it completes
+		"""
+		with self._lock:
+			self.in_flight += 1
+		start = time.perf_counter()
+		failed = False
+		try:
+			yield
+		except BaseException:
+			failed = True
+			raise
+		finally:
+			elapsed = time.perf_counter() - start
+			with self._lock:
+				self.in_flight -= 1
+				self.requests += 1
+				self.errors += failed
+				if self.latency is None:
+					self.latency = elapsed
+				else:
+					self.latency += self.alpha * (elapsed - self.latency)
+
+
+class LoadBalancer(ABC):
+	"""
+	Picks the endpoint that serves the next request
+	"""
+
+	@abstractmethod
+	def select(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+		pass
+
+
+class RoundRobin(LoadBalancer):
+	def __init__(self) -> None:
+		self._next = 0
+		self._lock = threading.Lock()
+
+	def select(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+		with self._lock:
+			index = self._next % len(endpoints)
+			self._next = index + 1
+		return endpoints[index]
+
+
+def _load(endpoint: Endpoint) -> tuple[int, float]:
+	return endpoint.in_flight, endpoint.latency or 0.0
+
+
+class LeastOutstanding(LoadBalancer):
+	"""
+	Picks the endpoint with the fewest requests in flight, ties are broken by the lower latency
+	"""
+
+	def select(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+		return min(endpoints, key=_load)
+
+
+class PowerOfTwoChoices(LoadBalancer):
+	"""
+	Compares two random endpoints and picks the one with fewer requests in flight, ties are broken by the lower latency
+	"""
+
+	def __init__(self, seed: Optional[int] = None) -> None:
+		self._random = random.Random(seed)
+
+	def select(self, endpoints: Sequence[Endpoint]) -> Endpoint:
+		if len(endpoints) == 1:
+			return endpoints[0]
+		return min(self._random.sample(endpoints, 2), key=_load)
+
+
+class BalancingPolicy(str, Enum):
+	RoundRobin = "round_robin"
+	LeastOutstanding = "least_outstanding"
+	PowerOfTwoChoices = "power_of_two_choices"
+
+	def create(self) -> LoadBalancer:
+		return {
+			BalancingPolicy.RoundRobin: RoundRobin,
+			BalancingPolicy.LeastOutstanding: LeastOutstanding,
+			BalancingPolicy.PowerOfTwoChoices: PowerOfTwoChoices,
+		}[self]()
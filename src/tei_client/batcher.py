@@ -0,0 +1,182 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Hashable, Optional, Union
+
+from tei_client.batching import DEFAULT_BATCH_SIZE, prepare_embedding_input
+from tei_client.clients.base import AsyncClientMixin
+from tei_client.columnar import ClassificationScores, ColumnarTokenizationResult
+from tei_client.types import (
+	ClassificationInput,
+	EmbeddingInput,
+	OutputFormat,
+	TruncationDirection,
+)
+
+if TYPE_CHECKING:
+	import numpy as np
+	from tei_client.models import ClassificationResult, TokenizationResult
+
+DEFAULT_MAX_WAIT = 0.005
+
+
+class _PendingBatch:
+	def __init__(self) -> None:
+		self.inputs: list = []
+		self.waiters: list[tuple[asyncio.Future, int, int]] = []
+		self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class DynamicBatcher:
+	"""
+	Coalesces concurrent calls of an async client into shared requests.
+	Calls are collected for up to `max_wait` seconds or until `max_batch_size` inputs are queued,
+	sent as a single request and every caller receives the slice of the results belonging to its inputs.
+	Only calls with identical parameters are merged, and never beyond the `max_client_batch_size` of the server.
+	"""
+
+	def __init__(
+		self,
+		client: AsyncClientMixin,
+		max_wait: float = DEFAULT_MAX_WAIT,
+		max_batch_size: int = DEFAULT_BATCH_SIZE,
+	) -> None:
+		self.client = client
+		self.max_wait = max_wait
+		self.max_batch_size = max_batch_size
+		self._pending: dict[Hashable, _PendingBatch] = {}
+		self._tasks: set[asyncio.Task] = set()
+
+	async def embed(
+		self,
+		text: EmbeddingInput,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		"""
+		Generate embeddings for the given text, batched with concurrent calls
+		"""
+		return await self._submit(
+			"async_embed",
+			prepare_embedding_input(text),
+			normalize=normalize,
+			truncate=truncate,
+			truncation_direction=TruncationDirection(truncation_direction),
+			output=OutputFormat(output),
+		)
+
+	async def classify(
+		self,
+		inputs: ClassificationInput,
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		"""
+		Classify the given inputs, batched with concurrent calls.
+		Single texts and pairs are sent in separate requests.
+		"""
+		if not isinstance(inputs, list):
+			inputs = [inputs]
+		for is_pair in (False, True):
+			if all(isinstance(_input, tuple) == is_pair for _input in inputs):
+				return await self._submit(
+					"async_classify",
+					inputs,
+					is_pair=is_pair,
+					raw_scores=raw_scores,
+					truncate=truncate,
+					truncation_direction=TruncationDirection(truncation_direction),
+					output=OutputFormat(output),
+				)
+		raise ValueError("Single texts and pairs can't be classified in the same call")
+
+	async def tokenize(
+		self,
+		text: Union[str, list[str]],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
+		"""
+		Tokenize the given input, batched with concurrent calls
+		"""
+		if isinstance(text, str):
+			text = [text]
+		return await self._submit(
+			"async_tokenize",
+			text,
+			add_special_tokens=add_special_tokens,
+			columnar=columnar,
+		)
+
+	async def flush(self) -> None:
+		"""
+		Sends all queued calls immediately and waits for every request in flight
+		"""
+		for key in list(self._pending):
+			self._flush(key)
+		if self._tasks:
+			await asyncio.gather(*self._tasks, return_exceptions=True)
+
+	async def _max_batch_size(self) -> int:
+		"""
+		`max_batch_size` capped at the `max_client_batch_size` of the server, as classify and tokenize are sent unsplit
+		"""
+		server_info = getattr(self.client, "async_server_info", None)
+		if server_info is None:
+			return self.max_batch_size
+		limit = (await server_info()).max_client_batch_size
+		return min(self.max_batch_size, limit) if limit else self.max_batch_size
+
+	async def _submit(self, method: str, inputs: list, **params: Any) -> Any:
+		max_batch_size = await self._max_batch_size()
+		loop = asyncio.get_running_loop()
+		key = (method, *sorted(params.items()))
+		batch = self._pending.get(key)
+		if batch is not None and len(batch.inputs) + len(inputs) > max_batch_size:
+			self._flush(key)
+			batch = None
+		if batch is None:
+			batch = self._pending[key] = _PendingBatch()
+			batch.timer = loop.call_later(self.max_wait, self._flush, key)
+
+		future = loop.create_future()
+		start = len(batch.inputs)
+		batch.inputs.extend(inputs)
+		batch.waiters.append((future, start, len(batch.inputs)))
+		if len(batch.inputs) >= max_batch_size:
+			self._flush(key)
+		return await future
+
+	def _flush(self, key: Hashable) -> None:
+		batch = self._pending.pop(key, None)
+		if batch is None:
+			return
+		batch.timer.cancel()
+
+		method, *params = key
+		params = {name: value for name, value in params if name != "is_pair"}
+		task = asyncio.ensure_future(self._dispatch(method, batch, params))
+		self._tasks.add(task)
+		task.add_done_callback(self._tasks.discard)
+
+	async def _dispatch(
+		self, method: str, batch: _PendingBatch, params: dict[str, Any]
+	) -> None:
+		try:
+			results = await getattr(self.client, method)(batch.inputs, **params)
+		except Exception as e:
+			for future, _, _ in batch.waiters:
+				if not future.done():
+					future.set_exception(e)
+			return
+		except BaseException:
+			# e.g. the dispatch was cancelled, the callers must not wait forever
+			for future, _, _ in batch.waiters:
+				future.cancel()
+			raise
+
+		for future, start, end in batch.waiters:
+			if not future.done():
+				future.set_result(results[start:end])
@@ -0,0 +1,219 @@
+import threading
+from itertools import islice
+from typing import (
+	TYPE_CHECKING,
+	Any,
+	AsyncIterable,
+	AsyncIterator,
+	Iterable,
+	Iterator,
+	Optional,
+	Sequence,
+	Union,
+)
+from tei_client.arrays import RaggedEmbeddings, allocate, ensure_numpy
+from tei_client.types import OutputFormat
+
+if TYPE_CHECKING:
+	import numpy as np
+
+CHARS_PER_TOKEN = 4
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_MAX_IN_FLIGHT = 8
+
+
+class TokenCountCache:
+	"""
+	Bounded cache of the token counts reported by the `tokenize` endpoint
+	"""
+
+	def __init__(self, maxsize: int = 100_000) -> None:
+		self.maxsize = maxsize
+		self._counts: dict[str, int] = {}
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._counts)
+
+	def get(self, text: str) -> Optional[int]:
+		return self._counts.get(text)
+
+	def update(self, text: str, count: int) -> None:
+		with self._lock:
+			if text not in self._counts and len(self._counts) >= self.maxsize:
+				del self._counts[next(iter(self._counts))]
+			self._counts[text] = count
+
+
+class ResultCollector:
+	"""
+	Reassembles the results of batches in input order,
+	either as a list, a float32 numpy array or `RaggedEmbeddings`
+	"""
+
+	def __init__(
+		self, size: int, output: OutputFormat = OutputFormat.List, ragged: bool = False
+	) -> None:
+		self.size = size
+		self.output = output
+		self.ragged = ragged and output == OutputFormat.Numpy
+		self._results: Any = None
+		self._ragged_parts: list[tuple[list[int], RaggedEmbeddings]] = []
+		if output == OutputFormat.Numpy:
+			ensure_numpy()
+		else:
+			self._results = [None] * size
+
+	def add(
+		self, batch: list[int], results: Union[list, "np.ndarray", RaggedEmbeddings]
+	) -> None:
+		if self.ragged:
+			self._ragged_parts.append((batch, results))
+		elif self.output == OutputFormat.Numpy:
+			if self._results is None:
+				self._results = allocate((self.size, *results.shape[1:]))
+			self._results[batch] = results
+		else:
+			for i, result in zip(batch, results):
+				self._results[i] = result
+
+	def result(self) -> Union[list, "np.ndarray", RaggedEmbeddings]:
+		if self.ragged:
+			return RaggedEmbeddings.gather(self._ragged_parts, self.size)
+		if self._results is None:
+			return allocate((0, 0))
+		return self._results
+
+
+def estimate_tokens(_input: Any, token_counts: Optional[TokenCountCache] = None) -> int:
+	"""
+	Estimate the number of tokens of a single input.
+	Tokenized inputs are counted exactly, text uses a cached `tokenize` count or is approximated from its length.
+	"""
+	if isinstance(_input, str):
+		if token_counts is not None:
+			count = token_counts.get(_input)
+			if count is not None:
+				return count
+		return max(1, -(-len(_input) // CHARS_PER_TOKEN))
+	if len(_input) > 0 and isinstance(_input[0], int):
+		return len(_input)
+	return sum(estimate_tokens(part, token_counts) for part in _input)
+
+
+def prepare_embedding_input(text: Any) -> list:
+	"""
+	Normalizes an `EmbeddingInput` into a list with one entry per input
+	"""
+	if isinstance(text, str):
+		return [text]
+	if len(text) > 0 and isinstance(text[0], int):
+		return [text]
+	return list(text)
+
+
+def hashable_input(_input: Any) -> Any:
+	"""
+	Hashable equivalent of an input, nested lists become tuples
+	"""
+	if isinstance(_input, (list, tuple)):
+		return tuple(hashable_input(part) for part in _input)
+	return _input
+
+
+def deduplicate(inputs: Sequence[Any]) -> tuple[list, Optional[list[int]]]:
+	"""
+	Collapses duplicate inputs.
+	Returns the unique inputs and, for every input, the index of its unique input, or `None` if there were no duplicates.
+	"""
+	positions: dict[Any, int] = {}
+	unique = []
+	inverse = []
+	for _input in inputs:
+		key = hashable_input(_input)
+		position = positions.get(key)
+		if position is None:
+			position = positions[key] = len(unique)
+			unique.append(_input)
+		inverse.append(position)
+
+	if len(unique) == len(inverse):
+		return unique, None
+	return unique, inverse
+
+
+def expand(
+	results: Union[list, "np.ndarray"], inverse: Optional[list[int]]
+) -> Union[list, "np.ndarray"]:
+	"""
+	Fans the results of the unique inputs back out to every original position, duplicates share the same result
+	"""
+	if inverse is None:
+		return results
+	if isinstance(results, list):
+		return [results[i] for i in inverse]
+	return results[inverse]
+
+
+def iter_chunks(inputs: Iterable[Any], size: int) -> Iterator[tuple[int, list]]:
+	"""
+	Lazily splits an iterable into `(start index, chunk)` pairs
+	"""
+	iterator = iter(inputs)
+	start = 0
+	while chunk := list(islice(iterator, size)):
+		yield start, chunk
+		start += len(chunk)
+
+
+async def aiter_chunks(
+	inputs: Union[AsyncIterable[Any], Iterable[Any]], size: int
+) -> AsyncIterator[tuple[int, list]]:
+	"""
+	Lazily splits an async or sync iterable into `(start index, chunk)` pairs
+	"""
+	if not isinstance(inputs, AsyncIterable):
+		for chunk in iter_chunks(inputs, size):
+			yield chunk
+		return
+
+	start = 0
+	chunk = []
+	async for _input in inputs:
+		chunk.append(_input)
+		if len(chunk) == size:
+			yield start, chunk
+			start += size
+			chunk = []
+	if chunk:
+		yield start, chunk
+
+
+def plan_batches(
+	inputs: Sequence[Any],
+	max_batch_size: Optional[int] = None,
+	max_batch_tokens: Optional[int] = None,
+	token_counts: Optional[TokenCountCache] = None,
+) -> list[list[int]]:
+	"""
+	Splits the inputs into batches of indices.
+	The inputs are bucketed by their estimated length, so every batch holds inputs of similar length and wastes little padding.
+	A batch holds at most `max_batch_size` inputs and its padded size (inputs * longest input) stays within `max_batch_tokens`.
+	An input exceeding the token budget on its own is sent as a single batch.
+	"""
+	lengths = [estimate_tokens(_input, token_counts) for _input in inputs]
+
+	batches = []
+	batch: list[int] = []
+	for i in sorted(range(len(inputs)), key=lengths.__getitem__):
+		if batch and (
+			(max_batch_size and len(batch) >= max_batch_size)
+			or (max_batch_tokens and (len(batch) + 1) * lengths[i] > max_batch_tokens)
+		):
+			batches.append(batch)
+			batch = []
+		batch.append(i)
+
+	if batch:
+		batches.append(batch)
+	return batches
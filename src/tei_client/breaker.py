@@ -0,0 +1,172 @@
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable, Optional
+
+from tei_client.errors import CircuitOpenError
+
+
+class CircuitState(str, Enum):
+	Closed = "closed"
+	Open = "open"
+	HalfOpen = "half_open"
+
+
+class CircuitBreaker:
+	"""
+	Ejects a failing endpoint and probes it back in.
+
+	The breaker records the outcome of the last `window` requests. Once at least `min_requests` were recorded
+	and the share of failures reaches `failure_threshold`, it opens and rejects requests with a `CircuitOpenError`.
+	Requests slower than `slow_request_threshold` seconds count as failures.
+	After `reset_timeout` seconds the `probe` (usually the health check of the client) runs in the background,
+	a successful probe half-opens the breaker and lets `half_open_requests` trial requests through.
+	The breaker closes once all of them succeeded and opens again on the first failure.
+	"""
+
+	def __init__(
+		self,
+		failure_threshold: float = 0.5,
+		window: int = 20,
+		min_requests: int = 5,
+		slow_request_threshold: Optional[float] = None,
+		reset_timeout: float = 10.0,
+		half_open_requests: int = 1,
+		probe: Optional[Callable[[], bool]] = None,
+	) -> None:
+		self.failure_threshold = failure_threshold
+		self.min_requests = min_requests
+		self.slow_request_threshold = slow_request_threshold
+		self.reset_timeout = reset_timeout
+		self.half_open_requests = half_open_requests
+		self.probe = probe
+		self._outcomes: deque[bool] = deque(maxlen=window)
+		self._state = CircuitState.Closed
+		self._opened_at = 0.0
+		self._trials = 0
+		self._successes = 0
+		self._probing = False
+		self._lock = threading.Lock()
+
+	@property
+	def state(self) -> CircuitState:
+		with self._lock:
+			self._maybe_probe()
+			return self._state
+
+	def available(self) -> bool:
+		"""
+		True if a request would currently be let through
+		"""
+		state = self.state
+		return state == CircuitState.Closed or (
+			state == CircuitState.HalfOpen and self._trials < self.half_open_requests
+		)
+
+	def before_request(self) -> None:
+		"""
+		Admits a request or raises a `CircuitOpenError`
+		"""
+		with self._lock:
+			self._maybe_probe()
+			if self._state == CircuitState.Closed:
+				return
+			if (
+				self._state == CircuitState.HalfOpen
+				and self._trials < self.half_open_requests
+			):
+				self._trials += 1
+				return
+		raise CircuitOpenError(
+			max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+		)
+
+	def record(self, success: bool, latency: float) -> None:
+		"""
+		Records the outcome of an admitted request
+		"""
+		if (
+			self.slow_request_threshold is not None
+			and latency > self.slow_request_threshold
+		):
+			success = False
+
+		with self._lock:
+			if self._state == CircuitState.HalfOpen:
+				if not success:
+					self._open()
+					return
+				self._successes += 1
+				if self._successes >= self.half_open_requests:
+					self._close()
+				return
+
+			if self._state == CircuitState.Open:
+				return
+
+			self._outcomes.append(success)
+			failures = self._outcomes.count(False)
+			if (
+				len(self._outcomes) >= self.min_requests
+				and failures / len(self._outcomes) >= self.failure_threshold
+			):
+				self._open()
+
+	def release(self) -> None:
+		"""
+		Returns the slot of an admitted request which ended without an outcome, e.g. because it was cancelled
+		"""
+		with self._lock:
+			if self._state == CircuitState.HalfOpen and self._trials > 0:
+				self._trials -= 1
+
+	def reset(self) -> None:
+		with self._lock:
+			self._close()
+
+	def _open(self) -> None:
+		self._state = CircuitState.Open
+		self._opened_at = time.monotonic()
+
+	def _close(self) -> None:
+		self._state = CircuitState.Closed
+		self._outcomes.clear()
+
+	def _half_open(self) -> None:
+		self._state = CircuitState.HalfOpen
+		self._trials = 0
+		self._successes = 0
+
+	def _maybe_probe(self) -> None:
+		"""
+		Starts the probe once the reset timeout of an open breaker elapsed, must be called holding the lock
+		"""
+		if (
+			self._state != CircuitState.Open
+			or self._probing
+			or time.monotonic() - self._opened_at < self.reset_timeout
+		):
+			return
+		if self.probe is None:
+			self._half_open()
+			return
+
+		self._probing = True
+		threading.Thread(
+			target=self._run_probe, name="tei-client-probe", daemon=True
+		).start()
+
+	def _run_probe(self) -> None:
+		try:
+			healthy = self.probe()
+		except Exception:
+			healthy = False
+		with self._lock:
+			self._probing = False
+			if self._state != CircuitState.Open:
+				return
+			if healthy:
+				self._half_open()
+			else:
+				self._open()
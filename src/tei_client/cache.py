@@ -0,0 +1,225 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from array import array
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Hashable, Iterable, Optional, Sequence, Union
+
+from tei_client.types import TruncationDirection
+
+if TYPE_CHECKING:
+	from tei_client.models import Info
+
+EmbeddingCacheKey = tuple[Hashable, ...]
+
+
+def make_cache_key(
+	info: "Info",
+	_input: Any,
+	normalize: bool,
+	truncate: bool,
+	truncation_direction: TruncationDirection,
+) -> EmbeddingCacheKey:
+	"""
+	Cache key of an embedding, covering the server model and every parameter that changes the result
+	"""
+	return (
+		info.server_model_id,
+		info.server_model_sha,
+		_input if isinstance(_input, str) else tuple(_input),
+		normalize,
+		truncate,
+		TruncationDirection(truncation_direction).value,
+	)
+
+
+def to_float32_array(embedding: Any) -> array:
+	"""
+	Copies an embedding (list, protobuf container or numpy row) into a compact float32 array
+	"""
+	if hasattr(embedding, "tobytes"):
+		result = array("f")
+		result.frombytes(embedding.astype("<f4", copy=False).tobytes())
+		return result
+	return array("f", embedding)
+
+
+class EmbeddingCache(ABC):
+	"""
+	Cache of embeddings, used by the clients to skip inputs that were embedded before.
+	Embeddings are stored as float32, a client with a cache returns float32 values for cached and fetched inputs alike.
+	"""
+
+	hits: int = 0
+	misses: int = 0
+
+	@abstractmethod
+	def get_many(self, keys: Sequence[EmbeddingCacheKey]) -> list[Optional[array]]:
+		"""
+		Look up the embeddings of several keys at once, `None` marks a miss
+		"""
+
+	@abstractmethod
+	def set_many(self, items: Iterable[tuple[EmbeddingCacheKey, array]]) -> None:
+		"""
+		Store several embeddings at once
+		"""
+
+	@property
+	def hit_rate(self) -> float:
+		total = self.hits + self.misses
+		return self.hits / total if total else 0.0
+
+
+class LRUEmbeddingCache(EmbeddingCache):
+	"""
+	In-memory embedding cache which evicts the least recently used entries
+	once it holds more than `maxsize` entries or `max_bytes` bytes of embeddings
+	"""
+
+	def __init__(
+		self, maxsize: Optional[int] = 100_000, max_bytes: Optional[int] = None
+	) -> None:
+		self.maxsize = maxsize
+		self.max_bytes = max_bytes
+		self.nbytes = 0
+		self.hits = 0
+		self.misses = 0
+		self._entries: OrderedDict[EmbeddingCacheKey, array] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get_many(self, keys: Sequence[EmbeddingCacheKey]) -> list[Optional[array]]:
+		results = []
+		with self._lock:
+			for key in keys:
+				embedding = self._entries.get(key)
+				if embedding is None:
+					self.misses += 1
+				else:
+					self.hits += 1
+					self._entries.move_to_end(key)
+				results.append(embedding)
+		return results
+
+	def set_many(self, items: Iterable[tuple[EmbeddingCacheKey, array]]) -> None:
+		with self._lock:
+			for key, embedding in items:
+				previous = self._entries.pop(key, None)
+				if previous is not None:
+					self.nbytes -= previous.itemsize * len(previous)
+				self._entries[key] = embedding
+				self.nbytes += embedding.itemsize * len(embedding)
+			self._evict()
+
+	def clear(self) -> None:
+		with self._lock:
+			self._entries.clear()
+			self.nbytes = 0
+
+	def _evict(self) -> None:
+		while self._entries and (
+			(self.maxsize is not None and len(self._entries) > self.maxsize)
+			or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+		):
+			_, embedding = self._entries.popitem(last=False)
+			self.nbytes -= embedding.itemsize * len(embedding)
+
+
+def hash_cache_key(key: EmbeddingCacheKey) -> bytes:
+	"""
+	Stable content hash of a cache key, used to index persistent caches
+	"""
+	return hashlib.blake2b(repr(key).encode(), digest_size=16).digest()
+
+
+class SQLiteEmbeddingCache(EmbeddingCache):
+	"""
+	Persistent embedding cache stored in a SQLite database.
+	Entries are indexed by a content hash of the input and its parameters together with the model sha of the server,
+	so embeddings of a previous model are never returned after the model changed.
+	Lookups are batched into a few `IN (...)` queries.
+	"""
+
+	SQL_VARIABLE_LIMIT = 900
+
+	def __init__(self, path: Union[str, "os.PathLike[str]"] = ":memory:") -> None:
+		self.path = path
+		self.hits = 0
+		self.misses = 0
+		self._lock = threading.Lock()
+		self._connection = sqlite3.connect(path, check_same_thread=False)
+		with self._lock, self._connection:
+			self._connection.execute("PRAGMA journal_mode=WAL")
+			self._connection.execute(
+				"CREATE TABLE IF NOT EXISTS embeddings ("
+				"digest BLOB PRIMARY KEY, model_sha TEXT, embedding BLOB NOT NULL"
+				") WITHOUT ROWID"
+			)
+
+	def __len__(self) -> int:
+		with self._lock:
+			(count,) = self._connection.execute(
+				"SELECT COUNT(*) FROM embeddings"
+			).fetchone()
+		return count
+
+	def get_many(self, keys: Sequence[EmbeddingCacheKey]) -> list[Optional[array]]:
+		digests = [hash_cache_key(key) for key in keys]
+		found: dict[bytes, bytes] = {}
+		with self._lock:
+			for start in range(0, len(digests), self.SQL_VARIABLE_LIMIT):
+				chunk = digests[start : start + self.SQL_VARIABLE_LIMIT]
+				found.update(
+					self._connection.execute(
+						"SELECT digest, embedding FROM embeddings WHERE digest IN "
+						f"({', '.join('?' * len(chunk))})",
+						chunk,
+					)
+				)
+
+		results: list[Optional[array]] = []
+		for digest in digests:
+			blob = found.get(digest)
+			if blob is None:
+				results.append(None)
+			else:
+				embedding = array("f")
+				embedding.frombytes(blob)
+				results.append(embedding)
+		hits = len(digests) - results.count(None)
+		self.hits += hits
+		self.misses += len(digests) - hits
+		return results
+
+	def set_many(self, items: Iterable[tuple[EmbeddingCacheKey, array]]) -> None:
+		rows = [
+			(hash_cache_key(key), key[1], embedding.tobytes())
+			for key, embedding in items
+		]
+		with self._lock, self._connection:
+			self._connection.executemany(
+				"INSERT OR REPLACE INTO embeddings (digest, model_sha, embedding) VALUES (?, ?, ?)",
+				rows,
+			)
+
+	def prune(self, model_sha: Optional[str]) -> int:
+		"""
+		Deletes the entries of every model except `model_sha`, returns the number of deleted entries
+		"""
+		with self._lock, self._connection:
+			return self._connection.execute(
+				"DELETE FROM embeddings WHERE model_sha IS NOT ?", (model_sha,)
+			).rowcount
+
+	def clear(self) -> None:
+		with self._lock, self._connection:
+			self._connection.execute("DELETE FROM embeddings")
+
+	def close(self) -> None:
+		with self._lock:
+			self._connection.close()
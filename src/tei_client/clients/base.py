@@ -1,15 +1,62 @@
+import asyncio
+import functools
+import inspect
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Union
-from tei_client.models import (
-	Info,
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import (
+	Any,
+	AsyncIterable,
+	AsyncIterator,
+	Awaitable,
+	Callable,
+	Iterable,
+	Iterator,
+	Optional,
+	TYPE_CHECKING,
+	Hashable,
+	TypeVar,
+	Union,
+)
+from tei_client.types import (
 	ModelType,
 	TruncationDirection,
 	EmbeddingInput,
-	TokenizationResult,
+	OutputFormat,
 	ClassificationInput,
-	ClassificationResult,
-	RerankResult,
+	SingleClassificationInput,
+)
+from tei_client.arrays import RaggedEmbeddings, stack_rows
+from tei_client.batching import (
+	DEFAULT_BATCH_SIZE,
+	DEFAULT_MAX_IN_FLIGHT,
+	ResultCollector,
+	TokenCountCache,
+	aiter_chunks,
+	estimate_tokens,
+	hashable_input,
+	iter_chunks,
+	plan_batches,
 )
+from tei_client.cache import EmbeddingCache, make_cache_key, to_float32_array
+from tei_client.columnar import (
+	ClassificationScores,
+	ColumnarTokenizationResult,
+	RerankScores,
+)
+from tei_client.errors import ChunkFailure, ChunkedRequestError
+from tei_client.info_cache import InfoCache
+from tei_client.ratelimit import RateLimiter
+
+if TYPE_CHECKING:
+	import numpy as np
+	from tei_client.models import (
+		ClassificationResult,
+		Info,
+		RerankResult,
+		RerankScore,
+		TokenizationResult,
+	)
 
 
 class ZeroShotMixin(ABC):
@@ -20,13 +67,119 @@ class ZeroShotMixin(ABC):
 
 
 class ModelTypeMixin(ABC):
-	__model_type: Optional[ModelType] = None
+	declared_model_type: Optional[ModelType] = None
+	info_ttl: Optional[float] = None
+	info_cache: Optional[InfoCache] = None
+	info_cache_key: str = ""
+	__info: Optional["Info"] = None
+	__info_fetched_at: float = 0.0
+	__info_fetch: Optional[asyncio.Future] = None
+	__token_counts: Optional[TokenCountCache] = None
+
+	def _cached_info(self) -> Optional["Info"]:
+		"""
+		The cached server info, `None` if it was not fetched yet or is older than `info_ttl` seconds
+		"""
+		if self.info_cache is not None:
+			return self.info_cache.get(
+				self.info_cache_key, self.info, max_age=self.info_ttl
+			)
+		if self.__info is None or (
+			self.info_ttl is not None
+			and time.monotonic() - self.__info_fetched_at >= self.info_ttl
+		):
+			return None
+		return self.__info
+
+	def _store_info(self, info: "Info") -> "Info":
+		if self.info_cache is not None:
+			self.info_cache.set(self.info_cache_key, info)
+		else:
+			self.__info = info
+			self.__info_fetched_at = time.monotonic()
+		return info
+
+	def invalidate_info(self) -> None:
+		"""
+		Drops the cached server info, it is fetched again by the next call that needs it
+		"""
+		if self.info_cache is not None:
+			self.info_cache.invalidate(self.info_cache_key)
+		self.__info = None
+
+	@property
+	def server_info(self) -> "Info":
+		"""
+		Information about the TEI server, fetched once and cached for `info_ttl` seconds (forever by default)
+		"""
+		return self._cached_info() or self._store_info(self.info())
+
+	async def async_server_info(self) -> "Info":
+		"""
+		Information about the TEI server, fetched with `async_info` without blocking the event loop.
+		Concurrent callers share one request.
+		"""
+		info = self._cached_info()
+		if info is not None:
+			return info
+
+		fetch = self.__info_fetch
+		if fetch is None or fetch.get_loop() is not asyncio.get_running_loop():
+			fetch = asyncio.ensure_future(self.__fetch_info())
+			self.__info_fetch = fetch
+			fetch.add_done_callback(self.__complete_info_fetch)
+		# a cancelled caller must not cancel the request of the others
+		return await asyncio.shield(fetch)
+
+	async def __fetch_info(self) -> "Info":
+		return self._store_info(await self.async_info())
+
+	def __complete_info_fetch(self, fetch: asyncio.Future) -> None:
+		if self.__info_fetch is fetch:
+			self.__info_fetch = None
+		if not fetch.cancelled():
+			fetch.exception()
 
 	@property
 	def model_type(self) -> ModelType:
-		if not self.__model_type:
-			self.__model_type = self.info().server_model_type
-		return self.__model_type
+		"""
+		The model type declared when creating the client, otherwise the one reported by the server
+		"""
+		return self.declared_model_type or self.server_info.server_model_type
+
+	@property
+	def token_counts(self) -> TokenCountCache:
+		"""
+		Token counts of previously tokenized texts, used to plan batches
+		"""
+		if self.__token_counts is None:
+			self.__token_counts = TokenCountCache()
+		return self.__token_counts
+
+	def _record_token_counts(
+		self,
+		texts: list[str],
+		results: Union[list["TokenizationResult"], list[ColumnarTokenizationResult]],
+	) -> None:
+		for text, result in zip(texts, results):
+			self.token_counts.update(text, len(result))
+
+	def _default_batch_size(self, info: Optional["Info"] = None) -> int:
+		return (info or self.server_info).max_client_batch_size or DEFAULT_BATCH_SIZE
+
+	def _plan_batches(
+		self, inputs: list, info: Optional["Info"] = None
+	) -> list[list[int]]:
+		"""
+		Splits the inputs into length bucketed batches of indices that respect the server limits
+		"""
+		info = info or self.server_info
+		return plan_batches(
+			inputs,
+			max_batch_size=info.max_client_batch_size or None,
+			max_batch_tokens=info.max_batch_tokens or None,
+			token_counts=self.token_counts,
+		)
 
 	def _ensure_model_type(self, wanted_type: ModelType):
 		"""
@@ -36,8 +189,223 @@ class ModelTypeMixin(ABC):
 			self.model_type == wanted_type
 		), f"{wanted_type} model required. The model on the server is of type {self.model_type}"
 
+	async def _async_ensure_model_type(self, wanted_type: ModelType):
+		"""
+		Throws an error if the model type is not the one expected, resolving it without blocking the event loop
+		"""
+		model_type = (
+			self.declared_model_type
+			or (await self.async_server_info()).server_model_type
+		)
+		assert model_type == wanted_type, (
+			f"{wanted_type} model required. The model on the server is of type {model_type}"
+		)
+
+
+class EmbeddingCacheMixin(ABC):
+	cache: Optional[EmbeddingCache] = None
+
+	def _lookup_cache(
+		self,
+		info: "Info",
+		inputs: list,
+		normalize: bool,
+		truncate: bool,
+		truncation_direction: TruncationDirection,
+	) -> tuple[list, list, list[int]]:
+		"""
+		Returns the cache keys, the cached embeddings and the indices of the inputs missing from the cache
+		"""
+		keys = [
+			make_cache_key(info, _input, normalize, truncate, truncation_direction)
+			for _input in inputs
+		]
+		cached = self.cache.get_many(keys)
+		missing = [i for i, embedding in enumerate(cached) if embedding is None]
+		return keys, cached, missing
+
+	def _merge_cache(
+		self,
+		keys: list,
+		cached: list,
+		missing: list[int],
+		fetched: Union[list, "np.ndarray"],
+		output: OutputFormat,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		"""
+		Stores the fetched embeddings in the cache and merges them with the cached ones in input order.
+		List output is rounded to float32 like the cached rows, so a result doesn't depend on whether it was cached.
+		"""
+		stored = [to_float32_array(embedding) for embedding in fetched]
+		self.cache.set_many((keys[i], row) for i, row in zip(missing, stored))
+		if output != OutputFormat.Numpy:
+			fetched = [row.tolist() for row in stored]
+
+		collector = ResultCollector(len(keys), output)
+		hits = [i for i, embedding in enumerate(cached) if embedding is not None]
+		if hits:
+			rows = [cached[i] for i in hits]
+			collector.add(
+				hits,
+				stack_rows(rows)
+				if output == OutputFormat.Numpy
+				else [row.tolist() for row in rows],
+			)
+		if missing:
+			collector.add(missing, fetched)
+		return collector.result()
+
+	def _cached_embed(
+		self,
+		inputs: list,
+		normalize: bool,
+		truncate: bool,
+		truncation_direction: TruncationDirection,
+		output: OutputFormat,
+		fetch: Callable[[list], Union[list, "np.ndarray"]],
+	) -> Union[list[list[float]], "np.ndarray"]:
+		"""
+		Embeds the inputs through the cache, only the misses are fetched from the server
+		"""
+		if self.cache is None:
+			return fetch(inputs)
+
+		keys, cached, missing = self._lookup_cache(
+			self.server_info, inputs, normalize, truncate, truncation_direction
+		)
+		fetched = fetch([inputs[i] for i in missing]) if missing else []
+		return self._merge_cache(keys, cached, missing, fetched, output)
+
+	async def _async_cached_embed(
+		self,
+		inputs: list,
+		normalize: bool,
+		truncate: bool,
+		truncation_direction: TruncationDirection,
+		output: OutputFormat,
+		fetch: Callable[[list], Awaitable[Union[list, "np.ndarray"]]],
+	) -> Union[list[list[float]], "np.ndarray"]:
+		"""
+		Embeds the inputs through the cache, only the misses are fetched from the server
+		"""
+		if self.cache is None:
+			return await fetch(inputs)
+
+		keys, cached, missing = self._lookup_cache(
+			await self.async_server_info(),
+			inputs,
+			normalize,
+			truncate,
+			truncation_direction,
+		)
+		fetched = await fetch([inputs[i] for i in missing]) if missing else []
+		return self._merge_cache(keys, cached, missing, fetched, output)
+
+
+class RateLimitMixin(ABC):
+	rate_limiter: Optional[RateLimiter] = None
+
+	def _rate_limit(self, inputs: Any, requests: int = 1) -> None:
+		"""
+		Blocks until the rate limiter admits `requests` requests with the given inputs
+		"""
+		if self.rate_limiter is not None:
+			self.rate_limiter.acquire(
+				estimate_tokens(inputs, self.token_counts), requests
+			)
+
+	async def _async_rate_limit(self, inputs: Any, requests: int = 1) -> None:
+		"""
+		Waits until the rate limiter admits `requests` requests with the given inputs
+		"""
+		if self.rate_limiter is not None:
+			await self.rate_limiter.async_acquire(
+				estimate_tokens(inputs, self.token_counts), requests
+			)
+
+
+T = TypeVar("T")
+
+
+class SingleFlightMixin(ABC):
+	single_flight: bool = False
+	__in_flight: Optional[dict[Hashable, asyncio.Future]] = None
+
+	async def _coalesce(self, key: Hashable, call: Callable[[], Awaitable[T]]) -> T:
+		"""
+		Awaits the request already in flight for `key`, or starts `call` if there is none.
+		Nothing is kept once the request completed.
+		"""
+		if self.__in_flight is None:
+			self.__in_flight = {}
+
+		future = self.__in_flight.get(key)
+		if future is None:
+			future = asyncio.ensure_future(call())
+			self.__in_flight[key] = future
+			future.add_done_callback(functools.partial(self.__complete, key))
+		# a cancelled caller must not cancel the request of the others
+		return await asyncio.shield(future)
+
+	def __complete(self, key: Hashable, future: asyncio.Future) -> None:
+		if self.__in_flight.get(key) is future:
+			del self.__in_flight[key]
+		if not future.cancelled():
+			future.exception()
+
+
+def single_flight(method: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+	"""
+	Merges concurrent calls of an async client method with identical arguments into a single request,
+	if `single_flight` is enabled on the client.
+	Arguments are compared after binding them to the signature, so positional, keyword and default values match.
+	All merged callers receive the same result object, which must not be mutated.
+	"""
+	signature = inspect.signature(method)
+
+	@functools.wraps(method)
+	async def wrapper(self: SingleFlightMixin, *args, **kwargs) -> T:
+		if not self.single_flight:
+			return await method(self, *args, **kwargs)
+		bound = signature.bind(self, *args, **kwargs)
+		bound.apply_defaults()
+		key = (
+			method.__name__,
+			tuple(
+				(name, hashable_input(value))
+				for name, value in bound.arguments.items()
+				if name != "self"
+			),
+		)
+		return await self._coalesce(key, lambda: method(self, *args, **kwargs))
+
+	return wrapper
+
 
 class ConcurrentClientMixin(ABC):
+	max_concurrency: Optional[int] = None
+	__executor: Optional[ThreadPoolExecutor] = None
+
+	@property
+	def executor(self) -> ThreadPoolExecutor:
+		"""
+		Thread pool used by the bulk methods, created on first use.
+		All threads share the connection pool of the client.
+		"""
+		if self.__executor is None:
+			self.__executor = ThreadPoolExecutor(
+				max_workers=self.max_concurrency, thread_name_prefix="tei-client"
+			)
+		return self.__executor
+
+	def close(self) -> None:
+		"""
+		Shuts down the thread pool of the bulk methods
+		"""
+		if self.__executor is not None:
+			self.__executor.shutdown(wait=False)
+			self.__executor = None
+
 	@abstractmethod
 	def health(self) -> bool:
 		"""
@@ -45,7 +413,7 @@ class ConcurrentClientMixin(ABC):
 		"""
 
 	@abstractmethod
-	def info(self) -> Info:
+	def info(self) -> "Info":
 		"""
 		Get information about the loaded model of the TEI server
 		"""
@@ -57,9 +425,11 @@ class ConcurrentClientMixin(ABC):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
 		"""
-		Generate embeddings for the given text
+		Generate embeddings for the given text.
+		`OutputFormat.Numpy` returns a contiguous float32 `(n, dim)` array.
 		"""
 
 	@abstractmethod
@@ -69,17 +439,23 @@ class ConcurrentClientMixin(ABC):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[list[float]]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
 		"""
-		Generate embeddings without application of pooling
+		Generate embeddings without application of pooling.
+		`OutputFormat.Numpy` returns the token embeddings as `RaggedEmbeddings`.
 		"""
 
 	@abstractmethod
 	def tokenize(
-		self, text: Union[str, list[str]], add_special_tokens: bool = True
-	) -> list[TokenizationResult]:
+		self,
+		text: Union[str, list[str]],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
 		"""
-		Tokenize the given input
+		Tokenize the given input.
+		`columnar` returns the tokens of each input as compact arrays instead of pydantic models.
 		"""
 
 	@abstractmethod
@@ -99,9 +475,11 @@ class ConcurrentClientMixin(ABC):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[ClassificationResult]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
 		"""
-		Classify the given inputs
+		Classify the given inputs.
+		`OutputFormat.Numpy` returns a float32 `(n_inputs, n_labels)` score matrix as `ClassificationScores`.
 		"""
 
 	@abstractmethod
@@ -113,10 +491,168 @@ class ConcurrentClientMixin(ABC):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> RerankResult:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+		"""
+		Get the reranked results for the given query and texts.
+		`OutputFormat.Numpy` returns parallel index and float32 score arrays as `RerankScores`.
+		"""
+
+	def _map_chunks(
+		self,
+		fn: Callable[[list], list[Any]],
+		inputs: list,
+		batch_size: Optional[int] = None,
+		group: Optional[Callable[[Any], Hashable]] = None,
+	) -> list[Any]:
+		"""
+		Runs `fn` for every chunk of the inputs on the thread pool and returns the results in input order.
+		Inputs with a different `group` key are never sent in the same chunk.
+		Raises a `ChunkedRequestError` listing every failed chunk.
+		"""
+		if batch_size is None:
+			batches = self._plan_batches(inputs)
+		else:
+			batches = [
+				list(range(start, min(start + batch_size, len(inputs))))
+				for start in range(0, len(inputs), batch_size)
+			]
+		if group is not None:
+			batches = [
+				[i for i in batch if group(inputs[i]) == key]
+				for batch in batches
+				for key in dict.fromkeys(group(inputs[i]) for i in batch)
+			]
+
+		futures = [
+			self.executor.submit(fn, [inputs[i] for i in batch]) for batch in batches
+		]
+
+		results = [None] * len(inputs)
+		failures = []
+		for batch, future in zip(batches, futures):
+			try:
+				chunk_results = future.result()
+			except Exception as e:
+				failures.append(ChunkFailure(indices=batch, error=e))
+				continue
+			for i, r in zip(batch, chunk_results):
+				results[i] = r
+
+		if failures:
+			raise ChunkedRequestError(failures, results)
+		return results
+
+	def embed_many(
+		self,
+		texts: list,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		batch_size: Optional[int] = None,
+	) -> list[list[float]]:
+		"""
+		Generate embeddings for many texts by sending chunks in parallel
+		"""
+		return self._map_chunks(
+			lambda chunk: self.embed(chunk, normalize, truncate, truncation_direction),
+			texts,
+			batch_size,
+		)
+
+	def classify_many(
+		self,
+		inputs: list[SingleClassificationInput],
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		batch_size: Optional[int] = None,
+	) -> list["ClassificationResult"]:
+		"""
+		Classify many inputs by sending chunks in parallel.
+		Single texts and pairs are sent in separate chunks.
+		"""
+		return self._map_chunks(
+			lambda chunk: self.classify(
+				chunk, raw_scores, truncate, truncation_direction
+			),
+			inputs,
+			batch_size,
+			group=lambda _input: isinstance(_input, tuple),
+		)
+
+	def rerank_many(
+		self,
+		query: str,
+		texts: list[str],
+		return_text: bool = False,
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		batch_size: Optional[int] = None,
+	) -> "RerankResult":
 		"""
-		Get the reranked results for the given query and texts
+		Rerank many texts for the given query by sending chunks in parallel
 		"""
+		from tei_client.models import RerankResult
+
+		def rerank_chunk(chunk: list[str]) -> list["RerankScore"]:
+			ranks = [None] * len(chunk)
+			result = self.rerank(
+				query, chunk, return_text, raw_scores, truncate, truncation_direction
+			)
+			for rank in result.ranks:
+				ranks[rank.index] = rank
+			return ranks
+
+		ranks = self._map_chunks(rerank_chunk, texts, batch_size)
+		return RerankResult(
+			ranks=sorted(
+				(rank.model_copy(update={"index": i}) for i, rank in enumerate(ranks)),
+				key=lambda rank: rank.score,
+				reverse=True,
+			)
+		)
+
+	def embed_iter(
+		self,
+		texts: Iterable,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		batch_size: Optional[int] = None,
+		max_in_flight: Optional[int] = None,
+	) -> Iterator[tuple[int, list[float]]]:
+		"""
+		Lazily generate embeddings for an iterable of texts, keeping at most `max_in_flight` chunks in flight.
+		Yields `(index, embedding)` pairs as soon as their chunk completes, so they may arrive out of order.
+		"""
+		chunks = iter_chunks(texts, batch_size or self._default_batch_size())
+		pending: dict[Future, int] = {}
+
+		def submit_next():
+			for start, chunk in chunks:
+				future = self.executor.submit(
+					self.embed, chunk, normalize, truncate, truncation_direction
+				)
+				pending[future] = start
+				return
+
+		try:
+			for _ in range(
+				max_in_flight or self.max_concurrency or DEFAULT_MAX_IN_FLIGHT
+			):
+				submit_next()
+			while pending:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+				for future in done:
+					start = pending.pop(future)
+					submit_next()
+					for offset, embedding in enumerate(future.result()):
+						yield start + offset, embedding
+		finally:
+			for future in pending:
+				future.cancel()
 
 
 class AsyncClientMixin(ABC):
@@ -127,7 +663,7 @@ class AsyncClientMixin(ABC):
 		"""
 
 	@abstractmethod
-	async def async_info(self) -> Info:
+	async def async_info(self) -> "Info":
 		"""
 		Get information about the loaded model of the TEI server
 		"""
@@ -139,9 +675,11 @@ class AsyncClientMixin(ABC):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
 		"""
-		Generate embeddings for the given text
+		Generate embeddings for the given text.
+		`OutputFormat.Numpy` returns a contiguous float32 `(n, dim)` array.
 		"""
 
 	@abstractmethod
@@ -151,17 +689,23 @@ class AsyncClientMixin(ABC):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[list[float]]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
 		"""
-		Generate embeddings without application of pooling
+		Generate embeddings without application of pooling.
+		`OutputFormat.Numpy` returns the token embeddings as `RaggedEmbeddings`.
 		"""
 
 	@abstractmethod
 	def async_tokenize(
-		self, text: Union[str, list[str]], add_special_tokens: bool = True
-	) -> list[TokenizationResult]:
+		self,
+		text: Union[str, list[str]],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
 		"""
-		Tokenize the given input
+		Tokenize the given input.
+		`columnar` returns the tokens of each input as compact arrays instead of pydantic models.
 		"""
 
 	@abstractmethod
@@ -181,9 +725,11 @@ class AsyncClientMixin(ABC):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[ClassificationResult]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
 		"""
-		Classify the given inputs
+		Classify the given inputs.
+		`OutputFormat.Numpy` returns a float32 `(n_inputs, n_labels)` score matrix as `ClassificationScores`.
 		"""
 
 	@abstractmethod
@@ -195,7 +741,56 @@ class AsyncClientMixin(ABC):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> RerankResult:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
 		"""
-		Get the reranked results for the given query and texts
+		Get the reranked results for the given query and texts.
+		`OutputFormat.Numpy` returns parallel index and float32 score arrays as `RerankScores`.
 		"""
+
+	async def aembed_iter(
+		self,
+		texts: Union[AsyncIterable, Iterable],
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		batch_size: Optional[int] = None,
+		max_in_flight: Optional[int] = None,
+	) -> AsyncIterator[tuple[int, list[float]]]:
+		"""
+		Lazily generate embeddings for an async or sync iterable of texts, keeping at most `max_in_flight` chunks in flight.
+		Yields `(index, embedding)` pairs as soon as their chunk completes, so they may arrive out of order.
+		"""
+		chunks = aiter_chunks(
+			texts,
+			batch_size or self._default_batch_size(await self.async_server_info()),
+		)
+		pending: dict[asyncio.Future, int] = {}
+
+		async def submit_next():
+			try:
+				start, chunk = await chunks.__anext__()
+			except StopAsyncIteration:
+				return
+			task = asyncio.ensure_future(
+				self.async_embed(chunk, normalize, truncate, truncation_direction)
+			)
+			pending[task] = start
+
+		try:
+			for _ in range(
+				max_in_flight or self.max_concurrency or DEFAULT_MAX_IN_FLIGHT
+			):
+				await submit_next()
+			while pending:
+				done, _ = await asyncio.wait(
+					pending, return_when=asyncio.FIRST_COMPLETED
+				)
+				for task in done:
+					start = pending.pop(task)
+					await submit_next()
+					for offset, embedding in enumerate(task.result()):
+						yield start + offset, embedding
+		finally:
+			for task in pending:
+				task.cancel()
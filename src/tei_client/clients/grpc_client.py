@@ -1,31 +1,54 @@
 import grpc
-from typing import Optional, Union
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Union
 import asyncio
+import threading
+import time
 from logging import error
 
 from tei_client.clients.base import (
+	EmbeddingCacheMixin,
 	ConcurrentClientMixin,
 	AsyncClientMixin,
 	ModelTypeMixin,
+	RateLimitMixin,
+	SingleFlightMixin,
+	single_flight,
 )
-from tei_client.models import (
-	Info,
+from tei_client.types import (
 	ModelType,
 	TruncationDirection,
 	EmbeddingInput,
-	Token,
-	TokenizationResult,
+	OutputFormat,
 	ClassificationInput,
-	ClassificationResult,
-	ClassificationScore,
 	ClassificationTuple,
-	RerankResult,
-	RerankScore,
 )
 
+from tei_client.arrays import RaggedEmbeddings, ensure_numpy
+from tei_client.batching import ResultCollector, deduplicate, expand
+from tei_client.breaker import CircuitBreaker
+from tei_client.cache import EmbeddingCache
+from tei_client.columnar import (
+	ClassificationScores,
+	ColumnarTokenizationResult,
+	RerankScores,
+)
+from tei_client.info_cache import SHARED_INFO_CACHE, InfoCache
+from tei_client.limiter import AdaptiveLimiter
+from tei_client.ratelimit import RateLimiter
+from tei_client.retry import DEFAULT_RETRY_POLICY, RetryPolicy
+from tei_client.wire import read_embed_all_response, read_embed_response
 import tei_client.stubs.tei_pb2_grpc as tei_pb2_grpc
 import tei_client.stubs.tei_pb2 as tei_pb2
 
+if TYPE_CHECKING:
+	import numpy as np
+	from tei_client.models import (
+		ClassificationResult,
+		Info,
+		RerankResult,
+		TokenizationResult,
+	)
+
 
 def to_modeltype(grpc_modeltype: tei_pb2.ModelType) -> ModelType:
 	if grpc_modeltype == tei_pb2.ModelType.MODEL_TYPE_EMBEDDING:
@@ -43,6 +66,172 @@ def to_grpc_truncation(truncation: TruncationDirection) -> tei_pb2.TruncationDir
 		return tei_pb2.TruncationDirection.TRUNCATION_DIRECTION_RIGHT
 
 
+HEALTH_CHECK_METHOD = "/grpc.health.v1.Health/Check"
+INFO_METHOD = "/tei.v1.Info/Info"
+HEALTH_CHECK_TIMEOUT = 5.0
+# serialized `HealthCheckResponse(status=SERVING)`
+HEALTH_SERVING = b"\x08\x01"
+FAILURE_CODES = frozenset((
+	grpc.StatusCode.UNAVAILABLE,
+	grpc.StatusCode.DEADLINE_EXCEEDED,
+	grpc.StatusCode.INTERNAL,
+	grpc.StatusCode.UNKNOWN,
+))
+
+# Keeps fire-and-forget tasks alive until they are done, the event loop only holds weak references to them
+_background_tasks: set[asyncio.Future] = set()
+
+
+def run_in_background(coroutine: Awaitable[Any]) -> None:
+	task = asyncio.ensure_future(coroutine)
+	_background_tasks.add(task)
+	task.add_done_callback(_background_tasks.discard)
+
+
+class CircuitBreakerInterceptor(
+	grpc.UnaryUnaryClientInterceptor, grpc.StreamStreamClientInterceptor
+):
+	"""
+	Sends the calls of a channel through a circuit breaker.
+	Unavailable servers, timeouts and internal errors count as failures.
+	"""
+
+	def __init__(self, breaker: CircuitBreaker) -> None:
+		self.breaker = breaker
+
+	def _intercept(self, continuation, client_call_details, request) -> Any:
+		self.breaker.before_request()
+		start = time.perf_counter()
+		try:
+			call = continuation(client_call_details, request)
+		except grpc.RpcError as e:
+			self.breaker.record(
+				e.code() not in FAILURE_CODES, time.perf_counter() - start
+			)
+			raise
+		call.add_done_callback(
+			lambda call: self.breaker.record(
+				call.code() not in FAILURE_CODES, time.perf_counter() - start
+			)
+		)
+		return call
+
+	intercept_unary_unary = _intercept
+	intercept_stream_stream = _intercept
+
+
+class AsyncCircuitBreakerInterceptor:
+	"""
+	Sends the calls of an async channel through a circuit breaker.
+	Unavailable servers, timeouts and internal errors count as failures.
+	"""
+
+	def __init__(self, breaker: CircuitBreaker) -> None:
+		self.breaker = breaker
+
+	async def _record(self, call: grpc.aio.Call, latency: float) -> None:
+		if call.cancelled():
+			self.breaker.release()
+		else:
+			self.breaker.record(await call.code() not in FAILURE_CODES, latency)
+
+	async def _intercept(self, continuation, client_call_details, request) -> Any:
+		if client_call_details.method in (
+			HEALTH_CHECK_METHOD,
+			HEALTH_CHECK_METHOD.encode(),
+		):
+			return await continuation(client_call_details, request)
+
+		self.breaker.before_request()
+		start = time.perf_counter()
+		try:
+			call = await continuation(client_call_details, request)
+		except BaseException:
+			self.breaker.release()
+			raise
+		# the callback receives the low level call object, so the outer call is captured instead
+		call.add_done_callback(
+			lambda _: run_in_background(self._record(call, time.perf_counter() - start))
+		)
+		return call
+
+
+# grpc.aio sorts every interceptor into a single category, so each call type needs its own class
+class AsyncUnaryCircuitBreakerInterceptor(
+	AsyncCircuitBreakerInterceptor, grpc.aio.UnaryUnaryClientInterceptor
+):
+	intercept_unary_unary = AsyncCircuitBreakerInterceptor._intercept
+
+
+class AsyncStreamCircuitBreakerInterceptor(
+	AsyncCircuitBreakerInterceptor, grpc.aio.StreamStreamClientInterceptor
+):
+	intercept_stream_stream = AsyncCircuitBreakerInterceptor._intercept
+
+
+OVERLOAD_CODES = frozenset((
+	grpc.StatusCode.RESOURCE_EXHAUSTED,
+	grpc.StatusCode.UNAVAILABLE,
+	grpc.StatusCode.DEADLINE_EXCEEDED,
+))
+
+
+class AsyncLimiterInterceptor:
+	"""
+	Keeps the calls of an async channel within the limit of an adaptive concurrency limiter
+	"""
+
+	def __init__(
+		self, limiter: AdaptiveLimiter, seed: Callable[[], Awaitable[Optional[int]]]
+	) -> None:
+		self.limiter = limiter
+		self.seed = seed
+
+	async def _release(self, call: grpc.aio.Call, latency: float) -> None:
+		if call.cancelled():
+			self.limiter.cancel()
+		else:
+			self.limiter.release(latency, await call.code() in OVERLOAD_CODES)
+
+	async def _intercept(self, continuation, client_call_details, request) -> Any:
+		# the limiter is seeded from the server info, so fetching it must not wait for the limiter
+		if client_call_details.method in (
+			HEALTH_CHECK_METHOD,
+			HEALTH_CHECK_METHOD.encode(),
+			INFO_METHOD,
+			INFO_METHOD.encode(),
+		):
+			return await continuation(client_call_details, request)
+
+		if not self.limiter.seeded:
+			self.limiter.seed(await self.seed())
+		await self.limiter.acquire()
+		start = time.perf_counter()
+		try:
+			call = await continuation(client_call_details, request)
+		except BaseException:
+			self.limiter.cancel()
+			raise
+		call.add_done_callback(
+			lambda _: run_in_background(
+				self._release(call, time.perf_counter() - start)
+			)
+		)
+		return call
+
+
+class AsyncUnaryLimiterInterceptor(
+	AsyncLimiterInterceptor, grpc.aio.UnaryUnaryClientInterceptor
+):
+	intercept_unary_unary = AsyncLimiterInterceptor._intercept
+
+
+class AsyncStreamLimiterInterceptor(
+	AsyncLimiterInterceptor, grpc.aio.StreamStreamClientInterceptor
+):
+	intercept_stream_stream = AsyncLimiterInterceptor._intercept
+
+
 class Stubs:
 	def __init__(self, channel: Union[grpc.Channel, grpc.aio.Channel]) -> None:
 		self.info = tei_pb2_grpc.InfoStub(channel)
@@ -52,47 +241,259 @@ class Stubs:
 		self.rerank = tei_pb2_grpc.RerankStub(channel)
 
 
-class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
+class RawEmbedStubs:
+	"""
+	Embed stubs that return the serialized responses, so the embeddings can be copied
+	into numpy arrays without deserializing them into Python floats
+	"""
+
+	def __init__(self, channel: Union[grpc.Channel, grpc.aio.Channel]) -> None:
+		self.EmbedStream = channel.stream_stream(
+			"/tei.v1.Embed/EmbedStream",
+			request_serializer=tei_pb2.EmbedRequest.SerializeToString,
+			response_deserializer=None,
+		)
+		self.EmbedAllStream = channel.stream_stream(
+			"/tei.v1.Embed/EmbedAllStream",
+			request_serializer=tei_pb2.EmbedAllRequest.SerializeToString,
+			response_deserializer=None,
+		)
+
+
+class Transport:
+	"""
+	A channel together with the stubs calling it
+	"""
+
+	def __init__(
+		self,
+		channel: Union[grpc.Channel, grpc.aio.Channel],
+		intercepted: Optional[grpc.Channel] = None,
+	) -> None:
+		self.channel = channel
+		self.stubs = Stubs(channel=intercepted or channel)
+		self.raw_stubs = RawEmbedStubs(channel=intercepted or channel)
+		self.health_check = channel.unary_unary(HEALTH_CHECK_METHOD)
+
+
+def close_async_channel(
+	channel: grpc.aio.Channel, loop: asyncio.AbstractEventLoop
+) -> None:
+	"""
+	Closes an `aio` channel opened in `loop`, in that loop if it still runs elsewhere,
+	otherwise in the running loop or, if there is none, in a new one
+	"""
+	try:
+		current = asyncio.get_running_loop()
+	except RuntimeError:
+		current = None
+
+	if loop.is_running() and loop is not current:
+		asyncio.run_coroutine_threadsafe(channel.close(), loop)
+	elif current is not None:
+		run_in_background(channel.close())
+	elif not loop.is_closed():
+		loop.run_until_complete(channel.close())
+	else:
+		asyncio.run(channel.close())
+
+
+class GrpcClient(
+	ConcurrentClientMixin,
+	AsyncClientMixin,
+	ModelTypeMixin,
+	EmbeddingCacheMixin,
+	SingleFlightMixin,
+	RateLimitMixin,
+):
+	__transport: Optional[Transport] = None
+	__async_transport: Optional[Transport] = None
+	__async_loop: Optional[asyncio.AbstractEventLoop] = None
+
 	def __init__(
 		self,
 		target: str,
 		credentials: Optional[grpc.ChannelCredentials] = None,
+		max_concurrency: Optional[int] = None,
+		cache: Optional[EmbeddingCache] = None,
+		single_flight: bool = False,
+		circuit_breaker: Optional[CircuitBreaker] = None,
+		retry: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+		limiter: Optional[AdaptiveLimiter] = None,
+		rate_limiter: Optional[RateLimiter] = None,
+		model_type: Optional[ModelType] = None,
+		info_ttl: Optional[float] = None,
+		info_cache: Optional[InfoCache] = SHARED_INFO_CACHE,
 		**kwargs,
 	) -> None:
-		if credentials is not None:
-			self.channel = grpc.secure_channel(target, credentials, **kwargs)
-			self.async_channel = grpc.aio.secure_channel(target, credentials, **kwargs)
-		else:
-			self.channel = grpc.insecure_channel(target, **kwargs)
-			self.async_channel = grpc.aio.insecure_channel(target, **kwargs)
+		"""
+		`max_concurrency` limits the number of chunks the bulk methods keep in flight at once.
+		`cache` serves repeated `embed` inputs without sending them to the server.
+		`single_flight` lets concurrent `async_embed` and `async_rerank` calls with identical arguments share one request.
+		`circuit_breaker` rejects calls while the server keeps failing, it probes the server with `health` by default.
+		`retry` configures the gRPC retries of `UNAVAILABLE` and `RESOURCE_EXHAUSTED` calls, `None` disables them.
+		`limiter` adapts the number of async calls in flight to the latency and overload signals of the server.
+		`rate_limiter` caps the tokens and messages per second, blocking the sync methods and awaiting in the async ones.
+		`model_type` declares the type of the served model, so calls are not preceded by fetching the server info to check it.
+		`info_ttl` is the maximum age in seconds of the cached server info, older info is fetched again before it is used.
+		`info_cache` shares the server info between all clients of the same target, `None` keeps it per client.
+		The sync and async channels are opened on first use.
+		"""
+		self.max_concurrency = max_concurrency
+		self.cache = cache
+		self.single_flight = single_flight
+		self.circuit_breaker = circuit_breaker
+		self.rate_limiter = rate_limiter
+		self.declared_model_type = model_type
+		self.info_ttl = info_ttl
+		self.info_cache = info_cache
+		self.info_cache_key = target
+
+		self.retry = retry
+		options = list(kwargs.pop("options", None) or [])
+		if retry is not None and retry.max_attempts > 1:
+			options += [
+				("grpc.enable_retries", 1),
+				("grpc.service_config", retry.grpc_service_config()),
+			]
+		kwargs["options"] = options
+
+		interceptors = list(kwargs.pop("interceptors", None) or [])
+		if circuit_breaker is not None:
+			interceptors += [
+				AsyncUnaryCircuitBreakerInterceptor(circuit_breaker),
+				AsyncStreamCircuitBreakerInterceptor(circuit_breaker),
+			]
+			if circuit_breaker.probe is None:
+				circuit_breaker.probe = self.health
+		self.limiter = limiter
+		if limiter is not None:
+
+			async def seed() -> Optional[int]:
+				return (await self.async_server_info()).max_concurrent_requests
 
-		self._stubs = Stubs(channel=self.channel)
-		self._async_stubs = Stubs(channel=self.async_channel)
+			interceptors += [
+				AsyncUnaryLimiterInterceptor(limiter, seed),
+				AsyncStreamLimiterInterceptor(limiter, seed),
+			]
+
+		self.target = target
+		self.credentials = credentials
+		self._channel_kwargs = kwargs
+		self._interceptors = interceptors
+		self._transport_lock = threading.Lock()
 		super().__init__()
 
+	@property
+	def _transport(self) -> Transport:
+		"""
+		Sync channel and stubs, opened on first use
+		"""
+		if self.__transport is None:
+			with self._transport_lock:
+				if self.__transport is None:
+					if self.credentials is not None:
+						channel = grpc.secure_channel(
+							self.target, self.credentials, **self._channel_kwargs
+						)
+					else:
+						channel = grpc.insecure_channel(
+							self.target, **self._channel_kwargs
+						)
+					intercepted = None
+					if self.circuit_breaker is not None:
+						intercepted = grpc.intercept_channel(
+							channel, CircuitBreakerInterceptor(self.circuit_breaker)
+						)
+					self.__transport = Transport(channel, intercepted)
+		return self.__transport
+
+	@property
+	def _async_transport(self) -> Transport:
+		"""
+		Async channel and stubs, opened on first use within the running event loop.
+		An `aio` channel is bound to the loop it was created in, a new one is opened once the client is used in another loop.
+		"""
+		loop = asyncio.get_running_loop()
+		if self.__async_transport is None or self.__async_loop is not loop:
+			if self.__async_transport is not None:
+				close_async_channel(self.__async_transport.channel, self.__async_loop)
+			if self.credentials is not None:
+				channel = grpc.aio.secure_channel(
+					self.target,
+					self.credentials,
+					interceptors=self._interceptors,
+					**self._channel_kwargs,
+				)
+			else:
+				channel = grpc.aio.insecure_channel(
+					self.target, interceptors=self._interceptors, **self._channel_kwargs
+				)
+			self.__async_transport = Transport(channel)
+			self.__async_loop = loop
+		return self.__async_transport
+
+	@property
+	def channel(self) -> grpc.Channel:
+		return self._transport.channel
+
+	@property
+	def async_channel(self) -> grpc.aio.Channel:
+		return self._async_transport.channel
+
+	@property
+	def _stubs(self) -> Stubs:
+		return self._transport.stubs
+
+	@property
+	def _raw_stubs(self) -> RawEmbedStubs:
+		return self._transport.raw_stubs
+
+	@property
+	def _async_stubs(self) -> Stubs:
+		return self._async_transport.stubs
+
+	@property
+	def _async_raw_stubs(self) -> RawEmbedStubs:
+		return self._async_transport.raw_stubs
+
 	def __del__(self):
-		self.channel.close()
+		self.close()
+		if self.__transport is not None:
+			self.__transport.channel.close()
+		if self.__async_transport is None:
+			return
 		try:
-			loop = asyncio.get_event_loop()
-			loop.run_until_complete(self.async_channel.close())
+			close_async_channel(self.__async_transport.channel, self.__async_loop)
 		except Exception as e:
 			error("Failed to close async channel", e)
 
 	def health(self) -> bool:
+		"""
+		Calls the standard gRPC health service, a server without it counts as healthy once it answers
+		"""
 		try:
-			state = self.async_channel.get_state()
-			return (
-				state == grpc.ChannelConnectivity.READY
-				or state == grpc.ChannelConnectivity.IDLE
-			)
-		except Exception:
-			return False
+			response = self._transport.health_check(b"", timeout=HEALTH_CHECK_TIMEOUT)
+		except grpc.RpcError as e:
+			return e.code() == grpc.StatusCode.UNIMPLEMENTED
+		return response == HEALTH_SERVING
 
 	async def async_health(self) -> bool:
-		return asyncio.create_task(self.health())
+		"""
+		Calls the standard gRPC health service, a server without it counts as healthy once it answers
+		"""
+		try:
+			response = await self._async_transport.health_check(
+				b"", timeout=HEALTH_CHECK_TIMEOUT
+			)
+		except grpc.RpcError as e:
+			return e.code() == grpc.StatusCode.UNIMPLEMENTED
+		return response == HEALTH_SERVING
 
 	@staticmethod
-	def _into_info(result) -> Info:
+	def _into_info(result) -> "Info":
+		from tei_client.models import Info
+
 		return Info(
 			version=result.version,
 			sha=result.sha,
@@ -110,11 +511,11 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			tokenization_workers=result.tokenization_workers,
 		)
 
-	def info(self) -> Info:
+	def info(self) -> "Info":
 		result = self._stubs.info.Info(tei_pb2.InfoRequest())
 		return GrpcClient._into_info(result)
 
-	async def async_info(self) -> Info:
+	async def async_info(self) -> "Info":
 		result = await self._async_stubs.info.Info(tei_pb2.InfoRequest())
 		return GrpcClient._into_info(result)
 
@@ -124,13 +525,38 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
 		self._ensure_model_type(ModelType.Embedding)
+		if output == OutputFormat.Numpy:
+			ensure_numpy()
 
 		if isinstance(text, str):
 			text = [text]
 
-		requests = [
+		text, inverse = deduplicate(text)
+		result = self._cached_embed(
+			text,
+			normalize,
+			truncate,
+			truncation_direction,
+			output,
+			lambda inputs: self._embed_stream(
+				inputs, normalize, truncate, truncation_direction, output
+			),
+		)
+		return expand(result, inverse)
+
+	def _embed_stream(
+		self,
+		text: list[str],
+		normalize: bool,
+		truncate: bool,
+		truncation_direction: TruncationDirection,
+		output: OutputFormat,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		self._rate_limit(text, len(text))
+		requests = (
 			tei_pb2.EmbedRequest(
 				inputs=t,
 				truncate=truncate,
@@ -138,22 +564,55 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 				truncation_direction=to_grpc_truncation(truncation_direction),
 			)
 			for t in text
-		]
+		)
+
+		if output == OutputFormat.Numpy:
+			collector = ResultCollector(len(text), output)
+			for i, r in enumerate(self._raw_stubs.EmbedStream(requests)):
+				collector.add([i], read_embed_response(r)[None])
+			return collector.result()
 
-		return [r.embeddings for r in self._stubs.embed.EmbedStream(iter(requests))]
+		return [r.embeddings for r in self._stubs.embed.EmbedStream(requests)]
 
+	@single_flight
 	async def async_embed(
 		self,
 		text: EmbeddingInput,
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
-		self._ensure_model_type(ModelType.Embedding)
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		await self._async_ensure_model_type(ModelType.Embedding)
+		if output == OutputFormat.Numpy:
+			ensure_numpy()
 
 		if isinstance(text, str):
 			text = [text]
 
+		text, inverse = deduplicate(text)
+		result = await self._async_cached_embed(
+			text,
+			normalize,
+			truncate,
+			truncation_direction,
+			output,
+			lambda inputs: self._async_embed_stream(
+				inputs, normalize, truncate, truncation_direction, output
+			),
+		)
+		return expand(result, inverse)
+
+	async def _async_embed_stream(
+		self,
+		text: list[str],
+		normalize: bool,
+		truncate: bool,
+		truncation_direction: TruncationDirection,
+		output: OutputFormat,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		await self._async_rate_limit(text, len(text))
+
 		async def gen():
 			for t in text:
 				yield tei_pb2.EmbedRequest(
@@ -163,6 +622,14 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 					truncation_direction=to_grpc_truncation(truncation_direction),
 				)
 
+		if output == OutputFormat.Numpy:
+			call = self._async_raw_stubs.EmbedStream(gen())
+			collector = ResultCollector(len(text), output)
+			for i in range(len(text)):
+				response = await call.read()
+				collector.add([i], read_embed_response(response)[None])
+			return collector.result()
+
 		call = self._async_stubs.embed.EmbedStream(gen())
 
 		responses = []
@@ -177,24 +644,34 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		text: EmbeddingInput,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[list[float]]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
 		self._ensure_model_type(ModelType.Embedding)
+		if output == OutputFormat.Numpy:
+			ensure_numpy()
 
 		if isinstance(text, str):
 			text = [text]
+		self._rate_limit(text, len(text))
 
-		requests = [
+		requests = (
 			tei_pb2.EmbedAllRequest(
 				inputs=t,
 				truncate=truncate,
 				truncation_direction=to_grpc_truncation(truncation_direction),
 			)
 			for t in text
-		]
+		)
+
+		if output == OutputFormat.Numpy:
+			return RaggedEmbeddings.from_arrays([
+				read_embed_all_response(r)
+				for r in self._raw_stubs.EmbedAllStream(requests)
+			])
 
 		return [
 			[t.embeddings for t in r.token_embeddings]
-			for r in self._stubs.embed.EmbedAllStream(iter(requests))
+			for r in self._stubs.embed.EmbedAllStream(requests)
 		]
 
 	async def async_embed_all(
@@ -202,11 +679,15 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		text: EmbeddingInput,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
-		self._ensure_model_type(ModelType.Embedding)
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
+		await self._async_ensure_model_type(ModelType.Embedding)
+		if output == OutputFormat.Numpy:
+			ensure_numpy()
 
 		if isinstance(text, str):
 			text = [text]
+		await self._async_rate_limit(text, len(text))
 
 		async def gen():
 			for t in text:
@@ -216,6 +697,14 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 					truncation_direction=to_grpc_truncation(truncation_direction),
 				)
 
+		if output == OutputFormat.Numpy:
+			call = self._async_raw_stubs.EmbedAllStream(gen())
+			responses = []
+			for i in range(len(text)):
+				response = await call.read()
+				responses.append(read_embed_all_response(response))
+			return RaggedEmbeddings.from_arrays(responses)
+
 		call = self._async_stubs.embed.EmbedAllStream(gen())
 
 		responses = []
@@ -225,11 +714,34 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 
 		return responses
 
+	@staticmethod
+	def _read_tokens(
+		response: tei_pb2.EncodeResponse, columnar: bool
+	) -> Union["TokenizationResult", ColumnarTokenizationResult]:
+		if columnar:
+			return ColumnarTokenizationResult.from_proto(response.tokens)
+
+		from tei_client.models import Token, TokenizationResult
+
+		return TokenizationResult(
+			tokens=[
+				Token(
+					id=t.id, text=t.text, special=t.special, start=t.start, stop=t.stop
+				)
+				for t in response.tokens
+			]
+		)
+
 	def tokenize(
-		self, text: str | list[str], add_special_tokens: bool = True
-	) -> list[TokenizationResult]:
+		self,
+		text: str | list[str],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
 		if isinstance(text, str):
 			text = [text]
+		text, inverse = deduplicate(text)
+		self._rate_limit(text, len(text))
 
 		requests = [
 			tei_pb2.EncodeRequest(
@@ -237,29 +749,24 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			)
 			for t in text
 		]
-		results = []
-		for r in self._stubs.tokenize.TokenizeStream(iter(requests)):
-			results.append(
-				TokenizationResult(
-					tokens=[
-						Token(
-							id=t.id,
-							text=t.text,
-							special=t.special,
-							start=t.start,
-							stop=t.stop,
-						)
-						for t in r.tokens
-					]
-				)
-			)
-		return results
+		results = [
+			GrpcClient._read_tokens(r, columnar)
+			for r in self._stubs.tokenize.TokenizeStream(iter(requests))
+		]
+		if add_special_tokens:
+			self._record_token_counts(text, results)
+		return expand(results, inverse)
 
 	async def async_tokenize(
-		self, text: str | list[str], add_special_tokens: bool = True
-	) -> list[TokenizationResult]:
+		self,
+		text: str | list[str],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
 		if isinstance(text, str):
 			text = [text]
+		text, inverse = deduplicate(text)
+		await self._async_rate_limit(text, len(text))
 
 		async def gen():
 			for t in text:
@@ -271,21 +778,10 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		results = []
 		for i in range(len(text)):
 			response = await call.read()
-			results.append(
-				TokenizationResult(
-					tokens=[
-						Token(
-							id=t.id,
-							text=t.text,
-							special=t.special,
-							start=t.start,
-							stop=t.stop,
-						)
-						for t in response.tokens
-					]
-				)
-			)
-		return results
+			results.append(GrpcClient._read_tokens(response, columnar))
+		if add_special_tokens:
+			self._record_token_counts(text, results)
+		return expand(results, inverse)
 
 	def decode(
 		self,
@@ -304,6 +800,7 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 				for ti in tokenized_input
 			]
 
+		self._rate_limit(tokenized_input, len(requests))
 		results = [r.text for r in self._stubs.tokenize.DecodeStream(iter(requests))]
 		if len(results) == 1:
 			return results[0]
@@ -326,6 +823,7 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 				for ti in tokenized_input
 			]
 
+		await self._async_rate_limit(tokenized_input, len(requests))
 		call = self._async_stubs.tokenize.DecodeStream(iter(requests))
 		results = []
 		for i in range(len(requests)):
@@ -381,18 +879,68 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 
 		return is_pair, requests
 
+	@staticmethod
+	def _read_predictions(
+		predictions: list[Any], output: OutputFormat
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		"""
+		The gRPC info carries no label vocabulary, the score matrix numbers the labels in order of appearance
+		"""
+		if output == OutputFormat.Numpy:
+			return ClassificationScores.from_rows(
+				[
+					[(p.label, p.score) for p in prediction]
+					for prediction in predictions
+				],
+				None,
+			)
+
+		from tei_client.models import ClassificationResult, ClassificationScore
+
+		return [
+			ClassificationResult(
+				scores=[
+					ClassificationScore(score=p.score, label=p.label)
+					for p in prediction
+				]
+			)
+			for prediction in predictions
+		]
+
+	@staticmethod
+	def _read_ranks(
+		ranks: Any, return_text: bool, size: int, output: OutputFormat
+	) -> Union["RerankResult", RerankScores]:
+		if output == OutputFormat.Numpy:
+			return RerankScores.from_ranks(
+				[(r.index, r.score, r.text) for r in ranks], return_text, size
+			)
+
+		from tei_client.models import RerankResult, RerankScore
+
+		return RerankResult(
+			ranks=[
+				RerankScore(score=r.score, index=r.index, text=r.text) for r in ranks
+			]
+		)
+
 	def classify(
 		self,
 		inputs: ClassificationInput,
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[ClassificationResult]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
 		self._ensure_model_type(ModelType.Classifier)
 
+		inverse = None
+		if isinstance(inputs, list):
+			inputs, inverse = deduplicate(inputs)
 		is_pair, requests = GrpcClient._prepare_classify_input(
 			inputs, raw_scores, truncate, truncation_direction
 		)
+		self._rate_limit([r.inputs for r in requests], len(requests))
 
 		stream = (
 			self._stubs.predict.PredictPairStream(iter(requests))
@@ -400,17 +948,8 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			else self._stubs.predict.PredictStream(iter(requests))
 		)
 
-		results = []
-		for response in stream:
-			results.append(
-				ClassificationResult(
-					scores=[
-						ClassificationScore(score=p.score, label=p.label)
-						for p in response.predictions
-					]
-				)
-			)
-		return results
+		predictions = [response.predictions for response in stream]
+		return expand(GrpcClient._read_predictions(predictions, output), inverse)
 
 	async def async_classify(
 		self,
@@ -418,12 +957,17 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[ClassificationResult]:
-		self._ensure_model_type(ModelType.Classifier)
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		await self._async_ensure_model_type(ModelType.Classifier)
 
+		inverse = None
+		if isinstance(inputs, list):
+			inputs, inverse = deduplicate(inputs)
 		is_pair, requests = GrpcClient._prepare_classify_input(
 			inputs, raw_scores, truncate, truncation_direction
 		)
+		await self._async_rate_limit([r.inputs for r in requests], len(requests))
 
 		async def gen():
 			for r in requests:
@@ -435,18 +979,11 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			else self._async_stubs.predict.PredictStream(gen())
 		)
 
-		results = []
+		predictions = []
 		for _ in range(len(requests)):
 			response = await stream.read()
-			results.append(
-				ClassificationResult(
-					scores=[
-						ClassificationScore(score=p.score, label=p.label)
-						for p in response.predictions
-					]
-				)
-			)
-		return results
+			predictions.append(response.predictions)
+		return expand(GrpcClient._read_predictions(predictions, output), inverse)
 
 	def rerank(
 		self,
@@ -456,7 +993,9 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> RerankResult:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+
 		self._ensure_model_type(ModelType.Reranker)
 
 		requests = tei_pb2.RerankRequest(
@@ -468,14 +1007,11 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			truncation_direction=to_grpc_truncation(truncation_direction),
 		)
 
+		self._rate_limit([[query, t] for t in texts])
 		results = self._stubs.rerank.Rerank(requests)
-		return RerankResult(
-			ranks=[
-				RerankScore(score=r.score, index=r.index, text=r.text)
-				for r in results.ranks
-			]
-		)
+		return GrpcClient._read_ranks(results.ranks, return_text, len(texts), output)
 
+	@single_flight
 	async def async_rerank(
 		self,
 		query: str,
@@ -484,8 +1020,10 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> RerankResult:
-		self._ensure_model_type(ModelType.Reranker)
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+
+		await self._async_ensure_model_type(ModelType.Reranker)
 
 		requests = tei_pb2.RerankRequest(
 			query=query,
@@ -496,10 +1034,6 @@ class GrpcClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			truncation_direction=to_grpc_truncation(truncation_direction),
 		)
 
+		await self._async_rate_limit([[query, t] for t in texts])
 		results = await self._async_stubs.rerank.Rerank(requests)
-		return RerankResult(
-			ranks=[
-				RerankScore(score=r.score, index=r.index, text=r.text)
-				for r in results.ranks
-			]
-		)
+		return GrpcClient._read_ranks(results.ranks, return_text, len(texts), output)
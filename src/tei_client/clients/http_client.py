@@ -1,45 +1,174 @@
+import asyncio
+import threading
+import time
 import httpx
-from typing import Any
+from typing import TYPE_CHECKING, Any, Optional, Union
 from tei_client.clients.base import (
+	EmbeddingCacheMixin,
 	ModelTypeMixin,
 	AsyncClientMixin,
 	ConcurrentClientMixin,
+	RateLimitMixin,
+	SingleFlightMixin,
+	single_flight,
 )
-from tei_client.models import (
+from tei_client.types import (
 	ClassificationInput,
-	ClassificationResult,
-	Info,
 	ModelType,
-	RerankResult,
-	TokenizationResult,
 	TruncationDirection,
-	get_model_metadata_prototype,
 	EmbeddingInput,
-	Token,
-	ClassificationScore,
-	RerankScore,
+	OutputFormat,
 )
+from tei_client.arrays import (
+	RaggedEmbeddings,
+	decode_embeddings,
+	decode_ragged_embeddings,
+)
+from tei_client.batching import (
+	ResultCollector,
+	deduplicate,
+	expand,
+	prepare_embedding_input,
+)
+from tei_client.breaker import CircuitBreaker
+from tei_client.cache import EmbeddingCache
+from tei_client.columnar import (
+	ClassificationScores,
+	ColumnarTokenizationResult,
+	RerankScores,
+	labels_from_metadata,
+)
+from tei_client.errors import TEIError
+from tei_client.info_cache import SHARED_INFO_CACHE, InfoCache
+from tei_client.limiter import AdaptiveLimiter
+from tei_client.ratelimit import RateLimiter
+from tei_client.retry import DEFAULT_RETRY_POLICY, RetryPolicy, parse_retry_after
+from tei_client.serialization import JsonBackend, default_backend
+
+if TYPE_CHECKING:
+	import numpy as np
+	from tei_client.models import (
+		ClassificationResult,
+		Info,
+		RerankResult,
+		TokenizationResult,
+	)
+
+JSON_HEADERS = {"content-type": "application/json"}
+# Keep every pooled connection alive, the httpx default of 20 keepalive connections
+# closes the surplus after each request under high concurrency and pays a new handshake for the next one.
+DEFAULT_LIMITS = httpx.Limits(
+	max_connections=100, max_keepalive_connections=100, keepalive_expiry=30.0
+)
+# Large batches take longer than the httpx default of 5 seconds to embed.
+# Waiting for a pooled connection is not bounded, the concurrency of the client already is.
+DEFAULT_TIMEOUT = httpx.Timeout(connect=5.0, read=60.0, write=60.0, pool=None)
+OVERLOAD_STATUSES = (429, 503)
 
 
-class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
-	def __init__(self, url: str, **kwargs) -> None:
-		self.client = httpx.Client(base_url=url, **kwargs)
-		self.async_client = httpx.AsyncClient(base_url=url, **kwargs)
+class HttpClient(
+	ConcurrentClientMixin,
+	AsyncClientMixin,
+	ModelTypeMixin,
+	EmbeddingCacheMixin,
+	SingleFlightMixin,
+	RateLimitMixin,
+):
+	__client: Optional[httpx.Client] = None
+	__async_client: Optional[httpx.AsyncClient] = None
+
+	def __init__(
+		self,
+		url: str,
+		max_concurrency: Optional[int] = None,
+		json_backend: Optional[JsonBackend] = None,
+		cache: Optional[EmbeddingCache] = None,
+		single_flight: bool = False,
+		circuit_breaker: Optional[CircuitBreaker] = None,
+		retry: Optional[RetryPolicy] = DEFAULT_RETRY_POLICY,
+		limiter: Optional[AdaptiveLimiter] = None,
+		rate_limiter: Optional[RateLimiter] = None,
+		model_type: Optional[ModelType] = None,
+		info_ttl: Optional[float] = None,
+		info_cache: Optional[InfoCache] = SHARED_INFO_CACHE,
+		http2: bool = False,
+		limits: httpx.Limits = DEFAULT_LIMITS,
+		timeout: Union[float, httpx.Timeout, None] = DEFAULT_TIMEOUT,
+		**kwargs,
+	) -> None:
+		"""
+		`max_concurrency` limits the number of batches kept in flight at once.
+		The async methods default to the `max_concurrent_requests` reported by the server.
+		`json_backend` defaults to the fastest installed JSON library (orjson, msgspec or the standard library).
+		`cache` serves repeated `embed` inputs without sending them to the server.
+		`single_flight` lets concurrent `async_embed` and `async_rerank` calls with identical arguments share one request.
+		`circuit_breaker` rejects requests while the server keeps failing, it probes the server with `health` by default.
+		`retry` retries requests rejected by an overloaded server and splits batches rejected as too large, `None` disables it.
+		Error responses raise a `TEIError`.
+		`limiter` adapts the number of async requests in flight to the latency and overload signals of the server.
+		`rate_limiter` caps the tokens and requests per second, blocking the sync methods and awaiting in the async ones.
+		`model_type` declares the type of the served model, so calls are not preceded by fetching the server info to check it.
+		`info_ttl` is the maximum age in seconds of the cached server info, older info is fetched again before it is used.
+		`info_cache` shares the server info between all clients of the same URL, `None` keeps it per client.
+		`http2` multiplexes concurrent requests over few connections, it requires the `h2` package (`tei-client[http2]`).
+		`limits` and `timeout` configure the connection pools and the per-phase timeouts of the sync and async client,
+		further `kwargs` are passed to `httpx.Client` and `httpx.AsyncClient`, which are created on first use.
+		"""
+		self.url = url
+		self._client_kwargs = dict(
+			base_url=url, http2=http2, limits=limits, timeout=timeout, **kwargs
+		)
+		self._client_lock = threading.Lock()
+		self.max_concurrency = max_concurrency
+		self.json = json_backend or default_backend()
+		self.cache = cache
+		self.single_flight = single_flight
+		self.circuit_breaker = circuit_breaker
+		self.retry = retry
+		self.limiter = limiter
+		self.rate_limiter = rate_limiter
+		self.declared_model_type = model_type
+		self.info_ttl = info_ttl
+		self.info_cache = info_cache
+		self.info_cache_key = url.rstrip("/")
+		if circuit_breaker is not None and circuit_breaker.probe is None:
+			circuit_breaker.probe = self.health
 		super().__init__()
 
+	@property
+	def client(self) -> httpx.Client:
+		if self.__client is None:
+			with self._client_lock:
+				if self.__client is None:
+					self.__client = httpx.Client(**self._client_kwargs)
+		return self.__client
+
+	@property
+	def async_client(self) -> httpx.AsyncClient:
+		if self.__async_client is None:
+			with self._client_lock:
+				if self.__async_client is None:
+					self.__async_client = httpx.AsyncClient(**self._client_kwargs)
+		return self.__async_client
+
 	def health(self) -> bool:
 		try:
-			result = self.client.get("/info")
+			result = self.client.get("/health")
 			return not result.is_error
 		except Exception:
 			return False
 
 	async def async_health(self) -> bool:
-		result = await self.async_client.get("/info")
-		return not result.is_error
+		try:
+			result = await self.async_client.get("/health")
+			return not result.is_error
+		except Exception:
+			return False
 
 	@staticmethod
-	def _into_info(json: dict[str, Any]) -> Info:
+	def _into_info(json: dict[str, Any]) -> "Info":
+		from tei_client.models import Info, get_model_metadata_prototype
+
 		model_type_field = json.pop("model_type")
 		model_type = next(iter(model_type_field.keys()))
 		metadata = model_type_field[model_type]
@@ -50,13 +179,245 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 
 		return Info(model_type=model_type, model_metadata=model_metadata, **json)
 
-	def info(self) -> Info:
-		result = self.client.get("/info")
-		return HttpClient._into_info(result.json())
+	def info(self) -> "Info":
+		result = self._send("GET", "/info")
+		return HttpClient._into_info(self._json(result))
+
+	async def async_info(self) -> "Info":
+		result = await self._async_send("GET", "/info")
+		return HttpClient._into_info(self._json(result))
 
-	async def async_info(self) -> Info:
-		result = await self.async_client.get("/info")
-		return HttpClient._into_info(result.json())
+	@staticmethod
+	def _raise_for_status(result: httpx.Response) -> None:
+		if not result.is_error:
+			return
+		try:
+			body = result.json()
+			message, error_type = body["error"], body.get("error_type")
+		except Exception:
+			message, error_type = result.text or result.reason_phrase, None
+		raise TEIError(
+			result.status_code,
+			message,
+			error_type,
+			parse_retry_after(result.headers.get("retry-after")),
+		)
+
+	def _send_once(self, method: str, route: str, **kwargs) -> httpx.Response:
+		"""
+		Sends a request through the circuit breaker, server errors and transport failures count as failures
+		"""
+		if self.circuit_breaker is None:
+			result = self.client.request(method, route, **kwargs)
+			HttpClient._raise_for_status(result)
+			return result
+
+		self.circuit_breaker.before_request()
+		start = time.perf_counter()
+		try:
+			result = self.client.request(method, route, **kwargs)
+		except Exception:
+			self.circuit_breaker.record(False, time.perf_counter() - start)
+			raise
+		except BaseException:
+			self.circuit_breaker.release()
+			raise
+		self.circuit_breaker.record(
+			result.status_code < 500, time.perf_counter() - start
+		)
+		HttpClient._raise_for_status(result)
+		return result
+
+	async def _async_request(self, method: str, route: str, **kwargs) -> httpx.Response:
+		"""
+		Sends a request through the circuit breaker, server errors and transport failures count as failures
+		"""
+		if self.circuit_breaker is None:
+			result = await self.async_client.request(method, route, **kwargs)
+			HttpClient._raise_for_status(result)
+			return result
+
+		self.circuit_breaker.before_request()
+		start = time.perf_counter()
+		try:
+			result = await self.async_client.request(method, route, **kwargs)
+		except Exception:
+			self.circuit_breaker.record(False, time.perf_counter() - start)
+			raise
+		except BaseException:
+			self.circuit_breaker.release()
+			raise
+		self.circuit_breaker.record(
+			result.status_code < 500, time.perf_counter() - start
+		)
+		HttpClient._raise_for_status(result)
+		return result
+
+	async def _async_send_once(
+		self, method: str, route: str, **kwargs
+	) -> httpx.Response:
+		"""
+		Sends a request within the limit of the adaptive concurrency limiter
+		"""
+		limiter = self.limiter
+		if limiter is None:
+			return await self._async_request(method, route, **kwargs)
+
+		if not limiter.seeded and route != "/info":
+			limiter.seed((await self.async_server_info()).max_concurrent_requests)
+		await limiter.acquire()
+		start = time.perf_counter()
+		try:
+			result = await self._async_request(method, route, **kwargs)
+		except TEIError as e:
+			limiter.release(
+				time.perf_counter() - start, e.status_code in OVERLOAD_STATUSES
+			)
+			raise
+		except httpx.TimeoutException:
+			limiter.release(time.perf_counter() - start, overloaded=True)
+			raise
+		except BaseException:
+			limiter.cancel()
+			raise
+		limiter.release(time.perf_counter() - start)
+		return result
+
+	def _send(self, method: str, route: str, **kwargs) -> httpx.Response:
+		"""
+		Sends a request and retries it while the server is overloaded
+		"""
+		attempt = 0
+		while True:
+			try:
+				return self._send_once(method, route, **kwargs)
+			except TEIError as e:
+				if self.retry is None or not self.retry.should_retry(
+					e.status_code, attempt
+				):
+					raise
+				time.sleep(self.retry.delay(attempt, e.retry_after))
+				attempt += 1
+
+	async def _async_send(self, method: str, route: str, **kwargs) -> httpx.Response:
+		"""
+		Sends a request and retries it while the server is overloaded
+		"""
+		attempt = 0
+		while True:
+			try:
+				return await self._async_send_once(method, route, **kwargs)
+			except TEIError as e:
+				if self.retry is None or not self.retry.should_retry(
+					e.status_code, attempt
+				):
+					raise
+				await asyncio.sleep(self.retry.delay(attempt, e.retry_after))
+				attempt += 1
+
+	def _should_split(self, error: TEIError, batch: list[int]) -> bool:
+		return self.retry is not None and self.retry.should_split(
+			error.status_code, len(batch), error.message
+		)
+
+	@staticmethod
+	def _payload_inputs(payload: dict[str, Any]) -> Any:
+		if "query" in payload:
+			return [[payload["query"], text] for text in payload["texts"]]
+		return payload.get("inputs", payload.get("ids", []))
+
+	def _post(self, route: str, payload: dict[str, Any]) -> httpx.Response:
+		self._rate_limit(HttpClient._payload_inputs(payload))
+		return self._send(
+			"POST", route, content=self.json.dumps(payload), headers=JSON_HEADERS
+		)
+
+	async def _async_post(self, route: str, payload: dict[str, Any]) -> httpx.Response:
+		await self._async_rate_limit(HttpClient._payload_inputs(payload))
+		return await self._async_send(
+			"POST", route, content=self.json.dumps(payload), headers=JSON_HEADERS
+		)
+
+	def _json(self, result: httpx.Response) -> Any:
+		return self.json.loads(result.content)
+
+	def _decode(
+		self, result: httpx.Response, output: OutputFormat, ragged: bool
+	) -> Any:
+		if output == OutputFormat.Numpy:
+			if ragged:
+				return decode_ragged_embeddings(result.content)
+			return decode_embeddings(result.content)
+		return self._json(result)
+
+	def _post_batched(
+		self,
+		route: str,
+		inputs: list,
+		payload: dict[str, Any],
+		output: OutputFormat = OutputFormat.List,
+		ragged: bool = False,
+	) -> Union[list[Any], "np.ndarray", RaggedEmbeddings]:
+		"""
+		Posts the inputs in batches that respect the server limits and returns the results in input order.
+		Batches the server rejects as too large are split in halves.
+		"""
+		collector = ResultCollector(len(inputs), output, ragged)
+
+		def post(batch: list[int]):
+			try:
+				result = self._post(
+					route, {"inputs": [inputs[i] for i in batch], **payload}
+				)
+			except TEIError as e:
+				if not self._should_split(e, batch):
+					raise
+				middle = len(batch) // 2
+				post(batch[:middle])
+				post(batch[middle:])
+				return
+			collector.add(batch, self._decode(result, output, ragged))
+
+		for batch in self._plan_batches(inputs):
+			post(batch)
+		return collector.result()
+
+	async def _async_post_batched(
+		self,
+		route: str,
+		inputs: list,
+		payload: dict[str, Any],
+		output: OutputFormat = OutputFormat.List,
+		ragged: bool = False,
+	) -> Union[list[Any], "np.ndarray", RaggedEmbeddings]:
+		"""
+		Posts the inputs in concurrent batches that respect the server limits and returns the results in input order.
+		Batches the server rejects as too large are split in halves.
+		"""
+		info = await self.async_server_info()
+		collector = ResultCollector(len(inputs), output, ragged)
+		semaphore = asyncio.Semaphore(
+			self.max_concurrency or info.max_concurrent_requests or 1
+		)
+
+		async def post(batch: list[int]):
+			try:
+				async with semaphore:
+					result = await self._async_post(
+						route, {"inputs": [inputs[i] for i in batch], **payload}
+					)
+			except TEIError as e:
+				if not self._should_split(e, batch):
+					raise
+				middle = len(batch) // 2
+				await asyncio.gather(post(batch[:middle]), post(batch[middle:]))
+				return
+			collector.add(batch, self._decode(result, output, ragged))
+
+		await asyncio.gather(
+			*(post(batch) for batch in self._plan_batches(inputs, info))
+		)
+		return collector.result()
 
 	def embed(
 		self,
@@ -64,45 +425,60 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
 		self._ensure_model_type(ModelType.Embedding)
 
-		if isinstance(text, str):
-			text = [text]
-
-		result = self.client.post(
-			"/embed",
-			json={
-				"inputs": text,
-				"normalize": normalize,
-				"truncate": truncate,
-				"truncation_direction": truncation_direction.value,
-			},
+		inputs, inverse = deduplicate(prepare_embedding_input(text))
+		result = self._cached_embed(
+			inputs,
+			normalize,
+			truncate,
+			truncation_direction,
+			output,
+			lambda inputs: self._post_batched(
+				"/embed",
+				inputs,
+				{
+					"normalize": normalize,
+					"truncate": truncate,
+					"truncation_direction": truncation_direction.value,
+				},
+				output,
+			),
 		)
-		return result.json()
+		return expand(result, inverse)
 
+	@single_flight
 	async def async_embed(
 		self,
 		text: EmbeddingInput,
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
-		self._ensure_model_type(ModelType.Embedding)
-
-		if isinstance(text, str):
-			text = [text]
-
-		result = await self.async_client.post(
-			"/embed",
-			json={
-				"inputs": text,
-				"normalize": normalize,
-				"truncate": truncate,
-				"truncation_direction": truncation_direction.value,
-			},
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		await self._async_ensure_model_type(ModelType.Embedding)
+
+		inputs, inverse = deduplicate(prepare_embedding_input(text))
+		result = await self._async_cached_embed(
+			inputs,
+			normalize,
+			truncate,
+			truncation_direction,
+			output,
+			lambda inputs: self._async_post_batched(
+				"/embed",
+				inputs,
+				{
+					"normalize": normalize,
+					"truncate": truncate,
+					"truncation_direction": truncation_direction.value,
+				},
+				output,
+			),
 		)
-		return result.json()
+		return expand(result, inverse)
 
 	def embed_all(
 		self,
@@ -110,22 +486,21 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[list[float]]]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
 		self._ensure_model_type(ModelType.Embedding)
 
-		if isinstance(text, str):
-			text = [text]
-
-		result = self.client.post(
+		return self._post_batched(
 			"/embed_all",
-			json={
-				"inputs": text,
+			prepare_embedding_input(text),
+			{
 				"normalize": normalize,
 				"truncate": truncate,
 				"truncation_direction": truncation_direction.value,
 			},
+			output,
+			ragged=True,
 		)
-		return result.json()
 
 	async def async_embed_all(
 		self,
@@ -133,74 +508,93 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		normalize: bool = True,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[list[float]]:
-		self._ensure_model_type(ModelType.Embedding)
-
-		if isinstance(text, str):
-			text = [text]
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
+		await self._async_ensure_model_type(ModelType.Embedding)
 
-		result = await self.async_client.post(
+		return await self._async_post_batched(
 			"/embed_all",
-			json={
-				"inputs": text,
+			prepare_embedding_input(text),
+			{
 				"normalize": normalize,
 				"truncate": truncate,
 				"truncation_direction": truncation_direction.value,
 			},
+			output,
+			ragged=True,
 		)
-		return result.json()
+
+	@staticmethod
+	def _read_tokens(
+		json: list[list[dict[str, Any]]], columnar: bool
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
+		if columnar:
+			return [ColumnarTokenizationResult.from_json(r) for r in json]
+
+		from tei_client.models import Token, TokenizationResult
+
+		return [
+			TokenizationResult(tokens=[Token.model_validate(t) for t in r])
+			for r in json
+		]
 
 	def tokenize(
-		self, text: str | list[str], add_special_tokens: bool = True
-	) -> list[TokenizationResult]:
+		self,
+		text: str | list[str],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
 		if isinstance(text, str):
 			text = [text]
 
-		result = self.client.post(
-			"/tokenize", json={"inputs": text, "add_special_tokens": add_special_tokens}
+		text, inverse = deduplicate(text)
+		result = self._post(
+			"/tokenize", {"inputs": text, "add_special_tokens": add_special_tokens}
 		)
-		results = result.json()
-		return [
-			TokenizationResult(tokens=[Token.model_validate(t) for t in r])
-			for r in results
-		]
+		results = HttpClient._read_tokens(self._json(result), columnar)
+		if add_special_tokens:
+			self._record_token_counts(text, results)
+		return expand(results, inverse)
 
 	async def async_tokenize(
-		self, text: str | list[str], add_special_tokens: bool = True
-	) -> list[TokenizationResult]:
+		self,
+		text: str | list[str],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
 		if isinstance(text, str):
 			text = [text]
 
-		result = await self.async_client.post(
-			"/tokenize", json={"inputs": text, "add_special_tokens": add_special_tokens}
+		text, inverse = deduplicate(text)
+		result = await self._async_post(
+			"/tokenize", {"inputs": text, "add_special_tokens": add_special_tokens}
 		)
-		results = result.json()
-		return [
-			TokenizationResult(tokens=[Token.model_validate(t) for t in r])
-			for r in results
-		]
+		results = HttpClient._read_tokens(self._json(result), columnar)
+		if add_special_tokens:
+			self._record_token_counts(text, results)
+		return expand(results, inverse)
 
 	def decode(
 		self,
 		tokenized_input: list[int] | list[list[int]],
 		skip_special_tokens: bool = True,
 	) -> str:
-		result = self.client.post(
+		result = self._post(
 			"/decode",
-			json={"ids": tokenized_input, "skip_special_tokens": skip_special_tokens},
+			{"ids": tokenized_input, "skip_special_tokens": skip_special_tokens},
 		)
-		return result.json()
+		return self._json(result)
 
 	async def async_decode(
 		self,
 		tokenized_input: list[int] | list[list[int]],
 		skip_special_tokens: bool = True,
 	) -> str:
-		result = await self.async_client.post(
+		result = await self._async_post(
 			"/decode",
-			json={"ids": tokenized_input, "skip_special_tokens": skip_special_tokens},
+			{"ids": tokenized_input, "skip_special_tokens": skip_special_tokens},
 		)
-		return result.json()
+		return self._json(result)
 
 	@staticmethod
 	def _prepare_classify_input(inputs: ClassificationInput) -> ClassificationInput:
@@ -215,20 +609,32 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 
 		return inputs
 
+	@staticmethod
+	def _classification_scores(
+		results: list[list[dict[str, Any]]], metadata: Any
+	) -> ClassificationScores:
+		return ClassificationScores.from_rows(
+			[[(s["label"], s["score"]) for s in r] for r in results],
+			labels_from_metadata(metadata),
+		)
+
 	def classify(
 		self,
 		inputs: ClassificationInput,
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[ClassificationResult]:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		from tei_client.models import ClassificationResult, ClassificationScore
+
 		self._ensure_model_type(ModelType.Classifier)
 
-		inputs = HttpClient._prepare_classify_input(inputs)
+		inputs, inverse = deduplicate(HttpClient._prepare_classify_input(inputs))
 
-		result = self.client.post(
+		result = self._post(
 			"/predict",
-			json={
+			{
 				"inputs": inputs,
 				"raw_scores": raw_scores,
 				"truncate": truncate,
@@ -236,13 +642,23 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			},
 		)
 
-		results = result.json()
-		return [
-			ClassificationResult(
-				scores=[ClassificationScore.model_validate(s) for s in r]
+		results = self._json(result)
+		if output == OutputFormat.Numpy:
+			return expand(
+				HttpClient._classification_scores(
+					results, self.server_info.server_model_metadata
+				),
+				inverse,
 			)
-			for r in results
-		]
+		return expand(
+			[
+				ClassificationResult(
+					scores=[ClassificationScore.model_validate(s) for s in r]
+				)
+				for r in results
+			],
+			inverse,
+		)
 
 	async def async_classify(
 		self,
@@ -250,14 +666,17 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> list[ClassificationResult]:
-		self._ensure_model_type(ModelType.Classifier)
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		from tei_client.models import ClassificationResult, ClassificationScore
 
-		inputs = HttpClient._prepare_classify_input(inputs)
+		await self._async_ensure_model_type(ModelType.Classifier)
 
-		result = await self.async_client.post(
+		inputs, inverse = deduplicate(HttpClient._prepare_classify_input(inputs))
+
+		result = await self._async_post(
 			"/predict",
-			json={
+			{
 				"inputs": inputs,
 				"raw_scores": raw_scores,
 				"truncate": truncate,
@@ -265,13 +684,23 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 			},
 		)
 
-		results = result.json()
-		return [
-			ClassificationResult(
-				scores=[ClassificationScore.model_validate(s) for s in r]
+		results = self._json(result)
+		if output == OutputFormat.Numpy:
+			return expand(
+				HttpClient._classification_scores(
+					results, (await self.async_server_info()).server_model_metadata
+				),
+				inverse,
 			)
-			for r in results
-		]
+		return expand(
+			[
+				ClassificationResult(
+					scores=[ClassificationScore.model_validate(s) for s in r]
+				)
+				for r in results
+			],
+			inverse,
+		)
 
 	def rerank(
 		self,
@@ -281,12 +710,15 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> RerankResult:
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+		from tei_client.models import RerankResult, RerankScore
+
 		self._ensure_model_type(ModelType.Reranker)
 
-		result = self.client.post(
+		result = self._post(
 			"/rerank",
-			json={
+			{
 				"query": query,
 				"texts": texts,
 				"return_text": return_text,
@@ -295,9 +727,16 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 				"truncation_direction": truncation_direction,
 			},
 		)
-		results = result.json()
+		results = self._json(result)
+		if output == OutputFormat.Numpy:
+			return RerankScores.from_ranks(
+				[(r["index"], r["score"], r.get("text")) for r in results],
+				return_text,
+				len(texts),
+			)
 		return RerankResult(ranks=[RerankScore.model_validate(r) for r in results])
 
+	@single_flight
 	async def async_rerank(
 		self,
 		query: str,
@@ -306,12 +745,15 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 		raw_scores: bool = False,
 		truncate: bool = False,
 		truncation_direction: TruncationDirection = TruncationDirection.Right,
-	) -> RerankResult:
-		self._ensure_model_type(ModelType.Reranker)
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+		from tei_client.models import RerankResult, RerankScore
+
+		await self._async_ensure_model_type(ModelType.Reranker)
 
-		result = await self.async_client.post(
+		result = await self._async_post(
 			"/rerank",
-			json={
+			{
 				"query": query,
 				"texts": texts,
 				"return_text": return_text,
@@ -320,5 +762,11 @@ class HttpClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
 				"truncation_direction": truncation_direction,
 			},
 		)
-		results = result.json()
+		results = self._json(result)
+		if output == OutputFormat.Numpy:
+			return RerankScores.from_ranks(
+				[(r["index"], r["score"], r.get("text")) for r in results],
+				return_text,
+				len(texts),
+			)
 		return RerankResult(ranks=[RerankScore.model_validate(r) for r in results])
@@ -0,0 +1,428 @@
+import asyncio
+import functools
+import inspect
+from typing import TYPE_CHECKING, Any, Callable, Optional, Sequence, Union
+from tei_client.balancing import BalancingPolicy, Endpoint, LoadBalancer
+from tei_client.breaker import CircuitBreaker
+from tei_client.columnar import (
+	ClassificationScores,
+	ColumnarTokenizationResult,
+	RerankScores,
+)
+from tei_client.clients.base import (
+	AsyncClientMixin,
+	ConcurrentClientMixin,
+	ModelTypeMixin,
+)
+from tei_client.types import (
+	ClassificationInput,
+	EmbeddingInput,
+	OutputFormat,
+	TruncationDirection,
+)
+from tei_client.arrays import RaggedEmbeddings
+from tei_client.batching import ResultCollector, prepare_embedding_input
+
+if TYPE_CHECKING:
+	import numpy as np
+	from tei_client.models import (
+		ClassificationResult,
+		Info,
+		RerankResult,
+		TokenizationResult,
+	)
+
+
+# Parameters which are only passed on to clients that accept them, the gRPC `embed_all` has no `normalize`
+OPTIONAL_PARAMETERS = ("normalize",)
+
+
+@functools.lru_cache(maxsize=None)
+def _accepts(client_type: type, method: str, parameter: str) -> bool:
+	return parameter in inspect.signature(getattr(client_type, method)).parameters
+
+
+def _supported(client: Any, method: str, kwargs: dict[str, Any]) -> dict[str, Any]:
+	return {
+		name: value
+		for name, value in kwargs.items()
+		if name not in OPTIONAL_PARAMETERS or _accepts(type(client), method, name)
+	}
+
+
+class PooledClient(ConcurrentClientMixin, AsyncClientMixin, ModelTypeMixin):
+	"""
+	Client which spreads requests over several replicas of the same TEI server.
+	Every call is routed to one endpoint chosen by the balancing policy.
+	Embeddings of more inputs than fit into one batch are split and every batch is routed separately,
+	as are the chunks of the bulk and streaming methods.
+	Endpoints whose circuit breaker is open are skipped while any other endpoint is available.
+	"""
+
+	def __init__(
+		self,
+		clients: Sequence[Union[ConcurrentClientMixin, AsyncClientMixin]],
+		policy: Union[BalancingPolicy, LoadBalancer] = BalancingPolicy.RoundRobin,
+		max_concurrency: Optional[int] = None,
+		names: Optional[Sequence[str]] = None,
+	) -> None:
+		"""
+		`policy` is a `BalancingPolicy` or a custom `LoadBalancer`.
+		`max_concurrency` limits the number of chunks the bulk methods keep in flight at once.
+		"""
+		if not clients:
+			raise ValueError("A pooled client needs at least one endpoint")
+		names = names or [str(i) for i in range(len(clients))]
+		self.endpoints = [
+			Endpoint(client, name) for client, name in zip(clients, names)
+		]
+		self.balancer = (
+			policy
+			if isinstance(policy, LoadBalancer)
+			else BalancingPolicy(policy).create()
+		)
+		self.max_concurrency = max_concurrency
+		super().__init__()
+
+	@classmethod
+	def from_urls(
+		cls,
+		urls: Sequence[str],
+		policy: Union[BalancingPolicy, LoadBalancer] = BalancingPolicy.RoundRobin,
+		max_concurrency: Optional[int] = None,
+		circuit_breaker: Optional[Callable[[], CircuitBreaker]] = None,
+		**kwargs,
+	) -> "PooledClient":
+		"""
+		Creates a pool of `HttpClient`s, `kwargs` are passed to every client.
+		`circuit_breaker` creates the circuit breaker of every endpoint, e.g. `CircuitBreaker`.
+		"""
+		from tei_client.clients.http_client import HttpClient
+
+		return cls(
+			[
+				HttpClient(
+					url,
+					circuit_breaker=circuit_breaker() if circuit_breaker else None,
+					**kwargs,
+				)
+				for url in urls
+			],
+			policy,
+			max_concurrency,
+			names=urls,
+		)
+
+	@classmethod
+	def from_targets(
+		cls,
+		targets: Sequence[str],
+		policy: Union[BalancingPolicy, LoadBalancer] = BalancingPolicy.RoundRobin,
+		max_concurrency: Optional[int] = None,
+		circuit_breaker: Optional[Callable[[], CircuitBreaker]] = None,
+		**kwargs,
+	) -> "PooledClient":
+		"""
+		Creates a pool of `GrpcClient`s, `kwargs` are passed to every client.
+		`circuit_breaker` creates the circuit breaker of every endpoint, e.g. `CircuitBreaker`.
+		"""
+		from tei_client.clients.grpc_client import GrpcClient
+
+		return cls(
+			[
+				GrpcClient(
+					target,
+					circuit_breaker=circuit_breaker() if circuit_breaker else None,
+					**kwargs,
+				)
+				for target in targets
+			],
+			policy,
+			max_concurrency,
+			names=targets,
+		)
+
+	def _select(self) -> Endpoint:
+		available = [endpoint for endpoint in self.endpoints if endpoint.available]
+		return self.balancer.select(available or self.endpoints)
+
+	def _call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+		endpoint = self._select()
+		kwargs = _supported(endpoint.client, method, kwargs)
+		with endpoint.track():
+			return getattr(endpoint.client, method)(*args, **kwargs)
+
+	async def _async_call(self, method: str, *args: Any, **kwargs: Any) -> Any:
+		endpoint = self._select()
+		kwargs = _supported(endpoint.client, method, kwargs)
+		with endpoint.track():
+			return await getattr(endpoint.client, method)(*args, **kwargs)
+
+	def _call_batched(
+		self,
+		method: str,
+		text: EmbeddingInput,
+		output: OutputFormat,
+		ragged: bool = False,
+		**kwargs: Any,
+	) -> Any:
+		"""
+		Routes every batch of the inputs to an endpoint of its own and merges the results in input order
+		"""
+		inputs = prepare_embedding_input(text)
+		batches = self._plan_batches(inputs)
+		if len(batches) <= 1:
+			return self._call(method, inputs, output=output, **kwargs)
+
+		collector = ResultCollector(len(inputs), output, ragged)
+		for batch in batches:
+			collector.add(
+				batch,
+				self._call(method, [inputs[i] for i in batch], output=output, **kwargs),
+			)
+		return collector.result()
+
+	async def _async_call_batched(
+		self,
+		method: str,
+		text: EmbeddingInput,
+		output: OutputFormat,
+		ragged: bool = False,
+		**kwargs: Any,
+	) -> Any:
+		"""
+		Routes every batch of the inputs to an endpoint of its own concurrently and merges the results in input order
+		"""
+		inputs = prepare_embedding_input(text)
+		batches = self._plan_batches(inputs, await self.async_server_info())
+		if len(batches) <= 1:
+			return await self._async_call(method, inputs, output=output, **kwargs)
+
+		results = await asyncio.gather(
+			*(
+				self._async_call(
+					method, [inputs[i] for i in batch], output=output, **kwargs
+				)
+				for batch in batches
+			)
+		)
+		collector = ResultCollector(len(inputs), output, ragged)
+		for batch, result in zip(batches, results):
+			collector.add(batch, result)
+		return collector.result()
+
+	def close(self) -> None:
+		super().close()
+		for endpoint in self.endpoints:
+			endpoint.client.close()
+
+	def health(self) -> bool:
+		"""
+		True if at least one endpoint is healthy
+		"""
+		return any(endpoint.client.health() for endpoint in self.endpoints)
+
+	async def async_health(self) -> bool:
+		"""
+		True if at least one endpoint is healthy
+		"""
+		for endpoint in self.endpoints:
+			try:
+				if await endpoint.client.async_health():
+					return True
+			except Exception:
+				continue
+		return False
+
+	def info(self) -> "Info":
+		return self._call("info")
+
+	async def async_info(self) -> "Info":
+		return await self._async_call("async_info")
+
+	def embed(
+		self,
+		text: EmbeddingInput,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		return self._call_batched(
+			"embed",
+			text,
+			output,
+			normalize=normalize,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+		)
+
+	async def async_embed(
+		self,
+		text: EmbeddingInput,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[float]], "np.ndarray"]:
+		return await self._async_call_batched(
+			"async_embed",
+			text,
+			output,
+			normalize=normalize,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+		)
+
+	def embed_all(
+		self,
+		text: EmbeddingInput,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
+		return self._call_batched(
+			"embed_all",
+			text,
+			output,
+			ragged=True,
+			normalize=normalize,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+		)
+
+	async def async_embed_all(
+		self,
+		text: EmbeddingInput,
+		normalize: bool = True,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list[list[list[float]]], RaggedEmbeddings]:
+		return await self._async_call_batched(
+			"async_embed_all",
+			text,
+			output,
+			ragged=True,
+			normalize=normalize,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+		)
+
+	def tokenize(
+		self,
+		text: Union[str, list[str]],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
+		return self._call(
+			"tokenize", text, add_special_tokens=add_special_tokens, columnar=columnar
+		)
+
+	async def async_tokenize(
+		self,
+		text: Union[str, list[str]],
+		add_special_tokens: bool = True,
+		columnar: bool = False,
+	) -> Union[list["TokenizationResult"], list[ColumnarTokenizationResult]]:
+		return await self._async_call(
+			"async_tokenize",
+			text,
+			add_special_tokens=add_special_tokens,
+			columnar=columnar,
+		)
+
+	def decode(
+		self,
+		tokenized_input: Union[list[int], list[list[int]]],
+		skip_special_tokens: bool = True,
+	) -> str:
+		return self._call(
+			"decode", tokenized_input, skip_special_tokens=skip_special_tokens
+		)
+
+	async def async_decode(
+		self,
+		tokenized_input: Union[list[int], list[list[int]]],
+		skip_special_tokens: bool = True,
+	) -> str:
+		return await self._async_call(
+			"async_decode", tokenized_input, skip_special_tokens=skip_special_tokens
+		)
+
+	def classify(
+		self,
+		inputs: ClassificationInput,
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		return self._call(
+			"classify",
+			inputs,
+			raw_scores=raw_scores,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+			output=output,
+		)
+
+	async def async_classify(
+		self,
+		inputs: ClassificationInput,
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union[list["ClassificationResult"], ClassificationScores]:
+		return await self._async_call(
+			"async_classify",
+			inputs,
+			raw_scores=raw_scores,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+			output=output,
+		)
+
+	def rerank(
+		self,
+		query: str,
+		texts: list[str],
+		return_text: bool = False,
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+		return self._call(
+			"rerank",
+			query,
+			texts,
+			return_text=return_text,
+			raw_scores=raw_scores,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+			output=output,
+		)
+
+	async def async_rerank(
+		self,
+		query: str,
+		texts: list[str],
+		return_text: bool = False,
+		raw_scores: bool = False,
+		truncate: bool = False,
+		truncation_direction: TruncationDirection = TruncationDirection.Right,
+		output: OutputFormat = OutputFormat.List,
+	) -> Union["RerankResult", RerankScores]:
+		return await self._async_call(
+			"async_rerank",
+			query,
+			texts,
+			return_text=return_text,
+			raw_scores=raw_scores,
+			truncate=truncate,
+			truncation_direction=truncation_direction,
+			output=output,
+		)
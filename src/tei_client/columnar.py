@@ -0,0 +1,295 @@
+from array import array
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Optional, Sequence, Union
+
+from tei_client.arrays import ensure_numpy
+
+if TYPE_CHECKING:
+	import numpy as np
+	from tei_client.models import ClassificationResult, RerankResult, TokenizationResult
+
+# start/stop of a token without offsets
+NO_OFFSET = -1
+
+
+def _offset(value: Optional[int]) -> int:
+	return NO_OFFSET if value is None else value
+
+
+class ColumnarTokenizationResult:
+	"""
+	Tokens of one input stored as compact arrays: `ids`, `special` flags and `start`/`stop` offsets (`-1` if unknown).
+	No object is created per token, `texts` is a list of strings or, for gRPC, read from the response once accessed.
+	"""
+
+	__slots__ = ("ids", "special", "start", "stop", "_texts", "_read_texts")
+
+	def __init__(
+		self,
+		ids: array,
+		special: array,
+		start: array,
+		stop: array,
+		texts: Union[list[str], Callable[[], list[str]]],
+	) -> None:
+		self.ids = ids
+		self.special = special
+		self.start = start
+		self.stop = stop
+		self._texts: Optional[list[str]] = None if callable(texts) else texts
+		self._read_texts = texts if callable(texts) else None
+
+	@classmethod
+	def from_json(cls, tokens: list[dict[str, Any]]) -> "ColumnarTokenizationResult":
+		"""
+		Reads the tokens of one input of a `/tokenize` response, the token dicts are not kept
+		"""
+		return cls(
+			array("q", [t["id"] for t in tokens]),
+			array("b", [t["special"] for t in tokens]),
+			array("q", [_offset(t.get("start")) for t in tokens]),
+			array("q", [_offset(t.get("stop")) for t in tokens]),
+			[t["text"] for t in tokens],
+		)
+
+	@classmethod
+	def from_proto(cls, tokens: Iterable[Any]) -> "ColumnarTokenizationResult":
+		"""
+		Reads the `SimpleToken`s of an `EncodeResponse`, the texts are only read once accessed
+		"""
+		return cls(
+			array("q", [t.id for t in tokens]),
+			array("b", [t.special for t in tokens]),
+			array("q", [t.start for t in tokens]),
+			array("q", [t.stop for t in tokens]),
+			lambda: [t.text for t in tokens],
+		)
+
+	def __len__(self) -> int:
+		return len(self.ids)
+
+	def __repr__(self) -> str:
+		return f"ColumnarTokenizationResult(ids={self.ids.tolist()})"
+
+	def get_ids(self) -> array:
+		"""
+		The token ids, without copying
+		"""
+		return self.ids
+
+	@property
+	def texts(self) -> list[str]:
+		if self._texts is None:
+			self._texts = self._read_texts()
+			self._read_texts = None
+		return self._texts
+
+	def to_model(self) -> "TokenizationResult":
+		"""
+		Converts the tokens into a pydantic `TokenizationResult`
+		"""
+		from tei_client.models import Token, TokenizationResult
+
+		return TokenizationResult(
+			tokens=[
+				Token(
+					id=id,
+					text=text,
+					special=bool(special),
+					start=None if start == NO_OFFSET else start,
+					stop=None if stop == NO_OFFSET else stop,
+				)
+				for id, text, special, start, stop in zip(
+					self.ids, self.texts, self.special, self.start, self.stop
+				)
+			]
+		)
+
+
+def labels_from_metadata(metadata: Any) -> Optional[list[str]]:
+	"""
+	The labels of a classifier ordered by id, from its `ClassifierMetadata.id2label`
+	"""
+	id2label = getattr(metadata, "id2label", None)
+	if not id2label:
+		return None
+	return [id2label[i] for i in sorted(id2label, key=int)]
+
+
+class ClassificationScores:
+	"""
+	Scores of several inputs as a float32 `(n_inputs, n_labels)` matrix, column `j` holds the scores of `labels[j]`.
+	Labels the server did not return for an input are scored NaN.
+	"""
+
+	def __init__(self, scores: "np.ndarray", labels: list[str]) -> None:
+		self.scores = scores
+		self.labels = labels
+
+	@classmethod
+	def from_rows(
+		cls, rows: Sequence[Iterable[tuple[str, float]]], labels: Optional[list[str]]
+	) -> "ClassificationScores":
+		"""
+		Builds the matrix from `(label, score)` pairs per input.
+		Without a label vocabulary the labels are numbered in order of appearance.
+		"""
+		np = ensure_numpy()
+		labels = list(labels or [])
+		columns = {label: j for j, label in enumerate(labels)}
+		cells = []
+		for i, row in enumerate(rows):
+			for label, score in row:
+				j = columns.get(label)
+				if j is None:
+					j = columns[label] = len(labels)
+					labels.append(label)
+				cells.append((i, j, score))
+
+		scores = np.full((len(rows), len(labels)), np.nan, dtype=np.float32)
+		if cells:
+			i, j, values = zip(*cells)
+			scores[i, j] = values
+		return cls(scores, labels)
+
+	def __len__(self) -> int:
+		return len(self.scores)
+
+	def __repr__(self) -> str:
+		return f"ClassificationScores({len(self)} inputs, labels={self.labels})"
+
+	def __getitem__(self, rows: Any) -> "ClassificationScores":
+		"""
+		Selects rows by a slice or an index list, the labels are shared
+		"""
+		return ClassificationScores(self.scores[rows], self.labels)
+
+	def argmax(self) -> "np.ndarray":
+		"""
+		The column of the best label of every input
+		"""
+		return ensure_numpy().nanargmax(self.scores, axis=1)
+
+	def predicted_labels(self) -> list[str]:
+		return [self.labels[j] for j in self.argmax()]
+
+	def top_k(self, k: int) -> tuple["np.ndarray", "np.ndarray"]:
+		"""
+		The columns and scores of the `k` best labels of every input, best first
+		"""
+		np = ensure_numpy()
+		k = min(k, self.scores.shape[1])
+		scores = np.nan_to_num(self.scores, nan=-np.inf)
+		columns = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+		top = np.take_along_axis(scores, columns, axis=1)
+		order = np.argsort(-top, axis=1, kind="stable")
+		return (
+			np.take_along_axis(columns, order, axis=1),
+			np.take_along_axis(top, order, axis=1),
+		)
+
+	def to_model(self) -> list["ClassificationResult"]:
+		"""
+		Converts the scores into pydantic `ClassificationResult`s, ordered by descending score like the server does.
+		The scores keep the float32 precision of the matrix.
+		"""
+		from tei_client.models import ClassificationResult, ClassificationScore
+
+		columns, scores = self.top_k(len(self.labels))
+		return [
+			ClassificationResult(
+				scores=[
+					ClassificationScore(score=score, label=self.labels[j])
+					for j, score in zip(row_columns.tolist(), row_scores.tolist())
+					if score != float("-inf")
+				]
+			)
+			for row_columns, row_scores in zip(columns, scores)
+		]
+
+
+class RerankScores:
+	"""
+	Reranked texts as parallel arrays ordered by descending score:
+	`index` holds the position of the text in the request and `score` its float32 score.
+	`text` is only set if the texts were requested, `size` is the number of texts in the request.
+	"""
+
+	def __init__(
+		self,
+		index: "np.ndarray",
+		score: "np.ndarray",
+		text: Optional[list[str]] = None,
+		size: Optional[int] = None,
+	) -> None:
+		self.index = index
+		self.score = score
+		self.text = text
+		self.size = len(index) if size is None else size
+
+	@classmethod
+	def from_ranks(
+		cls,
+		ranks: Sequence[tuple[int, float, Optional[str]]],
+		return_text: bool,
+		size: Optional[int] = None,
+	) -> "RerankScores":
+		"""
+		Builds the arrays from `(index, score, text)` triples, which are sorted by descending score
+		"""
+		np = ensure_numpy()
+		index = np.fromiter((r[0] for r in ranks), dtype=np.int64, count=len(ranks))
+		score = np.fromiter((r[1] for r in ranks), dtype=np.float32, count=len(ranks))
+		order = np.argsort(-score, kind="stable")
+		text = [ranks[i][2] for i in order] if return_text else None
+		return cls(index[order], score[order], text, size)
+
+	def __len__(self) -> int:
+		return len(self.index)
+
+	def __repr__(self) -> str:
+		return f"RerankScores(index={self.index.tolist()})"
+
+	def argmax(self) -> int:
+		"""
+		The position of the best text in the request
+		"""
+		return int(self.index[0])
+
+	def top_k(self, k: int) -> "RerankScores":
+		"""
+		The `k` best texts
+		"""
+		return RerankScores(
+			self.index[:k],
+			self.score[:k],
+			None if self.text is None else self.text[:k],
+			self.size,
+		)
+
+	def scores_by_index(self) -> "np.ndarray":
+		"""
+		The scores in the order of the texts in the request, NaN for texts without a rank
+		"""
+		np = ensure_numpy()
+		scores = np.full(self.size, np.nan, dtype=np.float32)
+		scores[self.index] = self.score
+		return scores
+
+	def to_model(self) -> "RerankResult":
+		"""
+		Converts the arrays into a pydantic `RerankResult`, the scores keep their float32 precision
+		"""
+		from tei_client.models import RerankResult, RerankScore
+
+		return RerankResult(
+			ranks=[
+				RerankScore(
+					index=index,
+					score=score,
+					text=None if self.text is None else self.text[i],
+				)
+				for i, (index, score) in enumerate(
+					zip(self.index.tolist(), self.score.tolist())
+				)
+			]
+		)
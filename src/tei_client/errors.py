@@ -0,0 +1,51 @@
+from typing import Any, NamedTuple, Optional
+
+
+class ChunkFailure(NamedTuple):
+	indices: list[int]
+	error: BaseException
+
+
+class ChunkedRequestError(Exception):
+	"""
+	Raised when some chunks of a bulk request failed.
+	`results` holds the results of the successful chunks in input order and `None` for failed inputs.
+	"""
+
+	def __init__(self, failures: list[ChunkFailure], results: list[Any]) -> None:
+		self.failures = failures
+		self.results = results
+		super().__init__(
+			f"{len(failures)} chunk(s) failed, first error: {failures[0].error!r}"
+		)
+
+
+class CircuitOpenError(Exception):
+	"""
+	Raised instead of sending a request to an endpoint whose circuit breaker is open
+	"""
+
+	def __init__(self, retry_after: float) -> None:
+		self.retry_after = retry_after
+		super().__init__(
+			f"Circuit breaker is open, the endpoint is probed again in {retry_after:.1f}s"
+		)
+
+
+class TEIError(Exception):
+	"""
+	Raised when the TEI server answers with an error status
+	"""
+
+	def __init__(
+		self,
+		status_code: int,
+		message: str,
+		error_type: Optional[str] = None,
+		retry_after: Optional[float] = None,
+	) -> None:
+		self.status_code = status_code
+		self.message = message
+		self.error_type = error_type
+		self.retry_after = retry_after
+		super().__init__(f"{status_code} {error_type or 'Error'}: {message}")
@@ -0,0 +1,90 @@
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+	from tei_client.models import Info
+
+DEFAULT_INFO_TTL = 300.0
+
+
+class InfoCache:
+	"""
+	Server info shared by all clients of an endpoint, keyed by the URL or gRPC target.
+	The info holds the model type, the batch and concurrency limits and the model metadata the clients derive their behaviour from.
+	Entries older than `ttl` seconds are still served while they are refreshed in the background,
+	a failed refresh keeps the previous info and is retried after another `ttl` seconds.
+	"""
+
+	def __init__(self, ttl: Optional[float] = DEFAULT_INFO_TTL) -> None:
+		self.ttl = ttl
+		# key -> (info, fetched at, last refresh started at)
+		self._entries: dict[str, tuple["Info", float, float]] = {}
+		self._lock = threading.Lock()
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def __contains__(self, key: str) -> bool:
+		return key in self._entries
+
+	def get(
+		self,
+		key: str,
+		refresh: Optional[Callable[[], "Info"]] = None,
+		max_age: Optional[float] = None,
+	) -> Optional["Info"]:
+		"""
+		Returns the info of the endpoint, `None` if it is unknown or older than `max_age` seconds.
+		A stale entry starts a background `refresh`.
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
+			info, fetched_at, checked_at = entry
+			now = time.monotonic()
+			if max_age is not None and now - fetched_at >= max_age:
+				return None
+			if (
+				refresh is not None
+				and self.ttl is not None
+				and now - checked_at >= self.ttl
+			):
+				self._entries[key] = (info, fetched_at, now)
+				threading.Thread(
+					target=self._refresh,
+					args=(key, refresh),
+					name="tei-client-info-refresh",
+					daemon=True,
+				).start()
+			return info
+
+	def set(self, key: str, info: "Info") -> None:
+		now = time.monotonic()
+		with self._lock:
+			self._entries[key] = (info, now, now)
+
+	def invalidate(self, key: Optional[str] = None) -> None:
+		"""
+		Drops the info of an endpoint, or of all endpoints if no key is given
+		"""
+		with self._lock:
+			if key is None:
+				self._entries.clear()
+			else:
+				self._entries.pop(key, None)
+
+	def _refresh(self, key: str, refresh: Callable[[], "Info"]) -> None:
+		try:
+			info = refresh()
+		except Exception:
+			return
+		now = time.monotonic()
+		with self._lock:
+			# an entry invalidated in the meantime stays invalidated
+			if key in self._entries:
+				self._entries[key] = (info, now, now)
+
+
+SHARED_INFO_CACHE = InfoCache()
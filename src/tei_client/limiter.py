@@ -0,0 +1,125 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+
+class AdaptiveLimiter:
+	"""
+	Adaptive limit of the requests an async client keeps in flight (AIMD).
+
+	The limit grows additively, by `increase` per `limit` successful requests, while the latency stays within
+	`latency_tolerance` times the baseline (the lowest latency seen, drifting slowly upwards).
+	It is cut multiplicatively by `decrease` when the server reports overload or the latency spikes, at most once per baseline latency.
+	Unless given, the starting limit is a quarter of the `max_concurrent_requests` reported by the server, which is also the default ceiling.
+	The current limit is available as `limit`, the requests in flight as `in_flight`.
+	"""
+
+	def __init__(
+		self,
+		initial_limit: Optional[int] = None,
+		min_limit: int = 1,
+		max_limit: Optional[int] = None,
+		increase: float = 1.0,
+		decrease: float = 0.5,
+		latency_tolerance: float = 2.0,
+		baseline_drift: float = 0.01,
+	) -> None:
+		self.min_limit = min_limit
+		self.max_limit = max_limit
+		self.increase = increase
+		self.decrease = decrease
+		self.latency_tolerance = latency_tolerance
+		self.baseline_drift = baseline_drift
+		self.in_flight = 0
+		self.baseline_latency: Optional[float] = None
+		self._limit: Optional[float] = (
+			None if initial_limit is None else float(initial_limit)
+		)
+		self._last_decrease = 0.0
+		self._waiters: deque[asyncio.Future] = deque()
+
+	@property
+	def seeded(self) -> bool:
+		return self._limit is not None
+
+	@property
+	def limit(self) -> Optional[int]:
+		"""
+		Current number of requests allowed in flight, `None` until the limiter was seeded
+		"""
+		return None if self._limit is None else int(self._limit)
+
+	def seed(self, max_concurrent_requests: Optional[int]) -> None:
+		"""
+		Sets the ceiling and starting point from the `max_concurrent_requests` of the server
+		"""
+		if self.max_limit is None and max_concurrent_requests:
+			self.max_limit = max_concurrent_requests
+		if self._limit is None:
+			self._limit = float(
+				max(
+					self.min_limit, (max_concurrent_requests or 4 * self.min_limit) // 4
+				)
+			)
+
+	async def acquire(self) -> None:
+		"""
+		Waits until a request may be sent
+		"""
+		while self._limit is not None and self.in_flight >= self.limit:
+			waiter = asyncio.get_running_loop().create_future()
+			self._waiters.append(waiter)
+			try:
+				await waiter
+			except asyncio.CancelledError:
+				if waiter in self._waiters:
+					self._waiters.remove(waiter)
+				self._wake()
+				raise
+		self.in_flight += 1
+
+	def release(self, latency: float, overloaded: bool = False) -> None:
+		"""
+		Completes a request, adapting the limit to its latency and whether the server was overloaded
+		"""
+		utilized = self._limit is not None and self.in_flight >= self._limit / 2
+		self.in_flight -= 1
+		if self._limit is not None:
+			self._adapt(latency, overloaded, utilized)
+		self._wake()
+
+	def cancel(self) -> None:
+		"""
+		Completes a request which ended without an outcome
+		"""
+		self.in_flight -= 1
+		self._wake()
+
+	def _adapt(self, latency: float, overloaded: bool, utilized: bool) -> None:
+		if self.baseline_latency is None or latency < self.baseline_latency:
+			self.baseline_latency = latency
+		else:
+			self.baseline_latency += self.baseline_drift * (
+				latency - self.baseline_latency
+			)
+
+		if overloaded or latency > self.baseline_latency * self.latency_tolerance:
+			now = time.monotonic()
+			if now - self._last_decrease >= self.baseline_latency:
+				self._limit = max(float(self.min_limit), self._limit * self.decrease)
+				self._last_decrease = now
+		elif utilized:
+			self._limit += self.increase / self._limit
+			if self.max_limit is not None:
+				self._limit = min(float(self.max_limit), self._limit)
+
+	def _wake(self) -> None:
+		free = (
+			len(self._waiters) if self._limit is None else self.limit - self.in_flight
+		)
+		while free > 0 and self._waiters:
+			waiter = self._waiters.popleft()
+			if not waiter.done():
+				waiter.set_result(None)
+				free -= 1
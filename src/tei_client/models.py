@@ -1,28 +1,15 @@
 from pydantic import BaseModel, Field
-from typing import Optional, Literal, Union, NamedTuple, Tuple
-from enum import Enum
+from typing import Optional, Literal, Union
 
-
-class ClassificationTuple(NamedTuple):
-	premise: str
-	hypothesis: str
-
-
-EmbeddingInput = Union[Union[str, list[str]], Union[list[int], list[list[int]]]]
-
-SingleClassificationInput = Union[str, Tuple[str, str], ClassificationTuple]
-ClassificationInput = Union[SingleClassificationInput, list[SingleClassificationInput]]
-
-
-class TruncationDirection(str, Enum):
-	Left = "Left"
-	Right = "Right"
-
-
-class ModelType(str, Enum):
-	Embedding = "embedding"
-	Classifier = "classifier"
-	Reranker = "reranker"
+from tei_client.types import (  # noqa: F401
+	ClassificationTuple,
+	EmbeddingInput,
+	SingleClassificationInput,
+	ClassificationInput,
+	TruncationDirection,
+	OutputFormat,
+	ModelType,
+)
 
 
 class EmbeddingMetadata(BaseModel):
@@ -74,6 +61,9 @@ class Token(BaseModel):
 class TokenizationResult(BaseModel):
 	tokens: list[Token]
 
+	def __len__(self) -> int:
+		return len(self.tokens)
+
 	def get_ids(self) -> list[int]:
 		return [token.id for token in self.tokens]
 
@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+	"""
+	Token bucket refilled with `rate` units per second up to `capacity`.
+	Reservations are charged immediately and may overdraw the bucket, the caller waits until the debt is repaid,
+	so requests larger than the capacity still pass and waiting callers are served in order.
+	"""
+
+	def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+		if rate <= 0:
+			raise ValueError("The rate of a token bucket must be positive")
+		self.rate = rate
+		self.capacity = rate if capacity is None else capacity
+		self._level = self.capacity
+		self._updated = time.monotonic()
+		self._lock = threading.Lock()
+
+	@property
+	def level(self) -> float:
+		with self._lock:
+			self._refill()
+			return self._level
+
+	def reserve(self, amount: float) -> float:
+		"""
+		Takes `amount` units from the bucket and returns the seconds to wait before using them
+		"""
+		with self._lock:
+			self._refill()
+			self._level -= amount
+			return max(0.0, -self._level / self.rate)
+
+	def _refill(self) -> None:
+		now = time.monotonic()
+		self._level = min(
+			self.capacity, self._level + (now - self._updated) * self.rate
+		)
+		self._updated = now
+
+
+class RateLimiter:
+	"""
+	Limits the tokens and requests per second sent to the server.
+	Every request is charged with its estimated token count, a gRPC stream counts one request per message.
+	`token_burst` and `request_burst` default to one second worth of capacity.
+	"""
+
+	def __init__(
+		self,
+		tokens_per_second: Optional[float] = None,
+		requests_per_second: Optional[float] = None,
+		token_burst: Optional[float] = None,
+		request_burst: Optional[float] = None,
+	) -> None:
+		self.tokens = (
+			None
+			if tokens_per_second is None
+			else TokenBucket(tokens_per_second, token_burst)
+		)
+		self.requests = (
+			None
+			if requests_per_second is None
+			else TokenBucket(requests_per_second, request_burst)
+		)
+
+	def reserve(self, tokens: int, requests: int = 1) -> float:
+		"""
+		Charges `requests` requests with `tokens` tokens in total and returns the seconds to wait before sending them
+		"""
+		wait = 0.0
+		if self.tokens is not None:
+			wait = self.tokens.reserve(tokens)
+		if self.requests is not None:
+			wait = max(wait, self.requests.reserve(requests))
+		return wait
+
+	def acquire(self, tokens: int, requests: int = 1) -> None:
+		"""
+		Blocks until `requests` requests with `tokens` tokens in total may be sent
+		"""
+		wait = self.reserve(tokens, requests)
+		if wait > 0:
+			time.sleep(wait)
+
+	async def async_acquire(self, tokens: int, requests: int = 1) -> None:
+		"""
+		Waits until `requests` requests with `tokens` tokens in total may be sent
+		"""
+		wait = self.reserve(tokens, requests)
+		if wait > 0:
+			await asyncio.sleep(wait)
@@ -0,0 +1,114 @@
+import json
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+GRPC_SERVICES = (
+	"tei.v1.Info",
+	"tei.v1.Embed",
+	"tei.v1.Predict",
+	"tei.v1.Rerank",
+	"tei.v1.Tokenize",
+)
+# gRPC refuses retry policies with more attempts
+GRPC_MAX_ATTEMPTS = 5
+# TEI rejects every invalid input with 422, only these are about the size of the batch
+BATCH_SIZE_MESSAGES = ("batch size",)
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+	"""
+	Parses a `Retry-After` header given in seconds or as HTTP date into seconds from now
+	"""
+	if not value:
+		return None
+	try:
+		return max(0.0, float(value))
+	except ValueError:
+		pass
+	try:
+		return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+	except (TypeError, ValueError):
+		return None
+
+
+class RetryPolicy:
+	"""
+	Retries requests rejected because the server is overloaded with exponential backoff and full jitter.
+	A `Retry-After` sent by the server takes precedence over the backoff, but is capped at `max_backoff`.
+	Batches rejected as too large (413, or 422 about the batch size) are split in halves and sent again.
+	"""
+
+	def __init__(
+		self,
+		max_attempts: int = 4,
+		initial_backoff: float = 0.1,
+		max_backoff: float = 5.0,
+		multiplier: float = 2.0,
+		retry_statuses: frozenset[int] = frozenset((429, 503)),
+		split_statuses: frozenset[int] = frozenset((413,)),
+	) -> None:
+		self.max_attempts = max_attempts
+		self.initial_backoff = initial_backoff
+		self.max_backoff = max_backoff
+		self.multiplier = multiplier
+		self.retry_statuses = retry_statuses
+		self.split_statuses = split_statuses
+
+	def should_retry(self, status_code: int, attempt: int) -> bool:
+		"""
+		True if a request failing with `status_code` on its `attempt`-th try (starting at 0) should be sent again
+		"""
+		return status_code in self.retry_statuses and attempt + 1 < self.max_attempts
+
+	def should_split(
+		self, status_code: int, batch_size: int, message: Optional[str] = None
+	) -> bool:
+		"""
+		True if a batch failing with `status_code` and `message` was rejected for its size and can be split
+		"""
+		if batch_size <= 1:
+			return False
+		if status_code in self.split_statuses:
+			return True
+		return (
+			status_code == 422
+			and message is not None
+			and any(m in message.lower() for m in BATCH_SIZE_MESSAGES)
+		)
+
+	def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+		"""
+		Seconds to wait before the next try
+		"""
+		if retry_after is not None:
+			return min(retry_after, self.max_backoff)
+		return random.uniform(
+			0, min(self.max_backoff, self.initial_backoff * self.multiplier**attempt)
+		)
+
+	def grpc_service_config(self) -> str:
+		"""
+		The policy as gRPC service config, gRPC retries `UNAVAILABLE` and `RESOURCE_EXHAUSTED` calls itself
+		and honors the pushback of the server
+		"""
+		return json.dumps({
+			"methodConfig": [
+				{
+					"name": [{"service": service} for service in GRPC_SERVICES],
+					"retryPolicy": {
+						"maxAttempts": max(
+							2, min(self.max_attempts, GRPC_MAX_ATTEMPTS)
+						),
+						"initialBackoff": f"{self.initial_backoff}s",
+						"maxBackoff": f"{self.max_backoff}s",
+						"backoffMultiplier": self.multiplier,
+						"retryableStatusCodes": ["UNAVAILABLE", "RESOURCE_EXHAUSTED"],
+					},
+				}
+			]
+		})
+
+
+DEFAULT_RETRY_POLICY = RetryPolicy()
@@ -0,0 +1,42 @@
+import json
+from typing import Any, Callable, NamedTuple
+
+
+class JsonBackend(NamedTuple):
+	name: str
+	loads: Callable[[bytes], Any]
+	dumps: Callable[[Any], bytes]
+
+
+def stdlib_backend() -> JsonBackend:
+	return JsonBackend(
+		name="json",
+		loads=json.loads,
+		dumps=lambda obj: json.dumps(obj, separators=(",", ":")).encode(),
+	)
+
+
+def orjson_backend() -> JsonBackend:
+	import orjson
+
+	return JsonBackend(name="orjson", loads=orjson.loads, dumps=orjson.dumps)
+
+
+def msgspec_backend() -> JsonBackend:
+	import msgspec
+
+	encoder = msgspec.json.Encoder()
+	decoder = msgspec.json.Decoder()
+	return JsonBackend(name="msgspec", loads=decoder.decode, dumps=encoder.encode)
+
+
+def default_backend() -> JsonBackend:
+	"""
+	The fastest installed JSON backend: orjson, then msgspec, then the standard library
+	"""
+	for backend in (orjson_backend, msgspec_backend):
+		try:
+			return backend()
+		except ImportError:
+			pass
+	return stdlib_backend()
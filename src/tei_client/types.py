@@ -0,0 +1,29 @@
+from typing import NamedTuple, Tuple, Union
+from enum import Enum
+
+
+class ClassificationTuple(NamedTuple):
+	premise: str
+	hypothesis: str
+
+
+EmbeddingInput = Union[Union[str, list[str]], Union[list[int], list[list[int]]]]
+
+SingleClassificationInput = Union[str, Tuple[str, str], ClassificationTuple]
+ClassificationInput = Union[SingleClassificationInput, list[SingleClassificationInput]]
+
+
+class TruncationDirection(str, Enum):
+	Left = "Left"
+	Right = "Right"
+
+
+class OutputFormat(str, Enum):
+	List = "list"
+	Numpy = "numpy"
+
+
+class ModelType(str, Enum):
+	Embedding = "embedding"
+	Classifier = "classifier"
+	Reranker = "reranker"
@@ -0,0 +1,98 @@
+from typing import TYPE_CHECKING, Iterator, Optional
+
+from tei_client.arrays import allocate, ensure_numpy
+
+if TYPE_CHECKING:
+	import numpy as np
+
+WIRE_VARINT = 0
+WIRE_I64 = 1
+WIRE_LEN = 2
+WIRE_I32 = 5
+
+
+def _read_varint(buf: bytes, pos: int) -> tuple[int, int]:
+	result = 0
+	shift = 0
+	while True:
+		byte = buf[pos]
+		pos += 1
+		result |= (byte & 0x7F) << shift
+		if not byte & 0x80:
+			return result, pos
+		shift += 7
+
+
+def iter_fields(
+	buf: bytes, start: int = 0, end: Optional[int] = None
+) -> Iterator[tuple[int, int, int, int]]:
+	"""
+	Yields `(field number, wire type, start, end)` of every field value in a serialized protobuf message
+	"""
+	pos = start
+	end = len(buf) if end is None else end
+	while pos < end:
+		key, pos = _read_varint(buf, pos)
+		field, wire_type = key >> 3, key & 0x07
+		if wire_type == WIRE_VARINT:
+			_, value_end = _read_varint(buf, pos)
+		elif wire_type == WIRE_I64:
+			value_end = pos + 8
+		elif wire_type == WIRE_LEN:
+			length, pos = _read_varint(buf, pos)
+			value_end = pos + length
+		elif wire_type == WIRE_I32:
+			value_end = pos + 4
+		else:
+			raise ValueError(f"Unsupported protobuf wire type {wire_type}")
+		yield field, wire_type, pos, value_end
+		pos = value_end
+
+
+def read_floats(
+	buf: bytes, field: int, start: int = 0, end: Optional[int] = None
+) -> "np.ndarray":
+	"""
+	Reads a `repeated float` field of a serialized message as a float32 array.
+	Packed values are returned as a view into `buf` without copying.
+	"""
+	np = ensure_numpy()
+	spans = [
+		(value_start, value_end)
+		for number, wire_type, value_start, value_end in iter_fields(buf, start, end)
+		if number == field and wire_type in (WIRE_LEN, WIRE_I32)
+	]
+	if len(spans) == 1:
+		value_start, value_end = spans[0]
+		return np.frombuffer(
+			buf, dtype="<f4", count=(value_end - value_start) // 4, offset=value_start
+		)
+	return np.concatenate(
+		[
+			np.frombuffer(buf, dtype="<f4", count=(e - s) // 4, offset=s)
+			for s, e in spans
+		]
+		or [allocate((0,))]
+	)
+
+
+def read_embed_response(buf: bytes) -> "np.ndarray":
+	"""
+	Reads the `embeddings` of a serialized `EmbedResponse` as a float32 view
+	"""
+	return read_floats(buf, field=1)
+
+
+def read_embed_all_response(buf: bytes) -> "np.ndarray":
+	"""
+	Reads the `token_embeddings` of a serialized `EmbedAllResponse` into a float32 `(tokens, dim)` array
+	"""
+	tokens = [
+		read_floats(buf, 1, start, end)
+		for field, wire_type, start, end in iter_fields(buf)
+		if field == 1 and wire_type == WIRE_LEN
+	]
+	result = allocate((len(tokens), len(tokens[0]) if tokens else 0))
+	for row, token in zip(result, tokens):
+		row[:] = token
+	return result
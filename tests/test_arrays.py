@@ -0,0 +1,33 @@
+import json
+
+from tei_client.arrays import (
+	RaggedEmbeddings,
+	decode_embeddings,
+	decode_ragged_embeddings,
+)
+
+
+def test_decode_embeddings():
+	body = json.dumps([[0.5, 1.5], [-2.0, 1e-3]]).encode()
+	result = decode_embeddings(body)
+	assert result.dtype == "float32"
+	assert result.shape == (2, 2)
+	assert result.tolist() == [[0.5, 1.5], [-2.0, 0.0010000000474974513]]
+
+
+def test_decode_ragged_embeddings():
+	body = json.dumps([[[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]], [[7.0, 8.0]]]).encode()
+	result = decode_ragged_embeddings(body)
+	assert len(result) == 2
+	assert result.lengths.tolist() == [3, 1]
+	assert result.values.shape == (4, 2)
+	assert result[1].tolist() == [[7.0, 8.0]]
+	assert result.to_list() == [[[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]], [[7.0, 8.0]]]
+
+
+def test_ragged_embeddings_gather():
+	first = decode_ragged_embeddings(b"[[[1.0, 1.0]], [[3.0, 3.0], [3.0, 3.0]]]")
+	second = decode_ragged_embeddings(b"[[[2.0, 2.0], [2.0, 2.0], [2.0, 2.0]]]")
+	result = RaggedEmbeddings.gather([([0, 2], first), ([1], second)], 3)
+	assert result.lengths.tolist() == [1, 3, 2]
+	assert [r[0, 0] for r in result] == [1.0, 2.0, 3.0]
@@ -0,0 +1,54 @@
+import pytest
+
+from tei_client.balancing import (
+	BalancingPolicy,
+	Endpoint,
+	LeastOutstanding,
+	PowerOfTwoChoices,
+	RoundRobin,
+)
+
+
+def make_endpoints(n: int) -> list[Endpoint]:
+	return [Endpoint(client=None, name=str(i)) for i in range(n)]
+
+
+def test_endpoint_tracks_in_flight_and_latency():
+	endpoint = make_endpoints(1)[0]
+	with endpoint.track():
+		assert endpoint.in_flight == 1
+	assert endpoint.in_flight == 0
+	assert endpoint.requests == 1
+	assert endpoint.latency is not None
+
+	with pytest.raises(RuntimeError):
+		with endpoint.track():
+			raise RuntimeError()
+	assert (endpoint.requests, endpoint.errors) == (2, 1)
+
+
+def test_round_robin():
+	endpoints = make_endpoints(3)
+	balancer = RoundRobin()
+	assert [balancer.select(endpoints).name for _ in range(4)] == ["0", "1", "2", "0"]
+
+
+def test_least_outstanding():
+	endpoints = make_endpoints(3)
+	endpoints[0].in_flight = 2
+	endpoints[1].in_flight = 1
+	endpoints[2].in_flight = 1
+	endpoints[1].latency = 0.5
+	endpoints[2].latency = 0.1
+	assert LeastOutstanding().select(endpoints) is endpoints[2]
+
+
+def test_power_of_two_choices_avoids_busiest():
+	endpoints = make_endpoints(2)
+	endpoints[0].in_flight = 5
+	balancer = PowerOfTwoChoices(seed=0)
+	assert all(balancer.select(endpoints) is endpoints[1] for _ in range(10))
+
+
+def test_balancing_policy_from_string():
+	assert isinstance(BalancingPolicy("least_outstanding").create(), LeastOutstanding)
@@ -0,0 +1,103 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from tei_client import HttpClient, InfoCache
+from tei_client.batcher import DynamicBatcher
+from tests.test_model_type import INFO
+
+
+class RecordingClient:
+	def __init__(self) -> None:
+		self.calls = []
+
+	async def async_embed(self, inputs, **params):
+		self.calls.append(list(inputs))
+		await asyncio.sleep(0)
+		return [[float(len(text))] for text in inputs]
+
+	async def async_classify(self, inputs, **params):
+		self.calls.append(list(inputs))
+		raise RuntimeError("server error")
+
+	async def async_tokenize(self, inputs, **params):
+		await asyncio.sleep(10)
+
+
+async def test_batcher_coalesces_concurrent_calls():
+	client = RecordingClient()
+	batcher = DynamicBatcher(client, max_wait=0.01)
+	results = await asyncio.gather(
+		batcher.embed("a"), batcher.embed(["bb", "ccc"]), batcher.embed("dddd")
+	)
+	assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+	assert client.calls == [["a", "bb", "ccc", "dddd"]]
+
+
+async def test_batcher_max_batch_size():
+	client = RecordingClient()
+	batcher = DynamicBatcher(client, max_wait=10, max_batch_size=2)
+	results = await asyncio.gather(*(batcher.embed(str(i)) for i in range(4)))
+	assert results == [[[1.0]]] * 4
+	assert client.calls == [["0", "1"], ["2", "3"]]
+
+
+async def test_batcher_separates_parameters():
+	client = RecordingClient()
+	batcher = DynamicBatcher(client, max_wait=0.01)
+	await asyncio.gather(batcher.embed("a"), batcher.embed("b", normalize=False))
+	assert sorted(client.calls) == [["a"], ["b"]]
+
+
+async def test_batcher_propagates_errors():
+	client = RecordingClient()
+	batcher = DynamicBatcher(client, max_wait=0.01)
+	with pytest.raises(RuntimeError):
+		await asyncio.gather(batcher.classify("a"), batcher.classify("b"))
+	assert client.calls == [["a", "b"]]
+
+
+async def test_batcher_cancels_waiters_of_cancelled_dispatch():
+	batcher = DynamicBatcher(RecordingClient(), max_wait=0)
+	call = asyncio.ensure_future(batcher.tokenize("a"))
+	await asyncio.sleep(0.01)
+	for task in list(batcher._tasks):
+		task.cancel()
+	with pytest.raises(asyncio.CancelledError):
+		await asyncio.wait_for(call, 1)
+
+
+async def test_batcher_respects_the_server_batch_limit():
+	sizes = []
+
+	def handler(request: httpx.Request) -> httpx.Response:
+		if request.url.path == "/info":
+			return httpx.Response(
+				200,
+				json={
+					**INFO,
+					"model_type": {
+						"classifier": {"id2label": {"0": "a"}, "label2id": {"a": 0}}
+					},
+					"max_client_batch_size": 20,
+				},
+			)
+		inputs = json.loads(request.content)["inputs"]
+		sizes.append(len(inputs))
+		if len(inputs) > 20:
+			return httpx.Response(
+				422, json={"error": "batch size 30 > 20", "error_type": "Validation"}
+			)
+		return httpx.Response(200, json=[[{"label": "a", "score": 1.0}]] * len(inputs))
+
+	client = HttpClient(
+		"http://localhost",
+		transport=httpx.MockTransport(handler),
+		info_cache=InfoCache(),
+	)
+	batcher = DynamicBatcher(client, max_wait=0.01)
+	results = await asyncio.gather(*(batcher.classify(str(i)) for i in range(30)))
+	assert all(len(result) == 1 for result in results)
+	assert sizes == [20, 10]
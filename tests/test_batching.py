@@ -0,0 +1,88 @@
+from tei_client.batching import (
+	TokenCountCache,
+	aiter_chunks,
+	deduplicate,
+	estimate_tokens,
+	expand,
+	iter_chunks,
+	plan_batches,
+	prepare_embedding_input,
+)
+
+
+def test_prepare_embedding_input():
+	assert prepare_embedding_input("Hello world") == ["Hello world"]
+	assert prepare_embedding_input(["foo", "bar"]) == ["foo", "bar"]
+	assert prepare_embedding_input([1, 2, 3]) == [[1, 2, 3]]
+	assert prepare_embedding_input([[1, 2], [3]]) == [[1, 2], [3]]
+
+
+def test_plan_batches_respects_batch_size():
+	batches = plan_batches(["Hello world"] * 45, max_batch_size=20)
+	assert [len(b) for b in batches] == [20, 20, 5]
+	assert [i for b in batches for i in b] == list(range(45))
+
+
+def test_plan_batches_respects_token_budget():
+	batches = plan_batches([[0] * 100] * 10, max_batch_size=20, max_batch_tokens=250)
+	assert [len(b) for b in batches] == [2, 2, 2, 2, 2]
+
+
+def test_plan_batches_oversized_input():
+	batches = plan_batches([[0] * 10, [0] * 500, [0] * 10], max_batch_tokens=100)
+	assert batches == [[0, 2], [1]]
+
+
+def test_plan_batches_buckets_by_length():
+	inputs = [[0] * 100, [0] * 5, [0] * 100, [0] * 5]
+	batches = plan_batches(inputs, max_batch_size=2)
+	assert batches == [[1, 3], [0, 2]]
+
+
+def test_plan_batches_padded_token_budget():
+	inputs = [[0] * 10] * 3 + [[0] * 90]
+	assert plan_batches(inputs, max_batch_tokens=100) == [[0, 1, 2], [3]]
+
+
+def test_estimate_tokens_uses_cached_counts():
+	token_counts = TokenCountCache(maxsize=1)
+	assert estimate_tokens("Hello world") == 3
+	token_counts.update("Hello world", 4)
+	assert estimate_tokens("Hello world", token_counts) == 4
+	token_counts.update("foo bar", 4)
+	assert len(token_counts) == 1
+	assert token_counts.get("Hello world") is None
+
+
+def test_iter_chunks():
+	chunks = list(iter_chunks(iter(range(7)), 3))
+	assert chunks == [(0, [0, 1, 2]), (3, [3, 4, 5]), (6, [6])]
+
+
+async def test_aiter_chunks():
+	async def inputs():
+		for i in range(7):
+			yield i
+
+	chunks = [chunk async for chunk in aiter_chunks(inputs(), 3)]
+	assert chunks == [(0, [0, 1, 2]), (3, [3, 4, 5]), (6, [6])]
+
+
+def test_deduplicate():
+	unique, inverse = deduplicate(["a", "b", "a", "", ""])
+	assert unique == ["a", "b", ""]
+	assert inverse == [0, 1, 0, 2, 2]
+	assert expand([1, 2, 3], inverse) == [1, 2, 1, 3, 3]
+
+
+def test_deduplicate_unhashable_inputs():
+	unique, inverse = deduplicate([[1, 2], ["a", "b"], [1, 2], ("a", "b")])
+	assert unique == [[1, 2], ["a", "b"]]
+	assert inverse == [0, 1, 0, 1]
+
+
+def test_deduplicate_without_duplicates():
+	unique, inverse = deduplicate(["a", "b"])
+	assert unique == ["a", "b"]
+	assert inverse is None
+	assert expand(unique, inverse) is unique
@@ -0,0 +1,85 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from tei_client.breaker import CircuitBreaker, CircuitState
+from tei_client.clients.grpc_client import AsyncCircuitBreakerInterceptor
+from tei_client.errors import CircuitOpenError
+
+
+def wait_for(breaker: CircuitBreaker, state: CircuitState) -> None:
+	deadline = time.monotonic() + 1
+	while breaker.state != state and time.monotonic() < deadline:
+		time.sleep(0.005)
+	assert breaker.state == state
+
+
+def test_breaker_opens_on_error_rate():
+	breaker = CircuitBreaker(min_requests=4, failure_threshold=0.5)
+	for success in (True, True, False):
+		breaker.before_request()
+		breaker.record(success, 0.01)
+	assert breaker.state == CircuitState.Closed
+
+	breaker.before_request()
+	breaker.record(False, 0.01)
+	assert breaker.state == CircuitState.Open
+	with pytest.raises(CircuitOpenError):
+		breaker.before_request()
+
+
+def test_breaker_counts_slow_requests_as_failures():
+	breaker = CircuitBreaker(min_requests=2, slow_request_threshold=0.1)
+	breaker.record(True, 0.5)
+	breaker.record(True, 0.5)
+	assert breaker.state == CircuitState.Open
+
+
+def test_breaker_half_opens_after_successful_probe():
+	healthy = [False]
+	breaker = CircuitBreaker(
+		min_requests=1, reset_timeout=0.01, probe=lambda: healthy[0]
+	)
+	breaker.record(False, 0.01)
+	time.sleep(0.02)
+	# reading the state starts a probe, which fails
+	assert breaker.state == CircuitState.Open
+	time.sleep(0.02)
+	assert breaker.state == CircuitState.Open
+
+	healthy[0] = True
+	time.sleep(0.02)
+	wait_for(breaker, CircuitState.HalfOpen)
+
+	breaker.before_request()
+	assert not breaker.available()
+	with pytest.raises(CircuitOpenError):
+		breaker.before_request()
+	breaker.record(True, 0.01)
+	assert breaker.state == CircuitState.Closed
+
+
+def test_breaker_reopens_on_failed_trial():
+	breaker = CircuitBreaker(min_requests=1, reset_timeout=0.01)
+	breaker.record(False, 0.01)
+	time.sleep(0.02)
+	assert breaker.state == CircuitState.HalfOpen
+	breaker.before_request()
+	breaker.record(False, 0.01)
+	assert breaker.state == CircuitState.Open
+
+
+async def test_interceptor_releases_the_trial_of_a_failed_call():
+	async def continuation(details, request):
+		raise RuntimeError("channel closed")
+
+	breaker = CircuitBreaker(min_requests=1, reset_timeout=0.01)
+	breaker.record(False, 0.01)
+	wait_for(breaker, CircuitState.HalfOpen)
+	interceptor = AsyncCircuitBreakerInterceptor(breaker)
+	with pytest.raises(RuntimeError):
+		await interceptor._intercept(
+			continuation, SimpleNamespace(method="/tei.v1.Embed/EmbedStream"), None
+		)
+	assert breaker.available()
@@ -0,0 +1,85 @@
+import json
+from array import array
+
+import httpx
+
+from tei_client import HttpClient, InfoCache
+from tei_client.cache import LRUEmbeddingCache, SQLiteEmbeddingCache
+from tests.test_model_type import INFO
+
+
+def test_lru_cache_hits_and_misses():
+	cache = LRUEmbeddingCache()
+	cache.set_many([(("a",), array("f", [1.0, 2.0]))])
+	results = cache.get_many([("a",), ("b",)])
+	assert results[0].tolist() == [1.0, 2.0]
+	assert results[1] is None
+	assert (cache.hits, cache.misses) == (1, 1)
+	assert cache.hit_rate == 0.5
+
+
+def test_lru_cache_evicts_least_recently_used():
+	cache = LRUEmbeddingCache(maxsize=2)
+	cache.set_many([(("a",), array("f", [1.0])), (("b",), array("f", [2.0]))])
+	cache.get_many([("a",)])
+	cache.set_many([(("c",), array("f", [3.0]))])
+	assert len(cache) == 2
+	assert cache.get_many([("b",)]) == [None]
+
+
+def test_lru_cache_max_bytes():
+	cache = LRUEmbeddingCache(maxsize=None, max_bytes=32)
+	cache.set_many((((i,), array("f", [0.0] * 4)) for i in range(5)))
+	assert len(cache) == 2
+	assert cache.nbytes == 32
+
+
+def test_sqlite_cache_persists(tmp_path):
+	path = tmp_path / "embeddings.sqlite"
+	cache = SQLiteEmbeddingCache(path)
+	cache.set_many([
+		(("mini", "sha1", "a", True, False, "Right"), array("f", [1.0, 2.0])),
+		(("mini", "sha2", "b", True, False, "Right"), array("f", [3.0])),
+	])
+	cache.close()
+
+	cache = SQLiteEmbeddingCache(path)
+	results = cache.get_many([
+		("mini", "sha1", "a", True, False, "Right"),
+		("mini", "sha3", "a", True, False, "Right"),
+	])
+	assert results[0].tolist() == [1.0, 2.0]
+	assert results[1] is None
+	assert (cache.hits, cache.misses) == (1, 1)
+	assert cache.prune("sha1") == 1
+	assert len(cache) == 1
+
+
+def test_sqlite_cache_batched_lookup():
+	cache = SQLiteEmbeddingCache()
+	keys = [("mini", "sha1", str(i), True, False, "Right") for i in range(2000)]
+	cache.set_many((keys[i], array("f", [float(i)])) for i in range(0, 2000, 2))
+	results = cache.get_many(keys)
+	assert [r is not None for r in results] == [i % 2 == 0 for i in range(2000)]
+	assert results[10].tolist() == [10.0]
+
+
+def test_cached_and_fetched_rows_have_the_same_precision():
+	def handler(request: httpx.Request) -> httpx.Response:
+		if request.url.path == "/info":
+			return httpx.Response(
+				200, json={**INFO, "model_type": {"embedding": {"pooling": "mean"}}}
+			)
+		inputs = json.loads(request.content)["inputs"]
+		return httpx.Response(200, json=[[0.1, 0.2]] * len(inputs))
+
+	client = HttpClient(
+		"http://localhost",
+		transport=httpx.MockTransport(handler),
+		cache=LRUEmbeddingCache(),
+		info_cache=InfoCache(),
+	)
+	fetched = client.embed(["a"])
+	mixed = client.embed(["a", "b"])
+	assert mixed == fetched * 2
+	assert fetched[0] == array("f", [0.1, 0.2]).tolist()
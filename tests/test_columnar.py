@@ -0,0 +1,156 @@
+import math
+
+from tei_client.columnar import (
+	ClassificationScores,
+	ColumnarTokenizationResult,
+	RerankScores,
+	labels_from_metadata,
+)
+from tei_client.models import (
+	ClassificationResult,
+	ClassifierMetadata,
+	RerankResult,
+	RerankScore,
+	Token,
+	TokenizationResult,
+)
+
+TOKENS = [
+	{"id": 101, "text": "[CLS]", "special": True, "start": None, "stop": None},
+	{"id": 7592, "text": "hello", "special": False, "start": 0, "stop": 5},
+]
+
+
+def test_columnar_tokens_from_json():
+	result = ColumnarTokenizationResult.from_json(TOKENS)
+	assert len(result) == 2
+	assert result.get_ids() is result.ids
+	assert result.ids.tolist() == [101, 7592]
+	assert result.special.tolist() == [1, 0]
+	assert result.start.tolist() == [-1, 0]
+	assert result.stop.tolist() == [-1, 5]
+	assert result.texts == ["[CLS]", "hello"]
+
+
+def test_columnar_tokens_do_not_keep_the_json():
+	tokens = [dict(t) for t in TOKENS]
+	result = ColumnarTokenizationResult.from_json(tokens)
+	tokens[1]["text"] = "changed"
+	assert result.texts == ["[CLS]", "hello"]
+
+
+def test_columnar_tokens_convert_to_model():
+	result = ColumnarTokenizationResult.from_json(TOKENS)
+	assert result.to_model() == TokenizationResult(
+		tokens=[Token.model_validate(t) for t in TOKENS]
+	)
+
+
+def test_texts_are_read_lazily():
+	reads = []
+
+	def texts() -> list[str]:
+		reads.append(1)
+		return ["hello"]
+
+	tokens = ColumnarTokenizationResult.from_json(TOKENS[1:])
+	result = ColumnarTokenizationResult(
+		tokens.ids, tokens.special, tokens.start, tokens.stop, texts
+	)
+	assert reads == []
+	assert result.texts == ["hello"]
+	assert result.texts == ["hello"]
+	assert reads == [1]
+
+
+ROWS = [[("positive", 0.9), ("negative", 0.1)], [("negative", 0.7), ("positive", 0.3)]]
+
+
+def test_labels_are_ordered_by_id():
+	metadata = ClassifierMetadata(
+		id2label={"1": "positive", "0": "negative"},
+		label2id={"negative": 0, "positive": 1},
+	)
+	assert labels_from_metadata(metadata) == ["negative", "positive"]
+	assert labels_from_metadata(None) is None
+
+
+def test_classification_scores_from_rows():
+	result = ClassificationScores.from_rows(ROWS, ["negative", "positive"])
+	assert result.scores.dtype == "float32"
+	assert result.scores.shape == (2, 2)
+	assert result.scores[0, 1] == result.scores.dtype.type(0.9)
+	assert result.argmax().tolist() == [1, 0]
+	assert result.predicted_labels() == ["positive", "negative"]
+
+
+def test_classification_scores_without_vocabulary():
+	result = ClassificationScores.from_rows(
+		[[("b", 0.6)], [("a", 0.8), ("b", 0.2)]], None
+	)
+	assert result.labels == ["b", "a"]
+	assert math.isnan(result.scores[0, 1])
+	assert result.predicted_labels() == ["b", "a"]
+	assert result.to_model()[0].scores[0].label == "b"
+	assert len(result.to_model()[0].scores) == 1
+
+
+def test_classification_scores_top_k():
+	result = ClassificationScores.from_rows(
+		[[("a", 0.1), ("b", 0.5), ("c", 0.4)]], ["a", "b", "c"]
+	)
+	columns, scores = result.top_k(2)
+	assert columns.tolist() == [[1, 2]]
+	assert scores.shape == (1, 2)
+	assert result.top_k(5)[0].tolist() == [[1, 2, 0]]
+
+
+def test_classification_scores_select_rows():
+	result = ClassificationScores.from_rows(ROWS, None)
+	expanded = result[[0, 1, 0]]
+	assert len(expanded) == 3
+	assert expanded.labels is result.labels
+	assert len(result[1:]) == 1
+
+
+def test_classification_scores_convert_to_model():
+	result = ClassificationScores.from_rows(ROWS, ["negative", "positive"])
+	models = result.to_model()
+	assert all(isinstance(m, ClassificationResult) for m in models)
+	assert [s.label for s in models[0].scores] == ["positive", "negative"]
+	assert [s.label for s in models[1].scores] == ["negative", "positive"]
+
+
+def test_rerank_scores_are_sorted():
+	result = RerankScores.from_ranks(
+		[(0, 0.1, "a"), (2, 0.9, "c"), (1, 0.5, "b")], return_text=True
+	)
+	assert result.index.tolist() == [2, 1, 0]
+	assert result.text == ["c", "b", "a"]
+	assert result.argmax() == 2
+	assert result.scores_by_index().tolist() == result.score[[2, 1, 0]].tolist()
+
+	top = result.top_k(2)
+	assert top.index.tolist() == [2, 1]
+	assert top.text == ["c", "b"]
+	assert top.scores_by_index()[2] == top.score[0]
+	assert math.isnan(top.scores_by_index()[0])
+
+
+def test_rerank_scores_of_missing_texts_are_nan():
+	result = RerankScores.from_ranks([(3, 0.5, None)], False, size=4)
+	scores = result.scores_by_index()
+	assert scores.shape == (4,)
+	assert scores[3] == 0.5
+	assert all(math.isnan(score) for score in scores[:3])
+
+
+def test_rerank_scores_convert_to_model():
+	result = RerankScores.from_ranks([(1, 0.5, None), (0, 0.25, None)], False)
+	assert result.text is None
+	assert result.to_model() == RerankResult(
+		ranks=[
+			RerankScore(index=1, score=0.5, text=None),
+			RerankScore(index=0, score=0.25, text=None),
+		]
+	)
@@ -1,5 +1,10 @@
-from tei_client import GrpcClient
-from tei_client import ModelType, ClassificationTuple
+import asyncio
+
+import grpc
+
+from tei_client import GrpcClient, LRUEmbeddingCache
+from tei_client import ModelType, ClassificationTuple, OutputFormat
+from tei_client import BalancingPolicy, PooledClient
 import pytest
 
 
@@ -65,6 +70,100 @@ async def test_async_embed_bulk():
 	assert len(result) == 512
 
 
+def test_embed_many():
+	client = GrpcClient(EMBED_URL, max_concurrency=4)
+	texts = [f"This is sentence number {i}" for i in range(50)]
+	result = client.embed_many(texts, batch_size=8)
+	assert len(result) == 50
+	assert list(result[42]) == pytest.approx(list(client.embed(texts[42])[0]), abs=1e-4)
+
+
+def test_embed_iter():
+	client = GrpcClient(EMBED_URL)
+	texts = (f"This is sentence number {i}" for i in range(50))
+	result = dict(client.embed_iter(texts, batch_size=8, max_in_flight=2))
+	assert sorted(result) == list(range(50))
+
+
+async def test_aembed_iter():
+	client = GrpcClient(EMBED_URL)
+
+	async def texts():
+		for i in range(50):
+			yield f"This is sentence number {i}"
+
+	result = {i: e async for i, e in client.aembed_iter(texts(), batch_size=8)}
+	assert sorted(result) == list(range(50))
+
+
+def test_embed_numpy():
+	client = GrpcClient(EMBED_URL)
+	texts = ["Hello world", "This is a good day"]
+	result = client.embed(texts, output=OutputFormat.Numpy)
+	assert result.dtype == "float32"
+	assert result.shape == (2, 384)
+	assert result[1].tolist() == pytest.approx(list(client.embed(texts)[1]), abs=1e-6)
+
+
+async def test_async_embed_numpy():
+	client = GrpcClient(EMBED_URL)
+	result = await client.async_embed(["Hello world"] * 30, output="numpy")
+	assert result.dtype == "float32"
+	assert result.shape == (30, 384)
+
+
+def test_embed_cached():
+	cache = LRUEmbeddingCache()
+	client = GrpcClient(EMBED_URL, cache=cache)
+	first = client.embed(["Hello world", "foo"])
+	result = client.embed(["foo", "This is a good day", "Hello world"])
+	assert (cache.hits, cache.misses) == (2, 3)
+	assert list(result[2]) == pytest.approx(list(first[0]), abs=1e-6)
+
+
+async def test_async_embed_single_flight():
+	client = GrpcClient(EMBED_URL, single_flight=True)
+	results = await asyncio.gather(
+		*(client.async_embed("Hello world") for _ in range(10))
+	)
+	assert all(result is results[0] for result in results)
+
+
+def test_async_channel_of_previous_loop_is_closed():
+	client = GrpcClient(EMBED_URL)
+
+	async def channel():
+		await client.async_health()
+		return client.async_channel
+
+	first = asyncio.run(channel())
+	second = asyncio.run(channel())
+	assert first is not second
+	assert first.get_state() == grpc.ChannelConnectivity.SHUTDOWN
+
+
+def test_pooled_client():
+	client = PooledClient.from_targets(
+		[EMBED_URL, EMBED_URL], policy=BalancingPolicy.LeastOutstanding
+	)
+	result = client.embed_many([f"text {i}" for i in range(100)], batch_size=10)
+	assert len(result) == 100
+	assert sum(endpoint.requests for endpoint in client.endpoints) >= 10
+
+
+def test_pooled_embed_all():
+	client = PooledClient.from_targets([EMBED_URL, EMBED_URL])
+	result = client.embed_all("Hello world", normalize=False)
+	assert len(result) == 1
+	assert len(result[0][0]) > 1
+
+
+async def test_async_pooled_embed_all():
+	client = PooledClient.from_targets([EMBED_URL, EMBED_URL])
+	result = await client.async_embed_all("Hello world")
+	assert len(result) == 1
+
+
 def test_embed_all():
 	client = GrpcClient(EMBED_URL)
 	result = client.embed_all("Hello world")
@@ -79,6 +178,22 @@ async def test_async_embed_all():
 	assert len(result[0][0]) > 1
 
 
+def test_embed_all_numpy():
+	client = GrpcClient(EMBED_URL)
+	result = client.embed_all(["Hello world", "foo"], output=OutputFormat.Numpy)
+	assert len(result) == 2
+	assert result.values.dtype == "float32"
+	assert result.dim == 384
+	assert result[0].shape[0] > result[1].shape[0]
+
+
+async def test_async_embed_all_numpy():
+	client = GrpcClient(EMBED_URL)
+	result = await client.async_embed_all("Hello world", output=OutputFormat.Numpy)
+	assert len(result) == 1
+	assert result[0].shape[1] == 384
+
+
 def test_tokenize():
 	client = GrpcClient(EMBED_URL)
 	result = client.tokenize("Hello world")
@@ -88,6 +203,28 @@ def test_tokenize():
 	assert len(result) == 2
 
 
+def test_tokenize_columnar():
+	client = GrpcClient(EMBED_URL)
+	result = client.tokenize(["Hello world", "foo bar"], columnar=True)
+	expected = client.tokenize(["Hello world", "foo bar"])
+	assert [r.get_ids().tolist() for r in result] == [r.get_ids() for r in expected]
+	assert [r.to_model() for r in result] == expected
+
+
+def test_tokenize_duplicates():
+	client = GrpcClient(EMBED_URL)
+	result = client.tokenize(["Hello world", "foo bar", "Hello world"])
+	assert len(result) == 3
+	assert result[0] == result[2]
+
+
+def test_embed_duplicates():
+	client = GrpcClient(EMBED_URL)
+	result = client.embed(["Hello world", "", "Hello world", ""])
+	assert len(result) == 4
+	assert list(result[0]) == list(result[2])
+
+
 async def test_async_tokenize():
 	client = GrpcClient(EMBED_URL)
 	result = await client.async_tokenize("Hello world")
@@ -157,6 +294,29 @@ async def test_async_classify(inputs, expected_results: int):
 	assert len(result) == expected_results
 
 
+def test_classify_many():
+	client = GrpcClient(CLASSIFIER_URL)
+	inputs = ["Hello world", ("Hello world", "foo bar")] * 15
+	result = client.classify_many(inputs, batch_size=4)
+	assert len(result) == 30
+
+
+def test_classify_numpy():
+	client = GrpcClient(CLASSIFIER_URL)
+	inputs = ["Hello world", "foo bar", "Hello world"]
+	result = client.classify(inputs, output="numpy")
+	expected = client.classify(inputs)
+	assert result.scores.shape == (3, len(result.labels))
+	assert result.scores.dtype == "float32"
+	assert result.predicted_labels() == [r.scores[0].label for r in expected]
+
+
+async def test_async_classify_numpy():
+	client = GrpcClient(CLASSIFIER_URL)
+	result = await client.async_classify(["Hello world", "foo bar"], output="numpy")
+	assert len(result) == 2
+
+
 def test_rerank():
 	client = GrpcClient(RERANKER_URL)
 	result = client.rerank(
@@ -179,3 +339,39 @@ async def test_async_rerank():
 	assert len(result.ranks) == 2
 	assert result.ranks[0].index == 1
 	assert result.ranks[0].text == "Deep Learning is ..."
+
+
+def test_rerank_many():
+	client = GrpcClient(RERANKER_URL)
+	texts = ["Lore ipsum"] * 30 + ["Deep Learning is ..."]
+	result = client.rerank_many(
+		query="What is Deep Learning?", texts=texts, return_text=True, batch_size=8
+	)
+	assert len(result.ranks) == 31
+	assert result.ranks[0].index == 30
+	assert result.ranks[0].text == "Deep Learning is ..."
+
+
+def test_rerank_numpy():
+	client = GrpcClient(RERANKER_URL)
+	result = client.rerank(
+		query="What is Deep Learning?",
+		texts=["Lore ipsum", "Deep Learning is ..."],
+		return_text=True,
+		output="numpy",
+	)
+	assert result.index.tolist() == [1, 0]
+	assert result.argmax() == 1
+	assert result.text[0] == "Deep Learning is ..."
+	assert result.scores_by_index()[1] == result.score[0]
+
+
+async def test_async_rerank_numpy():
+	client = GrpcClient(RERANKER_URL)
+	result = await client.async_rerank(
+		query="What is Deep Learning?",
+		texts=["Lore ipsum", "Deep Learning is ..."],
+		output="numpy",
+	)
+	assert result.argmax() == 1
+	assert result.text is None
@@ -1,5 +1,12 @@
-from tei_client import HttpClient
-from tei_client import ModelType, ClassificationTuple
+import asyncio
+import json
+
+import httpx
+from tei_client import DynamicBatcher, HttpClient, LRUEmbeddingCache
+from tei_client import ModelType, ClassificationTuple, OutputFormat
+from tei_client import BalancingPolicy, InfoCache, PooledClient
+from tei_client.clients.http_client import DEFAULT_LIMITS, DEFAULT_TIMEOUT
+from tests.test_model_type import INFO
 import pytest
 
 EMBED_URL = "http://localhost:8080"
@@ -17,6 +24,60 @@ async def test_is_constructable_async():
 	assert await client.async_health()
 
 
+@pytest.fixture
+def created_clients(monkeypatch) -> list[dict]:
+	created = []
+
+	def record(cls):
+		def create(**kwargs):
+			created.append(kwargs)
+			return cls(**kwargs)
+
+		return create
+
+	monkeypatch.setattr(httpx, "Client", record(httpx.Client))
+	monkeypatch.setattr(httpx, "AsyncClient", record(httpx.AsyncClient))
+	return created
+
+
+def test_default_pool_configuration(created_clients):
+	client = HttpClient(EMBED_URL)
+	client.client, client.async_client
+	assert len(created_clients) == 2
+	for kwargs in created_clients:
+		assert kwargs["limits"] is DEFAULT_LIMITS
+		assert kwargs["timeout"] is DEFAULT_TIMEOUT
+		assert not kwargs["http2"]
+
+
+def test_pool_configuration(created_clients):
+	limits = httpx.Limits(max_connections=8, keepalive_expiry=5.0)
+	timeout = httpx.Timeout(10.0, connect=1.0)
+	client = HttpClient(EMBED_URL, http2=True, limits=limits, timeout=timeout)
+	client.client, client.async_client
+	assert len(created_clients) == 2
+	for kwargs in created_clients:
+		assert kwargs["limits"] is limits
+		assert kwargs["timeout"] is timeout
+		assert kwargs["http2"]
+
+
+async def test_http2_prior_knowledge():
+	client = HttpClient(EMBED_URL, http2=True, http1=False)
+	result = await client.async_client.get("/health")
+	assert result.http_version == "HTTP/2"
+	assert len(await client.async_embed(["Hello World!"] * 8)) == 8
+
+
+def test_shared_info_cache():
+	cache = InfoCache()
+	first = HttpClient(EMBED_URL, info_cache=cache)
+	second = HttpClient(EMBED_URL, info_cache=cache)
+	assert first.server_info is second.server_info
+	first.invalidate_info()
+	assert EMBED_URL not in cache
+
+
 @pytest.mark.parametrize(
 	"url,model_type",
 	[
@@ -63,6 +124,105 @@ async def test_async_embed():
 	assert len(result) == 2
 
 
+def test_embed_exceeding_client_batch_size():
+	client = HttpClient(EMBED_URL)
+	texts = [f"This is sentence number {i}" for i in range(50)]
+	result = client.embed(texts)
+	assert len(result) == 50
+	assert result[42] == pytest.approx(client.embed(texts[42])[0], abs=1e-4)
+
+
+async def test_async_embed_exceeding_client_batch_size():
+	client = HttpClient(EMBED_URL)
+	texts = [f"This is sentence number {i}" for i in range(50)]
+	result = await client.async_embed(texts)
+	assert len(result) == 50
+	assert result[42] == pytest.approx(
+		(await client.async_embed(texts[42]))[0], abs=1e-4
+	)
+
+
+async def test_async_embed_bulk():
+	client = HttpClient(EMBED_URL, max_concurrency=4)
+	result = await client.async_embed(["Hello world"] * 512)
+	assert len(result) == 512
+
+
+def test_embed_many():
+	client = HttpClient(EMBED_URL, max_concurrency=4)
+	texts = [f"This is sentence number {i}" for i in range(50)]
+	result = client.embed_many(texts, batch_size=8)
+	assert len(result) == 50
+	assert list(result[42]) == pytest.approx(list(client.embed(texts[42])[0]), abs=1e-4)
+
+
+def test_embed_iter():
+	client = HttpClient(EMBED_URL)
+	texts = (f"This is sentence number {i}" for i in range(50))
+	result = dict(client.embed_iter(texts, batch_size=8, max_in_flight=2))
+	assert sorted(result) == list(range(50))
+
+
+async def test_aembed_iter():
+	client = HttpClient(EMBED_URL)
+
+	async def texts():
+		for i in range(50):
+			yield f"This is sentence number {i}"
+
+	result = {i: e async for i, e in client.aembed_iter(texts(), batch_size=8)}
+	assert sorted(result) == list(range(50))
+
+
+def test_embed_numpy():
+	client = HttpClient(EMBED_URL)
+	texts = ["Hello world", "This is a good day"]
+	result = client.embed(texts, output=OutputFormat.Numpy)
+	assert result.dtype == "float32"
+	assert result.shape == (2, 384)
+	assert result[1].tolist() == pytest.approx(list(client.embed(texts)[1]), abs=1e-6)
+
+
+async def test_async_embed_numpy():
+	client = HttpClient(EMBED_URL)
+	result = await client.async_embed(["Hello world"] * 30, output="numpy")
+	assert result.dtype == "float32"
+	assert result.shape == (30, 384)
+
+
+def test_embed_cached():
+	cache = LRUEmbeddingCache()
+	client = HttpClient(EMBED_URL, cache=cache)
+	first = client.embed(["Hello world", "foo"])
+	result = client.embed(["foo", "This is a good day", "Hello world"])
+	assert (cache.hits, cache.misses) == (2, 3)
+	assert list(result[2]) == pytest.approx(list(first[0]), abs=1e-6)
+
+
+async def test_dynamic_batcher():
+	batcher = DynamicBatcher(HttpClient(EMBED_URL))
+	results = await asyncio.gather(*(batcher.embed(f"query {i}") for i in range(50)))
+	assert len(results) == 50
+	assert all(len(result) == 1 for result in results)
+
+
+async def test_async_embed_single_flight():
+	client = HttpClient(EMBED_URL, single_flight=True)
+	results = await asyncio.gather(
+		*(client.async_embed("Hello world") for _ in range(10))
+	)
+	assert all(result is results[0] for result in results)
+
+
+def test_pooled_client():
+	client = PooledClient.from_urls(
+		[EMBED_URL, EMBED_URL], policy=BalancingPolicy.LeastOutstanding
+	)
+	result = client.embed_many([f"text {i}" for i in range(100)], batch_size=10)
+	assert len(result) == 100
+	assert sum(endpoint.requests for endpoint in client.endpoints) >= 10
+
+
 def test_embed_all():
 	client = HttpClient(EMBED_URL)
 	result = client.embed_all("Hello world")
@@ -77,6 +237,22 @@ async def test_async_embed_all():
 	assert len(result[0][0]) > 1
 
 
+def test_embed_all_numpy():
+	client = HttpClient(EMBED_URL)
+	result = client.embed_all(["Hello world", "foo"], output=OutputFormat.Numpy)
+	assert len(result) == 2
+	assert result.values.dtype == "float32"
+	assert result.dim == 384
+	assert result[0].shape[0] > result[1].shape[0]
+
+
+async def test_async_embed_all_numpy():
+	client = HttpClient(EMBED_URL)
+	result = await client.async_embed_all("Hello world", output=OutputFormat.Numpy)
+	assert len(result) == 1
+	assert result[0].shape[1] == 384
+
+
 def test_tokenize():
 	client = HttpClient(EMBED_URL)
 	result = client.tokenize("Hello world")
@@ -86,6 +262,28 @@ def test_tokenize():
 	assert len(result) == 2
 
 
+def test_tokenize_columnar():
+	client = HttpClient(EMBED_URL)
+	result = client.tokenize(["Hello world", "foo bar"], columnar=True)
+	expected = client.tokenize(["Hello world", "foo bar"])
+	assert [r.get_ids().tolist() for r in result] == [r.get_ids() for r in expected]
+	assert [r.to_model() for r in result] == expected
+
+
+def test_tokenize_duplicates():
+	client = HttpClient(EMBED_URL)
+	result = client.tokenize(["Hello world", "foo bar", "Hello world"])
+	assert len(result) == 3
+	assert result[0] == result[2]
+
+
+def test_embed_duplicates():
+	client = HttpClient(EMBED_URL)
+	result = client.embed(["Hello world", "", "Hello world", ""])
+	assert len(result) == 4
+	assert list(result[0]) == list(result[2])
+
+
 async def test_async_tokenize():
 	client = HttpClient(EMBED_URL)
 	result = await client.async_tokenize("Hello world")
@@ -156,6 +354,70 @@ async def test_async_classify(inputs, expected_results: int):
 	assert len(result) == expected_results
 
 
+def test_classify_many():
+	client = HttpClient(CLASSIFIER_URL)
+	inputs = ["Hello world", ("Hello world", "foo bar")] * 15
+	result = client.classify_many(inputs, batch_size=4)
+	assert len(result) == 30
+
+
+def test_pooled_embed_routes_every_batch():
+	def handler(request: httpx.Request) -> httpx.Response:
+		if request.url.path == "/info":
+			return httpx.Response(
+				200,
+				json={
+					**INFO,
+					"model_type": {"embedding": {"pooling": "mean"}},
+					"max_client_batch_size": 4,
+				},
+			)
+		inputs = json.loads(request.content)["inputs"]
+		return httpx.Response(200, json=[[float(len(text))] for text in inputs])
+
+	client = PooledClient([
+		HttpClient(url, transport=httpx.MockTransport(handler), info_cache=None)
+		for url in ("http://a", "http://b")
+	])
+	texts = ["a" * (i + 1) for i in range(10)]
+	assert client.embed(texts) == [[float(len(text))] for text in texts]
+	assert all(endpoint.requests > 0 for endpoint in client.endpoints)
+
+
+def test_classify_many_separates_pairs():
+	batches = []
+
+	def predict(request: httpx.Request) -> httpx.Response:
+		inputs = json.loads(request.content)["inputs"]
+		batches.append(inputs)
+		return httpx.Response(200, json=[[{"label": "a", "score": 1.0}]] * len(inputs))
+
+	client = HttpClient(
+		EMBED_URL,
+		transport=httpx.MockTransport(predict),
+		model_type=ModelType.Classifier,
+	)
+	inputs = ["Hello world", ("Hello world", "foo bar")] * 3
+	assert len(client.classify_many(inputs, batch_size=4)) == 6
+	assert all(len(set(map(len, batch))) == 1 for batch in batches)
+
+
+def test_classify_numpy():
+	client = HttpClient(CLASSIFIER_URL)
+	inputs = ["Hello world", "foo bar", "Hello world"]
+	result = client.classify(inputs, output="numpy")
+	expected = client.classify(inputs)
+	assert result.scores.shape == (3, len(result.labels))
+	assert result.scores.dtype == "float32"
+	assert result.predicted_labels() == [r.scores[0].label for r in expected]
+
+
+async def test_async_classify_numpy():
+	client = HttpClient(CLASSIFIER_URL)
+	result = await client.async_classify(["Hello world", "foo bar"], output="numpy")
+	assert len(result) == 2
+
+
 def test_rerank():
 	client = HttpClient(RERANKER_URL)
 	result = client.rerank(
@@ -178,3 +440,39 @@ async def test_async_rerank():
 	assert len(result.ranks) == 2
 	assert result.ranks[0].index == 1
 	assert result.ranks[0].text == "Deep Learning is ..."
+
+
+def test_rerank_many():
+	client = HttpClient(RERANKER_URL)
+	texts = ["Lore ipsum"] * 30 + ["Deep Learning is ..."]
+	result = client.rerank_many(
+		query="What is Deep Learning?", texts=texts, return_text=True, batch_size=8
+	)
+	assert len(result.ranks) == 31
+	assert result.ranks[0].index == 30
+	assert result.ranks[0].text == "Deep Learning is ..."
+
+
+def test_rerank_numpy():
+	client = HttpClient(RERANKER_URL)
+	result = client.rerank(
+		query="What is Deep Learning?",
+		texts=["Lore ipsum", "Deep Learning is ..."],
+		return_text=True,
+		output="numpy",
+	)
+	assert result.index.tolist() == [1, 0]
+	assert result.argmax() == 1
+	assert result.text[0] == "Deep Learning is ..."
+	assert result.scores_by_index()[1] == result.score[0]
+
+
+async def test_async_rerank_numpy():
+	client = HttpClient(RERANKER_URL)
+	result = await client.async_rerank(
+		query="What is Deep Learning?",
+		texts=["Lore ipsum", "Deep Learning is ..."],
+		output="numpy",
+	)
+	assert result.argmax() == 1
+	assert result.text is None
@@ -0,0 +1,49 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+
+def imported_modules(code: str) -> set[str]:
+	"""
+	Runs `code` in a fresh interpreter and returns the modules it imported
+	"""
+	result = subprocess.run(
+		[sys.executable, "-c", f"{code}\nimport sys\nprint(' '.join(sys.modules))"],
+		capture_output=True,
+		text=True,
+		check=True,
+		env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+	)
+	return set(result.stdout.split())
+
+
+def test_import_is_lazy():
+	modules = imported_modules("import tei_client")
+	assert not {"httpx", "pydantic", "grpc", "numpy"} & modules
+
+
+def test_http_client_defers_models():
+	modules = imported_modules(
+		"from tei_client import HttpClient\nHttpClient('http://localhost:8080')"
+	)
+	assert not {"pydantic", "grpc", "numpy"} & modules
+
+
+def test_grpc_client_defers_models():
+	pytest.importorskip("grpc")
+	modules = imported_modules(
+		"from tei_client import GrpcClient\nGrpcClient('localhost:8081')"
+	)
+	assert not {"pydantic", "numpy"} & modules
+
+
+def test_transports_are_created_on_first_use():
+	from tei_client import HttpClient
+
+	client = HttpClient("http://localhost:8080")
+	assert client._HttpClient__client is None
+	assert client._HttpClient__async_client is None
+	assert client.client is client.client
+	assert client._HttpClient__async_client is None
@@ -0,0 +1,82 @@
+import time
+
+from tei_client.info_cache import InfoCache
+from tei_client.models import Info
+
+from tests.test_model_type import INFO, InfoClient
+
+
+def make_info(version: str = "1.5.0") -> Info:
+	return Info(**{**INFO, "version": version})
+
+
+def wait_for(condition, timeout: float = 1.0) -> bool:
+	deadline = time.monotonic() + timeout
+	while not condition():
+		if time.monotonic() > deadline:
+			return False
+		time.sleep(0.001)
+	return True
+
+
+def test_get_set_invalidate():
+	cache = InfoCache()
+	assert cache.get("http://a") is None
+	info = make_info()
+	cache.set("http://a", info)
+	cache.set("http://b", info)
+	assert cache.get("http://a") is info
+	assert cache.get("http://a", max_age=0) is None
+
+	cache.invalidate("http://a")
+	assert "http://a" not in cache
+	assert len(cache) == 1
+	cache.invalidate()
+	assert len(cache) == 0
+
+
+def test_stale_entries_refresh_in_background():
+	cache = InfoCache(ttl=0.01)
+	stale = make_info("1.0")
+	cache.set("http://a", stale)
+	time.sleep(0.01)
+
+	calls = []
+
+	def refresh() -> Info:
+		calls.append(1)
+		return make_info("2.0")
+
+	assert cache.get("http://a", refresh) is stale
+	assert cache.get("http://a", refresh) is stale
+	assert wait_for(lambda: cache.get("http://a").version == "2.0")
+	assert len(calls) == 1
+
+
+def test_failed_refresh_keeps_info():
+	cache = InfoCache(ttl=0.01)
+	info = make_info()
+	cache.set("http://a", info)
+	time.sleep(0.01)
+
+	def refresh() -> Info:
+		raise RuntimeError("server down")
+
+	assert cache.get("http://a", refresh) is info
+	time.sleep(0.005)
+	assert cache.get("http://a", refresh) is info
+
+
+def test_clients_share_the_cache():
+	cache = InfoCache()
+	clients = [InfoClient() for _ in range(3)]
+	for client in clients:
+		client.info_cache = cache
+		client.info_cache_key = "http://a"
+	clients[0].info = make_info
+
+	infos = [client.server_info for client in clients]
+	assert all(info is infos[0] for info in infos)
+
+	clients[1].invalidate_info()
+	assert "http://a" not in cache
@@ -0,0 +1,62 @@
+import asyncio
+
+from tei_client.limiter import AdaptiveLimiter
+
+
+def test_limiter_seeded_from_server_limit():
+	limiter = AdaptiveLimiter()
+	assert not limiter.seeded
+	limiter.seed(512)
+	assert limiter.limit == 128
+	assert limiter.max_limit == 512
+
+
+async def test_limiter_bounds_in_flight_requests():
+	limiter = AdaptiveLimiter(initial_limit=2, max_limit=2)
+	peak = 0
+
+	async def request():
+		nonlocal peak
+		await limiter.acquire()
+		peak = max(peak, limiter.in_flight)
+		await asyncio.sleep(0.001)
+		limiter.release(0.001)
+
+	await asyncio.gather(*(request() for _ in range(20)))
+	assert peak == 2
+	assert limiter.in_flight == 0
+
+
+async def test_limiter_additive_increase_multiplicative_decrease():
+	limiter = AdaptiveLimiter(initial_limit=4, max_limit=100)
+	for _ in range(4):
+		await limiter.acquire()
+	for _ in range(4):
+		limiter.release(0.01)
+	assert limiter.limit == 4
+	assert 4 < limiter._limit < 5
+
+	await limiter.acquire()
+	limiter.release(0.01, overloaded=True)
+	assert limiter.limit == 2
+
+
+async def test_limiter_cuts_on_latency_spike():
+	limiter = AdaptiveLimiter(initial_limit=8)
+	await limiter.acquire()
+	limiter.release(0.01)
+	await limiter.acquire()
+	limiter.release(0.1)
+	assert limiter.limit == 4
+
+
+async def test_limiter_cancelled_waiter_passes_slot_on():
+	limiter = AdaptiveLimiter(initial_limit=1)
+	await limiter.acquire()
+	first = asyncio.ensure_future(limiter.acquire())
+	second = asyncio.ensure_future(limiter.acquire())
+	await asyncio.sleep(0)
+	first.cancel()
+	limiter.cancel()
+	await asyncio.wait_for(second, 1)
+	assert limiter.in_flight == 1
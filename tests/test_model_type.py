@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from tei_client import ModelType
+from tei_client.clients.base import ModelTypeMixin
+from tei_client.models import Info
+
+INFO = {
+	"version": "1.5.0",
+	"sha": "abc",
+	"docker_label": "cpu",
+	"model_id": "mini",
+	"model_sha": "sha",
+	"model_dtype": "float32",
+	"model_type": ModelType.Embedding,
+	"max_concurrent_requests": 512,
+	"max_input_length": 512,
+	"max_batch_tokens": 2048,
+	"max_batch_requests": None,
+	"max_client_batch_size": 32,
+	"tokenization_workers": 2,
+}
+
+
+class InfoClient(ModelTypeMixin):
+	def __init__(self, fail: bool = False) -> None:
+		self.fail = fail
+		self.calls = 0
+
+	def info(self) -> Info:
+		raise AssertionError("the sync info must not be called from async code")
+
+	async def async_info(self) -> Info:
+		self.calls += 1
+		await asyncio.sleep(0.01)
+		if self.fail:
+			raise RuntimeError("server error")
+		return Info(**INFO)
+
+
+async def test_concurrent_callers_share_one_fetch():
+	client = InfoClient()
+	results = await asyncio.gather(*(client.async_server_info() for _ in range(5)))
+	assert all(info is results[0] for info in results)
+	assert client.calls == 1
+
+	await client._async_ensure_model_type(ModelType.Embedding)
+	assert client.server_info is results[0]
+	assert client.calls == 1
+
+
+async def test_failed_fetch_is_not_cached():
+	client = InfoClient(fail=True)
+	for _ in range(2):
+		with pytest.raises(RuntimeError):
+			await asyncio.gather(*(client.async_server_info() for _ in range(3)))
+	assert client.calls == 2
+
+	client.fail = False
+	assert (await client.async_server_info()).server_model_id == "mini"
+
+
+async def test_info_ttl():
+	client = InfoClient()
+	client.info_ttl = 0.02
+	first = await client.async_server_info()
+	assert await client.async_server_info() is first
+	await asyncio.sleep(0.02)
+	assert await client.async_server_info() is not first
+	assert client.calls == 2
+
+
+async def test_declared_model_type_skips_fetch():
+	client = InfoClient()
+	client.declared_model_type = ModelType.Classifier
+	await client._async_ensure_model_type(ModelType.Classifier)
+	assert client.model_type == ModelType.Classifier
+	with pytest.raises(AssertionError):
+		await client._async_ensure_model_type(ModelType.Embedding)
+	assert client.calls == 0
@@ -0,0 +1,42 @@
+import time
+
+from tei_client.ratelimit import RateLimiter, TokenBucket
+
+
+def test_bucket_waits_for_debt():
+	bucket = TokenBucket(rate=100, capacity=10)
+	assert bucket.reserve(10) == 0
+	assert 0.09 < bucket.reserve(10) <= 0.1
+	assert 0.19 < bucket.reserve(10) <= 0.2
+
+
+def test_bucket_allows_requests_larger_than_capacity():
+	bucket = TokenBucket(rate=100, capacity=10)
+	assert 0.09 < bucket.reserve(20) <= 0.1
+	assert bucket.level < 0
+
+
+def test_limiter_charges_tokens_and_requests():
+	limiter = RateLimiter(tokens_per_second=1000, requests_per_second=10)
+	assert limiter.reserve(500) == 0
+	assert 0.49 < limiter.reserve(1000) <= 0.5
+
+	limiter = RateLimiter(requests_per_second=10)
+	assert limiter.reserve(10_000, requests=10) == 0
+	assert 0.09 < limiter.reserve(1) <= 0.1
+
+
+def test_limiter_blocks():
+	limiter = RateLimiter(requests_per_second=100, request_burst=1)
+	start = time.monotonic()
+	for _ in range(6):
+		limiter.acquire(1)
+	assert time.monotonic() - start >= 0.045
+
+
+async def test_limiter_awaits():
+	limiter = RateLimiter(tokens_per_second=1000, token_burst=10)
+	start = time.monotonic()
+	for _ in range(6):
+		await limiter.async_acquire(10)
+	assert time.monotonic() - start >= 0.045
@@ -0,0 +1,49 @@
+import json
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+
+from tei_client.retry import RetryPolicy, parse_retry_after
+
+
+def test_parse_retry_after():
+	assert parse_retry_after(None) is None
+	assert parse_retry_after("2") == 2.0
+	assert parse_retry_after("invalid") is None
+	date = format_datetime(
+		datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True
+	)
+	assert 25 < parse_retry_after(date) <= 30
+
+
+def test_retry_policy_decisions():
+	policy = RetryPolicy(max_attempts=3)
+	assert policy.should_retry(429, 0)
+	assert policy.should_retry(503, 1)
+	assert not policy.should_retry(503, 2)
+	assert not policy.should_retry(500, 0)
+	assert policy.should_split(413, 2)
+	assert not policy.should_split(413, 1)
+	assert policy.should_split(422, 2, "batch size 8 > maximum allowed batch size 4")
+	assert not policy.should_split(422, 2, "`inputs` must have less than 512 tokens")
+	assert not policy.should_split(422, 2)
+
+
+@pytest.mark.parametrize("attempt", [0, 1, 5, 20])
+def test_retry_delay_is_bounded(attempt: int):
+	policy = RetryPolicy(initial_backoff=0.1, max_backoff=1.0)
+	delay = policy.delay(attempt)
+	assert 0 <= delay <= min(1.0, 0.1 * 2**attempt)
+	assert policy.delay(attempt, retry_after=0.5) == 0.5
+	assert policy.delay(attempt, retry_after=3600.0) == 1.0
+
+
+def test_grpc_service_config():
+	config = json.loads(RetryPolicy(max_attempts=10).grpc_service_config())
+	retry_policy = config["methodConfig"][0]["retryPolicy"]
+	assert retry_policy["maxAttempts"] == 5
+	assert set(retry_policy["retryableStatusCodes"]) == {
+		"UNAVAILABLE",
+		"RESOURCE_EXHAUSTED",
+	}
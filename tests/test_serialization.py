@@ -0,0 +1,16 @@
+from tei_client.serialization import default_backend, stdlib_backend
+from tei_client.models import TruncationDirection
+
+
+def test_backends_roundtrip():
+	payload = {
+		"inputs": ["Hello world"],
+		"truncation_direction": TruncationDirection.Left,
+	}
+	for backend in (stdlib_backend(), default_backend()):
+		encoded = backend.dumps(payload)
+		assert isinstance(encoded, bytes)
+		assert backend.loads(encoded) == {
+			"inputs": ["Hello world"],
+			"truncation_direction": "Left",
+		}
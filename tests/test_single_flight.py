@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from tei_client.clients.base import SingleFlightMixin, single_flight
+
+
+class SlowClient(SingleFlightMixin):
+	def __init__(self, enabled: bool = True) -> None:
+		self.single_flight = enabled
+		self.calls = 0
+
+	@single_flight
+	async def async_embed(self, text, normalize: bool = True):
+		self.calls += 1
+		await asyncio.sleep(0.01)
+		if text == "error":
+			raise RuntimeError("server error")
+		return [[float(len(text))]]
+
+
+async def test_single_flight_merges_identical_calls():
+	client = SlowClient()
+	results = await asyncio.gather(*(client.async_embed(["a", "b"]) for _ in range(5)))
+	assert results == [[[2.0]]] * 5
+	assert client.calls == 1
+
+	await client.async_embed(["a", "b"])
+	assert client.calls == 2
+
+
+async def test_single_flight_binds_arguments():
+	client = SlowClient()
+	results = await asyncio.gather(
+		client.async_embed("a"),
+		client.async_embed("a", True),
+		client.async_embed("a", normalize=True),
+		client.async_embed(text="a"),
+	)
+	assert all(result is results[0] for result in results)
+	assert client.calls == 1
+
+
+async def test_single_flight_distinguishes_arguments():
+	client = SlowClient()
+	await asyncio.gather(
+		client.async_embed("a"),
+		client.async_embed("a", normalize=False),
+		client.async_embed("b"),
+	)
+	assert client.calls == 3
+
+
+async def test_single_flight_disabled():
+	client = SlowClient(enabled=False)
+	await asyncio.gather(client.async_embed("a"), client.async_embed("a"))
+	assert client.calls == 2
+
+
+async def test_single_flight_shares_errors_and_survives_cancellation():
+	client = SlowClient()
+	first = asyncio.ensure_future(client.async_embed("a"))
+	second = asyncio.ensure_future(client.async_embed("a"))
+	await asyncio.sleep(0)
+	first.cancel()
+	assert await second == [[1.0]]
+
+	with pytest.raises(RuntimeError):
+		await asyncio.gather(client.async_embed("error"), client.async_embed("error"))
+	assert client.calls == 2
@@ -0,0 +1,24 @@
+from tei_client.stubs import tei_pb2
+from tei_client.wire import read_embed_all_response, read_embed_response
+
+
+def test_read_embed_response():
+	response = tei_pb2.EmbedResponse(
+		embeddings=[0.5, 1.5, -2.0], metadata=tei_pb2.Metadata(compute_chars=3)
+	)
+	result = read_embed_response(response.SerializeToString())
+	assert result.dtype == "float32"
+	assert result.tolist() == [0.5, 1.5, -2.0]
+
+
+def test_read_embed_all_response():
+	response = tei_pb2.EmbedAllResponse(
+		token_embeddings=[
+			tei_pb2.TokenEmbedding(embeddings=[1.0, 2.0]),
+			tei_pb2.TokenEmbedding(embeddings=[3.0, 4.0]),
+		],
+		metadata=tei_pb2.Metadata(compute_tokens=2),
+	)
+	result = read_embed_all_response(response.SerializeToString())
+	assert result.shape == (2, 2)
+	assert result.tolist() == [[1.0, 2.0], [3.0, 4.0]]